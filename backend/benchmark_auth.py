@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark of the per-request cost of authentication.
+
+Times the same trivial endpoint three ways through the Flask test client:
+
+- none:    no authentication, the floor
+- legacy:  @jwt_required() plus the old inline check, which split the
+           "id:username:is_admin" identity string again for every check and
+           loaded the User row for handlers that needed it
+- current: @admin_required, which resolves the cached Principal once per
+           request and keeps the admin verdict on g
+
+    python benchmark_auth.py --requests 5000
+"""
+import os
+import time
+import argparse
+import tempfile
+from flask import Flask, jsonify
+from flask_jwt_extended import JWTManager, create_access_token, get_jwt_identity, jwt_required
+
+def legacy_identity():
+    user_id, username, is_admin = get_jwt_identity().split(':')
+    return {'id': int(user_id), 'username': username, 'is_admin': is_admin.lower() == 'true'}
+
+def build_app(database_url, legacy):
+    from extensions import db, jwt
+    from utils.principal import init_principal, current_principal
+    from utils.passwords import init_passwords
+    from utils.utils import admin_required
+
+    app = Flask(__name__)
+    app.config.update(SQLALCHEMY_DATABASE_URI=database_url, JWT_SECRET_KEY='benchmark-secret-key-of-32-bytes!')
+    db.init_app(app)
+    init_passwords(app)
+    if legacy:
+        # A separate manager without the user loader, as before
+        JWTManager(app)
+    else:
+        jwt.init_app(app)
+        init_principal(app)
+
+    @app.route('/none')
+    def no_auth():
+        return jsonify({'ok': True})
+
+    if legacy:
+        @app.route('/admin')
+        @jwt_required()
+        def admin_view():
+            user_info = legacy_identity()
+            if not user_info or not user_info.get('is_admin'):
+                return jsonify({'msg': 'Admins only'}), 403
+            return jsonify({'ok': True})
+
+        @app.route('/profile')
+        @jwt_required()
+        def profile_view():
+            from models.user import User
+            user = db.session.get(User, legacy_identity()['id'])
+            return jsonify({'username': user.username})
+    else:
+        @app.route('/admin')
+        @admin_required
+        def admin_view():
+            return jsonify({'ok': True})
+
+        @app.route('/profile')
+        @jwt_required()
+        def profile_view():
+            return jsonify({'username': current_principal().username})
+
+    return app
+
+def time_requests(app, path, headers, count):
+    client = app.test_client()
+    for _ in range(50):
+        client.get(path, headers=headers)
+    started = time.perf_counter()
+    for _ in range(count):
+        response = client.get(path, headers=headers)
+        assert response.status_code == 200, response.get_json()
+    return (time.perf_counter() - started) / count * 1e6
+
+def run(count):
+    tmpdir = tempfile.TemporaryDirectory()
+    database_url = os.getenv('BENCH_DATABASE_URL', f"sqlite:///{os.path.join(tmpdir.name, 'bench.db')}")
+    from extensions import db
+
+    results = {}
+    for legacy in (True, False):
+        app = build_app(database_url, legacy)
+        with app.app_context():
+            from models.user import User
+            db.create_all()
+            user = User.query.filter_by(username='bench-admin').first()
+            if user is None:
+                user = User(username='bench-admin', is_admin=True)
+                user.set_password('bench')
+                db.session.add(user)
+                db.session.commit()
+            token = create_access_token(identity=f'{user.id}:{user.username}:True')
+        headers = {'Authorization': f'Bearer {token}'}
+        label = 'legacy' if legacy else 'current'
+        results['none'] = time_requests(app, '/none', {}, count)
+        results[f'{label} admin'] = time_requests(app, '/admin', headers, count)
+        results[f'{label} profile'] = time_requests(app, '/profile', headers, count)
+
+    floor = results['none']
+    print(f"\n📊 {count} requests per case, µs per request (overhead over the unauthenticated floor)")
+    print(f"{'case':<18}{'µs/req':>10}{'auth µs':>10}")
+    for case in ('none', 'legacy admin', 'current admin', 'legacy profile', 'current profile'):
+        print(f"{case:<18}{results[case]:>10.1f}{results[case] - floor:>10.1f}")
+    tmpdir.cleanup()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=5000)
+    args = parser.parse_args()
+    run(args.requests)
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Measure public form submission throughput against a running server.
+
+--concurrency clients post prayer requests as fast as they can for
+--duration seconds. Run it once per FORM_INGEST mode and compare:
+
+    FORM_INGEST=direct RATE_LIMIT_ENABLED=false gunicorn -c gunicorn.conf.py wsgi:app &
+    python benchmark_forms.py
+    FORM_INGEST=batched RATE_LIMIT_ENABLED=false gunicorn -c gunicorn.conf.py wsgi:app &
+    python benchmark_forms.py
+"""
+import json
+import time
+import argparse
+import threading
+import statistics
+import http.client
+from urllib.parse import urlparse
+
+def client(url, deadline, results):
+    parsed = urlparse(url)
+    connection = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=60)
+    latencies, errors, sequence = [], 0, 0
+    while time.perf_counter() < deadline:
+        sequence += 1
+        body = json.dumps({'name': f'Benchmark {sequence}', 'email': 'bench@example.com',
+                           'prayer_request': 'Benchmark submission ' + 'x' * 200})
+        start = time.perf_counter()
+        try:
+            connection.request('POST', '/api/contact/prayer-request', body=body,
+                               headers={'Content-Type': 'application/json'})
+            response = connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            connection = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=60)
+            errors += 1
+            continue
+        if response.status == 200:
+            latencies.append((time.perf_counter() - start) * 1000)
+        else:
+            errors += 1
+    connection.close()
+    results.append((latencies, errors))
+
+def run(url, concurrency, duration):
+    results = []
+    deadline = time.perf_counter() + duration
+    threads = [threading.Thread(target=client, args=(url, deadline, results)) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencies = sorted(latency for batch, _ in results for latency in batch)
+    errors = sum(count for _, count in results)
+    if len(latencies) < 2:
+        print(f"❌ Only {len(latencies)} submissions succeeded, {errors} failed")
+        return
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"\n📊 {concurrency} clients, {duration:.0f}s against {url}")
+    print(f"{'submissions/s':>14}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    print(f"{len(latencies) / duration:>14.1f}{quantiles[49]:>10.1f}{quantiles[98]:>10.1f}{errors:>8}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=15)
+    args = parser.parse_args()
+    run(args.url, args.concurrency, args.duration)
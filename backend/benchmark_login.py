@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Measure login throughput and what a login burst does to public traffic.
+
+Runs the public-endpoint load of benchmark_wsgi.py twice against a running
+server: once alone, then together with --logins clients that sign in as
+fast as they can. Prints logins per second, logins turned away with 503
+(PASSWORD_HASH_MAX_PENDING reached), and public p99 latency with and
+without the login load.
+
+    RATE_LIMIT_ENABLED=false gunicorn -c gunicorn.conf.py wsgi:app &
+    python benchmark_login.py --username admin --password secret --logins 8
+"""
+import json
+import time
+import argparse
+import threading
+import statistics
+import http.client
+from urllib.parse import urlparse
+from benchmark_wsgi import DEFAULT_PATHS, run as run_public
+
+def login_client(url, body, deadline, results):
+    parsed = urlparse(url)
+    connection = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=60)
+    latencies, busy, failed = [], 0, 0
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            connection.request('POST', '/api/auth/login', body=body, headers={'Content-Type': 'application/json'})
+            response = connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            connection = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=60)
+            continue
+        if response.status == 200:
+            latencies.append((time.perf_counter() - start) * 1000)
+        elif response.status == 503:
+            busy += 1
+        else:
+            failed += 1
+    connection.close()
+    results.append((latencies, busy, failed))
+
+def run(url, username, password, logins, concurrency, duration):
+    body = json.dumps({'username': username, 'password': password})
+    baseline = run_public(url, DEFAULT_PATHS, concurrency, duration)
+
+    results = []
+    deadline = time.perf_counter() + duration
+    threads = [threading.Thread(target=login_client, args=(url, body, deadline, results)) for _ in range(logins)]
+    for thread in threads:
+        thread.start()
+    loaded = run_public(url, DEFAULT_PATHS, concurrency, duration)
+    for thread in threads:
+        thread.join()
+
+    latencies = sorted(latency for batch, _, _ in results for latency in batch)
+    busy = sum(count for _, count, _ in results)
+    failed = sum(count for _, _, count in results)
+    print(f"\n📊 {concurrency} public clients, {logins} login clients, {duration:.0f}s each against {url}")
+    print(f"{'':<22}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    print(f"{'public alone':<22}{baseline['rps']:>10.1f}{baseline['p50']:>10.1f}{baseline['p99']:>10.1f}")
+    print(f"{'public with logins':<22}{loaded['rps']:>10.1f}{loaded['p50']:>10.1f}{loaded['p99']:>10.1f}")
+    if latencies:
+        login_p50 = statistics.median(latencies)
+        print(f"{'logins':<22}{len(latencies) / duration:>10.1f}{login_p50:>10.1f}{latencies[int(len(latencies) * 0.99) - 1]:>10.1f}")
+    print(f"🔐 {len(latencies)} logins succeeded, {busy} turned away with 503, {failed} failed")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--username', required=True)
+    parser.add_argument('--password', required=True)
+    parser.add_argument('--logins', type=int, default=8, help='concurrent login clients')
+    parser.add_argument('--concurrency', type=int, default=8, help='concurrent public clients')
+    parser.add_argument('--duration', type=float, default=15)
+    args = parser.parse_args()
+    run(args.url, args.username, args.password, args.logins, args.concurrency, args.duration)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Compare the indexed member search against the old leading-wildcard ILIKE filter.
+
+Seeds a scratch database with 10k and 100k members and times both paths for a
+few typical admin searches. Uses BENCH_DATABASE_URL (default: a temporary
+SQLite file) so it never touches the real database.
+
+    python benchmark_member_search.py [--sizes 10000 100000] [--repeat 20]
+"""
+import os
+import time
+import random
+import argparse
+import tempfile
+import statistics
+from flask import Flask
+from extensions import db
+
+FIRST_NAMES = ['John', 'Mary', 'Peter', 'Grace', 'James', 'Faith', 'David', 'Mercy', 'Paul', 'Esther',
+               'Samuel', 'Ruth', 'Daniel', 'Joy', 'Joseph', 'Naomi', 'Stephen', 'Lydia', 'Moses', 'Hannah']
+LAST_NAMES = ['Mwangi', 'Otieno', 'Kamau', 'Wanjiru', 'Mutua', 'Njeri', 'Kiprop', 'Achieng', 'Kariuki',
+              'Chebet', 'Mugo', 'Nyaga', 'Murithi', 'Kinyua', 'Gitonga', 'Mbaabu', 'Kirimi', 'Muthoni']
+SEARCHES = ['mwangi', 'grace kam', 'otieno@', '0712', 'zzz']
+
+def create_bench_app(database_url):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+def enable_sqlite_prefix_index():
+    """SQLite only uses an index for LIKE 'x%' when LIKE is case sensitive; terms are lowercase already"""
+    from sqlalchemy import event
+
+    @event.listens_for(db.engine, 'connect')
+    def set_case_sensitive_like(dbapi_connection, connection_record):
+        dbapi_connection.execute('PRAGMA case_sensitive_like = ON')
+
+def seed_members(count):
+    from models.church_member import ChurchMember, MemberSearchTerm
+    from utils.member_search import member_search_terms
+
+    rng = random.Random(42)
+    members, terms = [], []
+    for member_id in range(1, count + 1):
+        first = rng.choice(FIRST_NAMES)
+        last = rng.choice(LAST_NAMES)
+        email = f"{first.lower()}.{last.lower()}{member_id}@example.com"
+        phone = f"07{rng.randint(10, 99)} {rng.randint(100000, 999999)}"
+        members.append({'id': member_id, 'first_name': first, 'last_name': last, 'email': email,
+                        'phone': phone, 'is_active': True})
+        terms.extend({'member_id': member_id, 'term': term}
+                     for term in member_search_terms(first, last, email, phone))
+
+    db.session.execute(ChurchMember.__table__.insert(), members)
+    db.session.execute(MemberSearchTerm.__table__.insert(), terms)
+    db.session.commit()
+
+def ilike_query(search):
+    from models.church_member import ChurchMember
+    search_term = f"%{search}%"
+    return ChurchMember.query.filter(
+        db.or_(
+            ChurchMember.first_name.ilike(search_term),
+            ChurchMember.last_name.ilike(search_term),
+            ChurchMember.email.ilike(search_term),
+            ChurchMember.phone.ilike(search_term)
+        )
+    )
+
+def indexed_query(search):
+    from models.church_member import ChurchMember
+    from utils.member_search import member_search_subquery
+    matches = member_search_subquery(search)
+    return ChurchMember.query.join(matches, ChurchMember.id == matches.c.member_id)
+
+def time_query(build, search, repeat):
+    from models.church_member import ChurchMember
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        query = build(search)
+        query.with_entities(db.func.count(ChurchMember.id)).order_by(None).scalar()
+        query.order_by(ChurchMember.id).limit(20).all()
+        timings.append((time.perf_counter() - start) * 1000)
+        db.session.expunge_all()
+    return statistics.median(timings)
+
+def run(sizes, repeat):
+    for size in sizes:
+        database_url = os.getenv('BENCH_DATABASE_URL')
+        tmpdir = None
+        if not database_url:
+            tmpdir = tempfile.TemporaryDirectory()
+            database_url = f"sqlite:///{os.path.join(tmpdir.name, 'bench.db')}"
+
+        app = create_bench_app(database_url)
+        with app.app_context():
+            from models.church_member import ChurchMember, MemberMinistry, MemberSearchTerm
+            from models.ministry import Ministry
+            if db.engine.dialect.name == 'sqlite':
+                enable_sqlite_prefix_index()
+            db.drop_all()
+            db.create_all()
+            print(f"\n📊 {size:,} members ({db.engine.dialect.name})")
+            seed_members(size)
+            print(f"{'search':<14}{'ILIKE ms':>12}{'indexed ms':>12}{'speedup':>10}")
+            for search in SEARCHES:
+                ilike_ms = time_query(ilike_query, search, repeat)
+                indexed_ms = time_query(indexed_query, search, repeat)
+                print(f"{search:<14}{ilike_ms:>12.2f}{indexed_ms:>12.2f}{ilike_ms / indexed_ms:>9.1f}x")
+            db.drop_all()
+        if tmpdir:
+            tmpdir.cleanup()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
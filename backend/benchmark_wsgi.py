@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Measure the throughput of a running API server.
+
+Starts --concurrency client threads, each with its own keep-alive
+connection, that cycle through a set of public endpoints for --duration
+seconds, then prints requests per second and latency percentiles.
+
+    gunicorn -c gunicorn.conf.py wsgi:app &
+    python benchmark_wsgi.py --url http://127.0.0.1:5000 --concurrency 32 --duration 20
+"""
+import time
+import argparse
+import threading
+import statistics
+import http.client
+from urllib.parse import urlparse
+
+DEFAULT_PATHS = ['/api/home/', '/api/sermons/', '/api/events/', '/api/ministries/', '/api/pastors/']
+
+def client(url, paths, deadline, results, headers):
+    parsed = urlparse(url)
+    connection = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=30)
+    latencies, errors, resets, index = [], 0, 0, 0
+    while time.perf_counter() < deadline:
+        path = paths[index % len(paths)]
+        index += 1
+        start = time.perf_counter()
+        try:
+            connection.request('GET', path, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            if response.status >= 400:
+                errors += 1
+        except (OSError, http.client.HTTPException):
+            # Keep-alive connection closed by the server, e.g. a recycled worker
+            resets += 1
+            connection.close()
+            connection = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=30)
+            continue
+        latencies.append((time.perf_counter() - start) * 1000)
+    connection.close()
+    results.append((latencies, errors, resets))
+
+def run(url, paths, concurrency, duration, headers=None):
+    """Run the load and return a dict of rps, HTTP errors, connection resets and latency percentiles (ms)"""
+    headers = headers or {'Accept-Encoding': 'gzip'}
+    results = []
+    deadline = time.perf_counter() + duration
+    threads = [threading.Thread(target=client, args=(url, paths, deadline, results, headers))
+               for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for batch, _, _ in results for latency in batch)
+    errors = sum(count for _, count, _ in results)
+    resets = sum(count for _, _, count in results)
+    if not latencies:
+        return {'rps': 0, 'errors': errors, 'resets': resets, 'p50': None, 'p95': None, 'p99': None}
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        'rps': len(latencies) / elapsed,
+        'errors': errors,
+        'resets': resets,
+        'p50': quantiles[49],
+        'p95': quantiles[94],
+        'p99': quantiles[98]
+    }
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--paths', nargs='+', default=DEFAULT_PATHS)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=20)
+    args = parser.parse_args()
+
+    result = run(args.url, args.paths, args.concurrency, args.duration)
+    print(f"📊 {args.concurrency} clients x {args.duration:.0f}s against {args.url}")
+    print(f"{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}{'resets':>8}")
+    if result['p50'] is None:
+        print(f"{0:>10}{'-':>10}{'-':>10}{'-':>10}{result['errors']:>8}{result['resets']:>8}")
+    else:
+        print(f"{result['rps']:>10.1f}{result['p50']:>10.1f}{result['p95']:>10.1f}{result['p99']:>10.1f}"
+              f"{result['errors']:>8}{result['resets']:>8}")
@@ -1,12 +1,15 @@
 from flask import Blueprint, request, jsonify
 from extensions import db
-from flask_jwt_extended import jwt_required
 from datetime import datetime
-from utils.utils import is_admin
+from utils.utils import admin_required
+from utils.cache import cached, invalidates_cache
+from utils.http_cache import conditional
 
 announcement_bp = Blueprint('announcement_controller', __name__)
 
 @announcement_bp.route('/', methods=['GET'])
+@conditional('announcements', 'announcement')
+@cached('announcements')
 def get_announcements():
     from models.announcement import Announcement
     announcements = Announcement.query.filter_by(is_active=True).order_by(Announcement.date.desc()).all()
@@ -24,6 +27,8 @@ def get_announcements():
 
 @announcement_bp.route('/<int:announcement_id>', methods=['GET'])
 @announcement_bp.route('/<int:announcement_id>/', methods=['GET'])
+@conditional('announcements', 'announcement')
+@cached('announcements')
 def get_announcement(announcement_id):
     from models.announcement import Announcement
     a = Announcement.query.get_or_404(announcement_id)
@@ -40,10 +45,9 @@ def get_announcement(announcement_id):
     })
 
 @announcement_bp.route('/', methods=['POST'])
-@jwt_required()
+@admin_required
+@invalidates_cache('announcements')
 def create_announcement():
-    if not is_admin():
-        return jsonify({'msg': 'Admins only'}), 403
     from models.announcement import Announcement
     
     data = request.json
@@ -61,10 +65,9 @@ def create_announcement():
 
 @announcement_bp.route('/<int:announcement_id>', methods=['PUT'])
 @announcement_bp.route('/<int:announcement_id>/', methods=['PUT'])
-@jwt_required()
+@admin_required
+@invalidates_cache('announcements')
 def update_announcement(announcement_id):
-    if not is_admin():
-        return jsonify({'msg': 'Admins only'}), 403
     from models.announcement import Announcement
     a = Announcement.query.get_or_404(announcement_id)
     
@@ -82,10 +85,9 @@ def update_announcement(announcement_id):
 
 @announcement_bp.route('/<int:announcement_id>', methods=['DELETE'])
 @announcement_bp.route('/<int:announcement_id>/', methods=['DELETE'])
-@jwt_required()
+@admin_required
+@invalidates_cache('announcements')
 def delete_announcement(announcement_id):
-    if not is_admin():
-        return jsonify({'msg': 'Admins only'}), 403
     from models.announcement import Announcement
     a = Announcement.query.get_or_404(announcement_id)
     a.is_active = False
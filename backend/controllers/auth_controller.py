@@ -1,8 +1,10 @@
 from flask import Blueprint, request, jsonify
 from extensions import db
 from flask_jwt_extended import create_access_token, jwt_required
-from werkzeug.security import generate_password_hash, check_password_hash
+from utils.passwords import PasswordHasherBusy, hasher_busy_response
 from utils.utils import parse_jwt_identity
+from utils.principal import current_principal
+from utils.rate_limit import rate_limited
 
 auth_bp = Blueprint('auth_controller', __name__)
 
@@ -13,18 +15,28 @@ def register():
     if User.query.filter_by(username=data['username']).first():
         return jsonify({'msg': 'Username already exists'}), 400
     user = User(username=data['username'], email=f"{data['username']}@dciukajuki.org", is_admin=True)
-    user.set_password(data['password'])
+    try:
+        user.set_password(data['password'])
+    except PasswordHasherBusy:
+        return hasher_busy_response()
     db.session.add(user)
     db.session.commit()
     return jsonify({'msg': 'Admin registered successfully'})
 
 @auth_bp.route('/login', methods=['POST'])
+@rate_limited('login')
 def login():
     from models.user import User
     data = request.json
     user = User.query.filter_by(username=data['username']).first()
-    if not user or not user.check_password(data['password']):
-        return jsonify({'msg': 'Invalid credentials'}), 401
+    try:
+        if not user or not user.check_password(data['password']):
+            return jsonify({'msg': 'Invalid credentials'}), 401
+    except PasswordHasherBusy:
+        return hasher_busy_response()
+    if db.session.is_modified(user):
+        # The password hash was upgraded to the current settings
+        db.session.commit()
     
     # Create identity string instead of object
     identity = f"{user.id}:{user.username}:{user.is_admin}"
@@ -35,26 +47,7 @@ def login():
 @jwt_required()
 def get_profile():
     """Get current user profile information"""
-    from models.user import User
-    user_info = parse_jwt_identity()
-
-    if not user_info:
-        return jsonify({'msg': 'Invalid token format'}), 400
-
-    user = User.query.get(user_info['id'])
-
-    if not user:
-        return jsonify({'msg': 'User not found'}), 404
-
-    return jsonify({
-        'id': user.id,
-        'username': user.username,
-        'email': user.email or f"{user.username}@dciukajuki.org",
-        'is_admin': user.is_admin,
-        'active': user.active,
-        'created_at': user.created_at.isoformat() if user.created_at else None,
-        'last_login': user.last_login.isoformat() if user.last_login else None
-    })
+    return jsonify(current_principal().to_dict())
 
 @auth_bp.route('/profile', methods=['PUT'])
 @jwt_required()
@@ -1,12 +1,17 @@
 from flask import Blueprint, request, jsonify
 from extensions import db
-from flask_jwt_extended import jwt_required
 from datetime import datetime
-from utils.utils import is_admin
+from utils.utils import admin_required
+from utils.cache import cached, invalidates_cache
+from utils.http_cache import conditional
+from utils.snapshots import snapshot
 
 church_info_bp = Blueprint('church_info_controller', __name__)
 
 @church_info_bp.route('/', methods=['GET'])
+@snapshot('church-info')
+@conditional('church_info', 'church_info')
+@cached('church_info')
 def get_church_info():
     from models.church_info import ChurchInfo
     church_info = ChurchInfo.query.first()
@@ -37,10 +42,9 @@ def get_church_info():
         })
 
 @church_info_bp.route('/', methods=['POST'])
-@jwt_required()
+@admin_required
+@invalidates_cache('church_info')
 def create_church_info():
-    if not is_admin():
-        return jsonify({'msg': 'Admins only'}), 403
     from models.church_info import ChurchInfo
     
     data = request.json
@@ -59,10 +63,9 @@ def create_church_info():
     return jsonify({'msg': 'Church info created', 'id': church_info.id})
 
 @church_info_bp.route('/', methods=['PUT'])
-@jwt_required()
+@admin_required
+@invalidates_cache('church_info')
 def update_church_info():
-    if not is_admin():
-        return jsonify({'msg': 'Admins only'}), 403
     from models.church_info import ChurchInfo
     
     data = request.json
@@ -1,187 +1,300 @@
 from flask import Blueprint, request, jsonify
 from extensions import db
-from flask_jwt_extended import jwt_required
+from sqlalchemy import func, insert, literal, or_, select, update
+from sqlalchemy.orm import selectinload, joinedload, load_only, undefer_group
 from datetime import datetime
-from utils.utils import is_admin
+from collections import Counter
+from itertools import chain
+from werkzeug.datastructures import MultiDict
+from utils.cache import MemoryCache
+from utils.utils import parse_jwt_identity, admin_required, bulk_selection, MAX_BULK_ITEMS
+from utils.jobs import register_job, enqueue_job
+from utils.member_search import member_search_subquery, member_search_terms
+from utils.member_query import MEMBER_FILTER_KEYS, member_filters_from_args, build_member_query
 
 church_member_bp = Blueprint('church_member_controller', __name__)
 
+# Pagination limits for the member listing
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 500
+
+# Number of members fetched per query when exporting
+EXPORT_BATCH_SIZE = 500
+# Rows per table in the PDF export; roughly one page each
+EXPORT_PDF_TABLE_ROWS = 40
+# Columns of the CSV and XLSX exports, in _member_export_row key order
+EXPORT_COLUMNS = ['Name', 'Email', 'Phone', 'Gender', 'Status', 'Ministries']
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Fields that can be requested via ?fields=, mapped to the columns they need
+MEMBER_FIELD_COLUMNS = {
+    'id': [],
+    'first_name': ['first_name'],
+    'last_name': ['last_name'],
+    'full_name': ['first_name', 'last_name'],
+    'email': ['email'],
+    'phone': ['phone'],
+    'date_of_birth': ['date_of_birth'],
+    'address': ['address'],
+    'gender': ['gender'],
+    'marital_status': ['marital_status'],
+    'baptism_date': ['baptism_date'],
+    'membership_date': ['membership_date'],
+    'is_active': ['is_active'],
+    'notes': ['notes'],
+    'created_at': ['created_at'],
+    'updated_at': ['updated_at'],
+    'ministry_assignments': []
+}
+
+# Filtered member counts, cached briefly so paging does not re-count every request.
+# Bounded, since every distinct search string gets its own entry
+MEMBER_COUNT_CACHE_TTL = 60
+MEMBER_COUNT_CACHE_ENTRIES = 256
+_member_counts = MemoryCache(max_entries=MEMBER_COUNT_CACHE_ENTRIES)
+
+def _get_member_count(query, count_column, cache_key):
+    """Return the number of members matching query, cached per filter combination"""
+    total = _member_counts.get(cache_key)
+    if total is None:
+        total = query.with_entities(func.count(count_column)).order_by(None).scalar()
+        _member_counts.set(cache_key, total, ex=MEMBER_COUNT_CACHE_TTL)
+    return total
+
+def invalidate_member_count_cache():
+    """Drop cached member counts after members or assignments change"""
+    _member_counts.clear()
+
+def serialize_assignment(assignment):
+    return {
+        'id': assignment.id,
+        'ministry_id': assignment.ministry_id,
+        'ministry_name': assignment.ministry.name if assignment.ministry else None,
+        'role': assignment.role,
+        'start_date': assignment.start_date.isoformat() if assignment.start_date else None,
+        'end_date': assignment.end_date.isoformat() if assignment.end_date else None,
+        'is_active': assignment.is_active
+    }
+
+def serialize_member(member, assignments, fields=None):
+    """Serialize a member; only the requested fields are touched so deferred columns stay unloaded"""
+    serializers = {
+        'id': lambda: member.id,
+        'first_name': lambda: member.first_name,
+        'last_name': lambda: member.last_name,
+        'full_name': lambda: member.full_name,
+        'email': lambda: member.email,
+        'phone': lambda: member.phone,
+        'date_of_birth': lambda: member.date_of_birth.isoformat() if member.date_of_birth else None,
+        'address': lambda: member.address,
+        'gender': lambda: member.gender,
+        'marital_status': lambda: member.marital_status,
+        'baptism_date': lambda: member.baptism_date.isoformat() if member.baptism_date else None,
+        'membership_date': lambda: member.membership_date.isoformat() if member.membership_date else None,
+        'is_active': lambda: member.is_active,
+        'notes': lambda: member.notes,
+        'created_at': lambda: member.created_at.isoformat() if member.created_at else None,
+        'updated_at': lambda: member.updated_at.isoformat() if member.updated_at else None,
+        'ministry_assignments': lambda: [serialize_assignment(a) for a in assignments]
+    }
+    return {name: serializers[name]() for name in (fields or serializers)}
+
+def _iter_member_batches(query, batch_size=None):
+    """Yield members from query in id-ordered batches with their active assignments preloaded
+    
+    Each batch is fetched with keyset pagination and expunged from the session
+    once the caller moves on, so memory stays bounded by the batch size.
+    """
+    from models.church_member import ChurchMember, MemberMinistry
+    
+    batch_size = batch_size or EXPORT_BATCH_SIZE
+    query = query.options(
+        selectinload(ChurchMember.active_ministry_assignments).joinedload(MemberMinistry.ministry)
+    ).order_by(ChurchMember.id)
+    
+    last_id = 0
+    while True:
+        batch = query.filter(ChurchMember.id > last_id).limit(batch_size).all()
+        if not batch:
+            break
+        last_id = batch[-1].id
+        yield batch
+        db.session.expunge_all()
+
 @church_member_bp.route('/', methods=['GET'])
-@jwt_required()
+@admin_required
 def get_church_members():
-    """Get all church members with optional filtering"""
-    from models.church_member import ChurchMember, MemberMinistry
+    """Get church members with optional filtering, keyset pagination and field selection
+    
+    Query parameters:
+        after_id: only return members with an id greater than this (cursor)
+        limit: page size (max 500); without limit or after_id all members are returned
+        fields: comma-separated list of fields to return
     
-    if not is_admin():
-        return jsonify({'msg': 'Admins only'}), 403
+    The total number of matching members is returned in the X-Total-Count header
+    and the cursor for the next page, if any, in X-Next-After-Id.
+    """
+    from models.church_member import ChurchMember, MemberMinistry
     
     try:
-        # Get query parameters for filtering
-        ministry_id = request.args.get('ministry_id', type=int)
-        gender = request.args.get('gender')
-        marital_status = request.args.get('marital_status')
-        is_active = request.args.get('is_active', type=lambda v: v.lower() == 'true' if v else None)
-        search = request.args.get('search')
-        
-        # Start with base query
-        query = ChurchMember.query
-        
-        # Apply filters
-        if ministry_id:
-            # Filter members who are assigned to the specified ministry
-            member_ids = db.session.query(MemberMinistry.member_id).filter(
-                MemberMinistry.ministry_id == ministry_id,
-                MemberMinistry.is_active == True
-            ).subquery()
-            query = query.filter(ChurchMember.id.in_(member_ids))
-        
-        if gender:
-            query = query.filter(ChurchMember.gender == gender)
-        
-        if marital_status:
-            query = query.filter(ChurchMember.marital_status == marital_status)
-        
-        if is_active is not None:
-            query = query.filter(ChurchMember.is_active == is_active)
-        
-        if search:
-            search_term = f"%{search}%"
-            query = query.filter(
-                db.or_(
-                    ChurchMember.first_name.ilike(search_term),
-                    ChurchMember.last_name.ilike(search_term),
-                    ChurchMember.email.ilike(search_term),
-                    ChurchMember.phone.ilike(search_term)
-                )
+        filters = member_filters_from_args()
+        
+        # Pagination and projection parameters
+        after_id = request.args.get('after_id', type=int)
+        limit = request.args.get('limit', type=int)
+        fields = request.args.get('fields')
+        
+        if fields:
+            fields = [f.strip() for f in fields.split(',') if f.strip()]
+            unknown = [f for f in fields if f not in MEMBER_FIELD_COLUMNS]
+            if unknown:
+                return jsonify({'error': f"Unknown fields: {', '.join(unknown)}"}), 400
+        
+        paginate = after_id is not None or limit is not None
+        if paginate:
+            limit = min(max(limit or DEFAULT_PAGE_LIMIT, 1), MAX_PAGE_LIMIT)
+        
+        query = build_member_query(filters)
+        
+        total = _get_member_count(query, ChurchMember.id, tuple(sorted(filters.items())))
+        
+        # Only load the columns needed for the requested fields
+        if fields:
+            columns = {column for f in fields for column in MEMBER_FIELD_COLUMNS[f]}
+            query = query.options(load_only(*[getattr(ChurchMember, c) for c in sorted(columns)]))
+        else:
+            query = query.options(undefer_group('details'))
+        
+        # Active assignments and their ministries are loaded in one extra
+        # SELECT ... IN query instead of one per member
+        include_assignments = not fields or 'ministry_assignments' in fields
+        if include_assignments:
+            query = query.options(
+                selectinload(ChurchMember.active_ministry_assignments).joinedload(MemberMinistry.ministry)
             )
         
-        members = query.all()
-        
-        # Get ministry assignments for each member
-        result = []
-        for member in members:
-            assignments = MemberMinistry.query.filter_by(member_id=member.id, is_active=True).all()
-            member_data = {
-                'id': member.id,
-                'first_name': member.first_name,
-                'last_name': member.last_name,
-                'full_name': member.full_name,
-                'email': member.email,
-                'phone': member.phone,
-                'date_of_birth': member.date_of_birth.isoformat() if member.date_of_birth else None,
-                'address': member.address,
-                'gender': member.gender,
-                'marital_status': member.marital_status,
-                'baptism_date': member.baptism_date.isoformat() if member.baptism_date else None,
-                'membership_date': member.membership_date.isoformat() if member.membership_date else None,
-                'is_active': member.is_active,
-                'notes': member.notes,
-                'created_at': member.created_at.isoformat() if member.created_at else None,
-                'updated_at': member.updated_at.isoformat() if member.updated_at else None,
-                'ministry_assignments': [{
-                    'id': assignment.id,
-                    'ministry_id': assignment.ministry_id,
-                    'ministry_name': assignment.ministry.name if assignment.ministry else None,
-                    'role': assignment.role,
-                    'start_date': assignment.start_date.isoformat() if assignment.start_date else None,
-                    'end_date': assignment.end_date.isoformat() if assignment.end_date else None,
-                    'is_active': assignment.is_active
-                } for assignment in assignments]
-            }
-            result.append(member_data)
-        
-        return jsonify(result)
+        query = query.order_by(ChurchMember.id)
+        if after_id is not None:
+            query = query.filter(ChurchMember.id > after_id)
+        if paginate:
+            # Fetch one extra row to know whether another page exists
+            members = query.limit(limit + 1).all()
+            has_more = len(members) > limit
+            members = members[:limit]
+        else:
+            members = query.all()
+            has_more = False
+        
+        result = [
+            serialize_member(
+                member,
+                member.active_ministry_assignments if include_assignments else [],
+                fields
+            ) for member in members
+        ]
+        
+        response = jsonify(result)
+        response.headers['X-Total-Count'] = str(total)
+        if has_more:
+            response.headers['X-Next-After-Id'] = str(members[-1].id)
+        return response
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@church_member_bp.route('/search', methods=['GET'])
+@admin_required
+def search_church_members():
+    """Ranked member search by name, email or phone prefix
+    
+    Query parameters:
+        q: search text; every word must prefix-match a name, email or phone
+        limit: page size (default 20, max 100)
+        offset: number of results to skip
+    """
+    from models.church_member import ChurchMember
+    
+    try:
+        q = request.args.get('q', '')
+        limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+        offset = max(request.args.get('offset', 0, type=int), 0)
+        
+        matches = member_search_subquery(q)
+        if matches is None:
+            return jsonify({'results': [], 'total': 0})
+        
+        total = db.session.query(func.count()).select_from(matches).scalar()
+        rows = db.session.query(ChurchMember, matches.c.score).join(
+            matches, ChurchMember.id == matches.c.member_id
+        ).options(
+            load_only(ChurchMember.first_name, ChurchMember.last_name, ChurchMember.email,
+                      ChurchMember.phone, ChurchMember.is_active)
+        ).order_by(matches.c.score.desc(), ChurchMember.id).offset(offset).limit(limit).all()
+        
+        return jsonify({
+            'results': [
+                dict(serialize_member(member, [], ['id', 'full_name', 'email', 'phone', 'is_active']), score=int(score))
+                for member, score in rows
+            ],
+            'total': total
+        })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @church_member_bp.route('/<int:member_id>', methods=['GET'])
-@jwt_required()
+@admin_required
 def get_church_member(member_id):
     """Get a specific church member with ministry assignments"""
     from models.church_member import ChurchMember, MemberMinistry
     
-    if not is_admin():
-        return jsonify({'msg': 'Admins only'}), 403
-    
     try:
-        member = ChurchMember.query.get_or_404(member_id)
+        member = ChurchMember.query.options(undefer_group('details')).get_or_404(member_id)
         
-        # Get ministry assignments
-        assignments = MemberMinistry.query.filter_by(member_id=member_id, is_active=True).all()
+        # Get ministry assignments, with their ministries in the same query
+        assignments = MemberMinistry.query.filter_by(member_id=member_id, is_active=True) \
+            .options(joinedload(MemberMinistry.ministry)).all()
         
-        return jsonify({
-            'id': member.id,
-            'first_name': member.first_name,
-            'last_name': member.last_name,
-            'full_name': member.full_name,
-            'email': member.email,
-            'phone': member.phone,
-            'date_of_birth': member.date_of_birth.isoformat() if member.date_of_birth else None,
-            'address': member.address,
-            'gender': member.gender,
-            'marital_status': member.marital_status,
-            'baptism_date': member.baptism_date.isoformat() if member.baptism_date else None,
-            'membership_date': member.membership_date.isoformat() if member.membership_date else None,
-            'is_active': member.is_active,
-            'notes': member.notes,
-            'created_at': member.created_at.isoformat() if member.created_at else None,
-            'updated_at': member.updated_at.isoformat() if member.updated_at else None,
-            'ministry_assignments': [{
-                'id': assignment.id,
-                'ministry_id': assignment.ministry_id,
-                'ministry_name': assignment.ministry.name if assignment.ministry else None,
-                'role': assignment.role,
-                'start_date': assignment.start_date.isoformat() if assignment.start_date else None,
-                'end_date': assignment.end_date.isoformat() if assignment.end_date else None,
-                'is_active': assignment.is_active
-            } for assignment in assignments]
-        })
+        return jsonify(serialize_member(member, assignments))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _parse_member_date(value):
+    if value:
+        try:
+            return datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except:
+            pass
+    return None
+
+def _new_member_values(data):
+    """Column values of a member created from a request body"""
+    return {
+        'first_name': data.get('first_name', ''),
+        'last_name': data.get('last_name', ''),
+        'email': data.get('email'),
+        'phone': data.get('phone'),
+        'date_of_birth': _parse_member_date(data.get('date_of_birth')),
+        'address': data.get('address'),
+        'gender': data.get('gender'),
+        'marital_status': data.get('marital_status'),
+        'baptism_date': _parse_member_date(data.get('baptism_date')),
+        'is_active': data.get('is_active', True),
+        'notes': data.get('notes')
+    }
+
 @church_member_bp.route('/', methods=['POST'])
-@jwt_required()
+@admin_required
 def create_church_member():
     """Create a new church member"""
     from models.church_member import ChurchMember
     
-    if not is_admin():
-        return jsonify({'msg': 'Admins only'}), 403
-    
     try:
         data = request.json
         
-        # Parse dates
-        date_of_birth = None
-        if data.get('date_of_birth'):
-            try:
-                date_of_birth = datetime.fromisoformat(data['date_of_birth'].replace('Z', '+00:00'))
-            except:
-                pass
-        
-        baptism_date = None
-        if data.get('baptism_date'):
-            try:
-                baptism_date = datetime.fromisoformat(data['baptism_date'].replace('Z', '+00:00'))
-            except:
-                pass
-        
-        member = ChurchMember(
-            first_name=data.get('first_name', ''),
-            last_name=data.get('last_name', ''),
-            email=data.get('email'),
-            phone=data.get('phone'),
-            date_of_birth=date_of_birth,
-            address=data.get('address'),
-            gender=data.get('gender'),
-            marital_status=data.get('marital_status'),
-            baptism_date=baptism_date,
-            is_active=data.get('is_active', True),
-            notes=data.get('notes')
-        )
+        member = ChurchMember(**_new_member_values(data))
         
         db.session.add(member)
         db.session.commit()
+        invalidate_member_count_cache()
         
         return jsonify({
             'msg': 'Church member created successfully',
@@ -192,14 +305,11 @@ def create_church_member():
         return jsonify({'error': str(e)}), 500
 
 @church_member_bp.route('/<int:member_id>', methods=['PUT'])
-@jwt_required()
+@admin_required
 def update_church_member(member_id):
     """Update a church member"""
     from models.church_member import ChurchMember
     
-    if not is_admin():
-        return jsonify({'msg': 'Admins only'}), 403
-    
     try:
         member = ChurchMember.query.get_or_404(member_id)
         data = request.json
@@ -239,6 +349,7 @@ def update_church_member(member_id):
         
         member.updated_at = datetime.utcnow()
         db.session.commit()
+        invalidate_member_count_cache()
         
         return jsonify({'msg': 'Church member updated successfully'})
     except Exception as e:
@@ -246,18 +357,16 @@ def update_church_member(member_id):
         return jsonify({'error': str(e)}), 500
 
 @church_member_bp.route('/<int:member_id>', methods=['DELETE'])
-@jwt_required()
+@admin_required
 def delete_church_member(member_id):
     """Delete a church member"""
     from models.church_member import ChurchMember
     
-    if not is_admin():
-        return jsonify({'msg': 'Admins only'}), 403
-    
     try:
         member = ChurchMember.query.get_or_404(member_id)
         db.session.delete(member)
         db.session.commit()
+        invalidate_member_count_cache()
         
         return jsonify({'msg': 'Church member deleted successfully'})
     except Exception as e:
@@ -266,14 +375,11 @@ def delete_church_member(member_id):
 
 # Ministry Assignment endpoints
 @church_member_bp.route('/<int:member_id>/ministries', methods=['POST'])
-@jwt_required()
+@admin_required
 def assign_ministry(member_id):
     """Assign a member to a ministry"""
     from models.church_member import ChurchMember, MemberMinistry
     
-    if not is_admin():
-        return jsonify({'msg': 'Admins only'}), 403
-    
     try:
         member = ChurchMember.query.get_or_404(member_id)
         data = request.json
@@ -287,6 +393,7 @@ def assign_ministry(member_id):
         
         db.session.add(assignment)
         db.session.commit()
+        invalidate_member_count_cache()
         
         return jsonify({'msg': 'Ministry assignment created successfully'})
     except Exception as e:
@@ -294,184 +401,497 @@ def assign_ministry(member_id):
         return jsonify({'error': str(e)}), 500
 
 @church_member_bp.route('/<int:member_id>/ministries/<int:assignment_id>', methods=['DELETE'])
-@jwt_required()
+@admin_required
 def remove_ministry_assignment(member_id, assignment_id):
     """Remove a ministry assignment"""
     from models.church_member import MemberMinistry
     
-    if not is_admin():
-        return jsonify({'msg': 'Admins only'}), 403
-    
     try:
         assignment = MemberMinistry.query.get_or_404(assignment_id)
         assignment.is_active = False
         assignment.end_date = datetime.utcnow()
         db.session.commit()
+        invalidate_member_count_cache()
         
         return jsonify({'msg': 'Ministry assignment removed successfully'})
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
-@church_member_bp.route('/export-pdf', methods=['GET'])
-@jwt_required()
-def export_members_pdf():
-    """Export church members to PDF"""
+# Bulk endpoints: one set-based statement per step, all in one transaction.
+# They bypass the ORM, so member search terms are written here rather than by
+# the ChurchMember mapper events.
+
+def _chunks(values, size=1000):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+def _bulk_member_conditions():
+    """WHERE conditions on church_member for the members selected by a bulk request body; raises ValueError
+    
+    Each condition is applied in its own statement: explicit ids become one IN
+    list per chunk, a filter becomes a single id IN (SELECT ...) over the
+    listing query, so the database resolves it and no ids are loaded here.
+    """
+    from models.church_member import ChurchMember
+    
+    ids, filters = bulk_selection(request.get_json(silent=True), MEMBER_FILTER_KEYS)
+    if ids is not None:
+        return [ChurchMember.id.in_(chunk) for chunk in _chunks(ids)]
+    # Read through the listing filters, so a bulk action hits exactly the members the admin sees
+    args = MultiDict({key: str(value).lower() if isinstance(value, bool) else str(value)
+                      for key, value in filters.items() if value is not None})
+    selected = build_member_query(member_filters_from_args(args)).with_entities(ChurchMember.id).subquery()
+    # Through a derived table, as MySQL cannot otherwise update church_member from a subquery on itself
+    return [ChurchMember.id.in_(select(selected.c.id))]
+
+@church_member_bp.route('/bulk', methods=['POST'])
+@admin_required
+def bulk_create_church_members():
+    """Create many members in one transaction
+    
+    Body: {"members": [{...}, ...]} with the fields of POST /. Either every
+    member is created or none is. Returns the number created and their ids.
+    """
+    from models.church_member import ChurchMember, MemberSearchTerm
+    
+    data = request.get_json(silent=True)
+    members = data.get('members') if isinstance(data, dict) else None
+    if not isinstance(members, list) or not members or not all(isinstance(m, dict) for m in members):
+        return jsonify({'error': "'members' must be a non-empty list of objects"}), 400
+    if len(members) > MAX_BULK_ITEMS:
+        return jsonify({'error': f"At most {MAX_BULK_ITEMS} members per request"}), 400
+    
+    rows = [_new_member_values(member) for member in members]
+    emails = [row['email'] for row in rows if row['email']]
+    duplicates = sorted(email for email, count in Counter(emails).items() if count > 1)
+    if duplicates:
+        return jsonify({'error': 'Duplicate emails in request', 'emails': duplicates}), 400
+    
+    try:
+        existing = [email for chunk in _chunks(emails) for email, in
+                    db.session.query(ChurchMember.email).filter(ChurchMember.email.in_(chunk))]
+        if existing:
+            return jsonify({'error': 'Members with these emails already exist', 'emails': sorted(existing)}), 409
+        
+        table = ChurchMember.__table__
+        connection = db.session.connection()
+        searchable = [table.c.first_name, table.c.last_name, table.c.email, table.c.phone]
+        if connection.dialect.insert_executemany_returning:
+            # Multi-row INSERT ... RETURNING; the returned columns say which terms belong to which id
+            created = connection.execute(insert(table).returning(table.c.id, *searchable), rows).all()
+        else:
+            # MySQL has no RETURNING; the ids come from one INSERT per member, still in this transaction
+            created = [
+                (connection.execute(insert(table), [row]).inserted_primary_key[0],
+                 row['first_name'], row['last_name'], row['email'], row['phone'])
+                for row in rows
+            ]
+        
+        terms = [
+            {'member_id': member_id, 'term': term}
+            for member_id, first_name, last_name, email, phone in created
+            for term in member_search_terms(first_name, last_name, email, phone)
+        ]
+        if terms:
+            connection.execute(MemberSearchTerm.__table__.insert(), terms)
+        db.session.commit()
+        invalidate_member_count_cache()
+        
+        return jsonify({'created': len(created), 'ids': sorted(member_id for member_id, *_ in created)}), 201
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@church_member_bp.route('/bulk/status', methods=['POST'])
+@admin_required
+def bulk_set_member_status():
+    """Activate or deactivate the selected members
+    
+    Body: {"is_active": true|false} plus {"ids": [...]} or {"filter": {...}}
+    with the listing filters. Returns the number of members that changed.
+    """
+    from models.church_member import ChurchMember
+    
+    is_active = (request.get_json(silent=True) or {}).get('is_active')
+    if not isinstance(is_active, bool):
+        return jsonify({'error': "'is_active' must be true or false"}), 400
+    try:
+        conditions = _bulk_member_conditions()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        updated = 0
+        for condition in conditions:
+            result = db.session.execute(
+                update(ChurchMember)
+                .where(condition, or_(ChurchMember.is_active != is_active, ChurchMember.is_active.is_(None)))
+                .values(is_active=is_active, updated_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+            updated += result.rowcount
+        db.session.commit()
+        invalidate_member_count_cache()
+        
+        return jsonify({'updated': updated})
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@church_member_bp.route('/bulk/ministries', methods=['POST'])
+@admin_required
+def bulk_assign_ministry():
+    """Assign the selected members to a ministry
+    
+    Body: {"ministry_id": ..., "role": ...} plus {"ids": [...]} or
+    {"filter": {...}}. Members already active in the ministry are left as
+    they are. Returns the number of assignments created and skipped.
+    """
     from models.church_member import ChurchMember, MemberMinistry
+    from models.ministry import Ministry
+    
+    data = request.get_json(silent=True) or {}
+    ministry_id = data.get('ministry_id')
+    if not isinstance(ministry_id, int) or isinstance(ministry_id, bool):
+        return jsonify({'error': "'ministry_id' must be an integer"}), 400
+    try:
+        conditions = _bulk_member_conditions()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        if db.session.get(Ministry, ministry_id) is None:
+            return jsonify({'error': 'Ministry not found'}), 404
+        
+        now = datetime.utcnow()
+        table = MemberMinistry.__table__
+        values = {'ministry_id': ministry_id, 'role': data.get('role'), 'is_active': True,
+                  'start_date': now, 'created_at': now, 'updated_at': now}
+        assigned_already = select(MemberMinistry.id).where(
+            MemberMinistry.member_id == ChurchMember.id,
+            MemberMinistry.ministry_id == ministry_id,
+            MemberMinistry.is_active == True
+        ).exists()
+        
+        assigned, already_assigned = 0, 0
+        for condition in conditions:
+            already_assigned += db.session.query(func.count(ChurchMember.id)) \
+                .filter(condition, assigned_already).scalar()
+            # INSERT ... SELECT of the selected members not yet active in the ministry
+            result = db.session.execute(insert(table).from_select(
+                ['member_id', *values],
+                select(ChurchMember.id, *[literal(value, table.c[name].type) for name, value in values.items()])
+                .where(condition, ~assigned_already)
+            ))
+            assigned += result.rowcount
+        db.session.commit()
+        invalidate_member_count_cache()
+        
+        return jsonify({'assigned': assigned, 'already_assigned': already_assigned})
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+def _member_export_row(member):
+    """Plain-text columns shared by the PDF and CSV exports"""
+    ministry_names = [
+        f"{assignment.ministry.name} ({assignment.role})"
+        for assignment in member.active_ministry_assignments if assignment.ministry
+    ]
+    return {
+        'name': member.full_name,
+        'email': member.email or '',
+        'phone': member.phone or '',
+        'gender': member.gender or "N/A",
+        'status': "Active" if member.is_active else "Inactive",
+        'ministries': ", ".join(ministry_names) if ministry_names else "None"
+    }
+
+def _member_filter_description(filters):
+    """Human readable summary of the active filters for export headers"""
+    filter_info = []
+    if filters['ministry_id']:
+        from models.ministry import Ministry
+        ministry = Ministry.query.get(filters['ministry_id'])
+        if ministry:
+            filter_info.append(f"Ministry: {ministry.name}")
+    if filters['gender']:
+        filter_info.append(f"Gender: {filters['gender']}")
+    if filters['marital_status']:
+        filter_info.append(f"Marital Status: {filters['marital_status']}")
+    if filters['is_active'] is not None:
+        filter_info.append(f"Status: {'Active' if filters['is_active'] else 'Inactive'}")
+    if filters['search']:
+        filter_info.append(f"Search: {filters['search']}")
+    return " | ".join(filter_info)
+
+def _draw_pdf_pages(canv, new_frame, batches):
+    """Lay out lists of flowables from batches on canv, page by page; returns the page count
+    
+    Each list is drawn into the current frame (splitting tables across pages)
+    before the next one is pulled, so only the current batch is held.
+    """
+    from reportlab.platypus.doctemplate import LayoutError
+    
+    frame, pages, fresh = new_frame(), 1, True
+    for flowables in batches:
+        flowables = list(flowables)
+        while flowables:
+            flowable = flowables.pop(0)
+            if not frame.add(flowable, canv, trySplit=1):
+                parts = frame.split(flowable, canv)
+                if parts and frame.add(parts[0], canv, trySplit=1):
+                    flowables[:0] = parts[1:]
+                elif fresh:
+                    raise LayoutError(f"{flowable.__class__.__name__} does not fit on an empty page")
+                else:
+                    canv.showPage()
+                    frame, pages, fresh = new_frame(), pages + 1, True
+                    flowables.insert(0, flowable)
+                    continue
+            fresh = False
+    canv.showPage()
+    canv.save()
+    return pages
+
+def build_members_pdf(filters, output_path):
+    """Render the membership report for filters into a PDF file at output_path
+    
+    Members are fetched EXPORT_BATCH_SIZE at a time and laid out as page-sized
+    tables with a repeated header row. Each batch is drawn onto the canvas
+    before the next is fetched, so memory is bounded by the batch, not the report.
+    """
+    from models.church_member import ChurchMember
     from reportlab.lib.pagesizes import letter
-    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+    from reportlab.pdfgen.canvas import Canvas
+    from reportlab.platypus import Frame, Table, TableStyle, Paragraph, Spacer
     from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
     from reportlab.lib.units import inch
     from reportlab.lib import colors
-    from io import BytesIO
+    
+    query = build_member_query(filters)
+    total = query.with_entities(func.count(ChurchMember.id)).order_by(None).scalar()
+    
+    canv = Canvas(output_path, pagesize=letter)
+    width, height = letter
+    elements = []
+    
+    # Title
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=16,
+        spaceAfter=30,
+        alignment=1  # Center alignment
+    )
+    
+    title = Paragraph("Deliverance Church International - Kajuki<br/>Church Members Report", title_style)
+    elements.append(title)
+    elements.append(Spacer(1, 20))
+    
+    # Filter information
+    filter_text = _member_filter_description(filters)
+    if filter_text:
+        filter_para = Paragraph(f"<b>Filters:</b> {filter_text}", styles['Normal'])
+        elements.append(filter_para)
+        elements.append(Spacer(1, 20))
+    
+    # Summary
+    summary_para = Paragraph(f"<b>Total Members:</b> {total}", styles['Normal'])
+    elements.append(summary_para)
+    elements.append(Spacer(1, 20))
+    
+    table_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ])
+    header = ['Name', 'Contact', 'Gender', 'Status', 'Ministries']
+    col_widths = [2*inch, 2*inch, 1*inch, 1*inch, 2*inch]
+    
+    def member_tables():
+        # Plain strings keep each table cheap to lay out
+        has_rows = False
+        for batch in _iter_member_batches(query):
+            rows = []
+            for member in batch:
+                row = _member_export_row(member)
+                contact_text = "\n".join(c for c in (row['email'], row['phone']) if c) or "N/A"
+                rows.append([row['name'], contact_text, row['gender'], row['status'], row['ministries']])
+            tables = []
+            for chunk in _chunks(rows, EXPORT_PDF_TABLE_ROWS):
+                table = Table([header] + chunk, colWidths=col_widths, repeatRows=1)
+                table.setStyle(table_style)
+                tables.append(table)
+            has_rows = True
+            yield tables
+        
+        if not has_rows:
+            table = Table([header], colWidths=col_widths)
+            table.setStyle(table_style)
+            yield [table]
+    
+    # Build PDF, with the one inch margins SimpleDocTemplate would use
+    def new_frame():
+        return Frame(inch, inch, width - 2*inch, height - 2*inch)
+    
+    _draw_pdf_pages(canv, new_frame, chain([elements], member_tables()))
+    return total
+
+def _send_export_file(build, filters, extension, mimetype):
+    """Run build(filters, path) into a temp file and send it as an attachment"""
+    import os
+    import tempfile
     from flask import send_file
     
-    if not is_admin():
-        return jsonify({'msg': 'Admins only'}), 403
+    # Render into a temp file so the export is never held in memory as a whole
+    fd, path = tempfile.mkstemp(suffix=f'.{extension}', prefix='church_members_')
+    os.close(fd)
+    try:
+        build(filters, path)
+    except Exception:
+        os.remove(path)
+        raise
+    
+    # Generate filename
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"church_members_{timestamp}.{extension}"
     
+    # Unlink the temp file once it is open; it disappears when the response closes it
+    export_file = open(path, 'rb')
+    os.remove(path)
+    
+    return send_file(
+        export_file,
+        as_attachment=True,
+        download_name=filename,
+        mimetype=mimetype
+    )
+
+@church_member_bp.route('/export-pdf', methods=['GET'])
+@admin_required
+def export_members_pdf():
+    """Export church members to PDF"""
     try:
-        # Get query parameters for filtering
-        ministry_id = request.args.get('ministry_id', type=int)
-        gender = request.args.get('gender')
-        marital_status = request.args.get('marital_status')
-        is_active = request.args.get('is_active', type=lambda v: v.lower() == 'true' if v else None)
-        search = request.args.get('search')
-        
-        # Apply same filtering logic as get_church_members
-        query = ChurchMember.query
-        
-        if ministry_id:
-            member_ids = db.session.query(MemberMinistry.member_id).filter(
-                MemberMinistry.ministry_id == ministry_id,
-                MemberMinistry.is_active == True
-            ).subquery()
-            query = query.filter(ChurchMember.id.in_(member_ids))
-        
-        if gender:
-            query = query.filter(ChurchMember.gender == gender)
-        
-        if marital_status:
-            query = query.filter(ChurchMember.marital_status == marital_status)
-        
-        if is_active is not None:
-            query = query.filter(ChurchMember.is_active == is_active)
-        
-        if search:
-            search_term = f"%{search}%"
-            query = query.filter(
-                db.or_(
-                    ChurchMember.first_name.ilike(search_term),
-                    ChurchMember.last_name.ilike(search_term),
-                    ChurchMember.email.ilike(search_term),
-                    ChurchMember.phone.ilike(search_term)
-                )
-            )
-        
-        members = query.all()
-        
-        # Create PDF
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter)
-        elements = []
-        
-        # Title
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=16,
-            spaceAfter=30,
-            alignment=1  # Center alignment
-        )
-        
-        title = Paragraph("Deliverance Church International - Kajuki<br/>Church Members Report", title_style)
-        elements.append(title)
-        elements.append(Spacer(1, 20))
-        
-        # Filter information
-        filter_info = []
-        if ministry_id:
-            from models.ministry import Ministry
-            ministry = Ministry.query.get(ministry_id)
-            if ministry:
-                filter_info.append(f"Ministry: {ministry.name}")
-        if gender:
-            filter_info.append(f"Gender: {gender}")
-        if marital_status:
-            filter_info.append(f"Marital Status: {marital_status}")
-        if is_active is not None:
-            filter_info.append(f"Status: {'Active' if is_active else 'Inactive'}")
-        if search:
-            filter_info.append(f"Search: {search}")
-        
-        if filter_info:
-            filter_text = " | ".join(filter_info)
-            filter_para = Paragraph(f"<b>Filters:</b> {filter_text}", styles['Normal'])
-            elements.append(filter_para)
-            elements.append(Spacer(1, 20))
-        
-        # Summary
-        summary_para = Paragraph(f"<b>Total Members:</b> {len(members)}", styles['Normal'])
-        elements.append(summary_para)
-        elements.append(Spacer(1, 20))
-        
-        # Table data
-        data = [['Name', 'Contact', 'Gender', 'Status', 'Ministries']]
-        
-        for member in members:
-            # Get ministry assignments
-            assignments = MemberMinistry.query.filter_by(member_id=member.id, is_active=True).all()
-            ministry_names = [f"{assignment.ministry.name} ({assignment.role})" for assignment in assignments if assignment.ministry]
-            ministries_text = ", ".join(ministry_names) if ministry_names else "None"
-            
-            # Contact info
-            contact_info = []
-            if member.email:
-                contact_info.append(member.email)
-            if member.phone:
-                contact_info.append(member.phone)
-            contact_text = "<br/>".join(contact_info) if contact_info else "N/A"
-            
-            data.append([
-                member.full_name,
-                contact_text,
-                member.gender or "N/A",
-                "Active" if member.is_active else "Inactive",
-                ministries_text
-            ])
-        
-        # Create table
-        table = Table(data, colWidths=[2*inch, 2*inch, 1*inch, 1*inch, 2*inch])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ]))
-        
-        elements.append(table)
-        
-        # Build PDF
-        doc.build(elements)
+        return _send_export_file(build_members_pdf, member_filters_from_args(), 'pdf', 'application/pdf')
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def iter_members_csv(filters):
+    """Yield the membership CSV for filters one row at a time"""
+    import csv
+    from io import StringIO
+    
+    query = build_member_query(filters)
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    
+    def flush():
+        value = buffer.getvalue()
         buffer.seek(0)
-        
-        # Generate filename
-        from datetime import datetime
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"church_members_{timestamp}.pdf"
-        
-        return send_file(
-            buffer,
-            as_attachment=True,
-            download_name=filename,
-            mimetype='application/pdf'
+        buffer.truncate(0)
+        return value
+    
+    writer.writerow(EXPORT_COLUMNS)
+    yield flush()
+    
+    for batch in _iter_member_batches(query):
+        for member in batch:
+            writer.writerow(list(_member_export_row(member).values()))
+            yield flush()
+
+@church_member_bp.route('/export-csv', methods=['GET'])
+@admin_required
+def export_members_csv():
+    """Export church members to CSV, streamed row by row"""
+    from flask import Response, stream_with_context
+    
+    filters = member_filters_from_args()
+    
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"church_members_{timestamp}.csv"
+    
+    return Response(
+        stream_with_context(iter_members_csv(filters)),
+        mimetype='text/csv',
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+def build_members_xlsx(filters, output_path):
+    """Write the membership spreadsheet for filters to output_path
+    
+    openpyxl's write-only workbook spools rows to disk as they are appended,
+    so memory is bounded by the member batch, not the sheet.
+    """
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        raise RuntimeError("XLSX export requires the openpyxl package (pip install openpyxl)")
+    
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Members')
+    sheet.append(EXPORT_COLUMNS)
+    for batch in _iter_member_batches(build_member_query(filters)):
+        for member in batch:
+            sheet.append(list(_member_export_row(member).values()))
+    workbook.save(output_path)
+
+@church_member_bp.route('/export-xlsx', methods=['GET'])
+@admin_required
+def export_members_xlsx():
+    """Export church members to an Excel workbook"""
+    try:
+        return _send_export_file(build_members_xlsx, member_filters_from_args(), 'xlsx', XLSX_MIMETYPE)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@register_job('members_pdf', extension='pdf', mimetype='application/pdf')
+def members_pdf_job(params, output_path):
+    build_members_pdf(params['filters'], output_path)
+
+@register_job('members_csv', extension='csv', mimetype='text/csv')
+def members_csv_job(params, output_path):
+    with open(output_path, 'w', newline='') as f:
+        for chunk in iter_members_csv(params['filters']):
+            f.write(chunk)
+
+@register_job('members_xlsx', extension='xlsx', mimetype=XLSX_MIMETYPE)
+def members_xlsx_job(params, output_path):
+    build_members_xlsx(params['filters'], output_path)
+
+@church_member_bp.route('/export-jobs', methods=['POST'])
+@admin_required
+def create_export_job():
+    """Queue a PDF, CSV or XLSX export in the background and return the job id
+    
+    Accepts the same filter query parameters as the listing plus format=pdf|csv|xlsx.
+    Poll /api/jobs/<job_id> and download from /api/jobs/<job_id>/download.
+    """
+    
+    export_format = request.args.get('format', 'pdf')
+    if export_format not in ('pdf', 'csv', 'xlsx'):
+        return jsonify({'error': 'format must be pdf, csv or xlsx'}), 400
+    
+    try:
+        user_info = parse_jwt_identity()
+        job_id = enqueue_job(
+            f'members_{export_format}',
+            {'filters': member_filters_from_args()},
+            created_by=user_info['id'] if user_info else None
         )
-        
+        return jsonify({
+            'msg': 'Export queued',
+            'job_id': job_id,
+            'status_url': f'/api/jobs/{job_id}'
+        }), 202
     except Exception as e:
-        return jsonify({'error': str(e)}), 500 
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
@@ -1,147 +1,212 @@
 from flask import Blueprint, request, jsonify
+from sqlalchemy import and_, or_, delete, update
+from collections import Counter
 from extensions import db
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from datetime import datetime
-from utils.utils import parse_jwt_identity
+from datetime import datetime, timezone
+from utils.utils import admin_required, bulk_selection
+from utils.rate_limit import rate_limited
+from utils.form_ingest import SubmissionInvalid, form_payload, submit_form
 
 contact_bp = Blueprint('contact_controller', __name__)
 
+@contact_bp.errorhandler(SubmissionInvalid)
+def invalid_submission(error):
+    return jsonify({'msg': str(error)}), 400
+
 @contact_bp.route('/contact', methods=['POST'])
+@rate_limited('forms')
 def submit_contact():
     """Public endpoint to submit contact form without authentication"""
-    from models.form_submission import FormSubmission
-    data = request.json
-    form_submission = FormSubmission(
-        form_type='contact',
+    data = form_payload()
+    submit_form(
+        'contact', data,
         name=data.get('name'),
         email=data.get('email'),
         phone=data.get('phone'),
-        message=data.get('message'),
-        additional_data=data
+        message=data.get('message')
     )
-    db.session.add(form_submission)
-    db.session.commit()
     return jsonify({'msg': 'Contact form submitted successfully'})
 
 @contact_bp.route('/prayer-request', methods=['POST'])
+@rate_limited('forms')
 def submit_prayer_request():
     """Public endpoint to submit prayer request without authentication"""
-    from models.form_submission import FormSubmission
-    data = request.json
-    form_submission = FormSubmission(
-        form_type='prayer_request',
+    data = form_payload()
+    submit_form(
+        'prayer_request', data,
         name=data.get('name'),
         email=data.get('email'),
         phone=data.get('phone'),
-        message=data.get('prayer_request'),
-        additional_data=data
+        message=data.get('prayer_request')
     )
-    db.session.add(form_submission)
-    db.session.commit()
     return jsonify({'msg': 'Prayer request submitted successfully'})
 
 @contact_bp.route('/pastoral-care', methods=['POST'])
+@rate_limited('forms')
 def submit_pastoral_care():
     """Public endpoint to submit pastoral care request without authentication"""
-    from models.form_submission import FormSubmission
-    data = request.json
-    form_submission = FormSubmission(
-        form_type='pastoral_care',
+    data = form_payload()
+    submit_form(
+        'pastoral_care', data,
         name=data.get('name'),
         email=data.get('email'),
         phone=data.get('phone'),
-        message=data.get('request'),
-        additional_data=data
+        message=data.get('request')
     )
-    db.session.add(form_submission)
-    db.session.commit()
     return jsonify({'msg': 'Pastoral care request submitted successfully'})
 
 @contact_bp.route('/crisis-counselling', methods=['POST'])
+@rate_limited('forms')
 def submit_crisis_counselling():
     """Public endpoint to submit crisis counselling request without authentication"""
-    from models.form_submission import FormSubmission
-    data = request.json
-    form_submission = FormSubmission(
-        form_type='crisis_counselling',
+    data = form_payload()
+    submit_form(
+        'crisis_counselling', data,
         name=data.get('name'),
         email=data.get('email'),
         phone=data.get('phone'),
-        message=data.get('request'),
-        additional_data=data
+        message=data.get('request')
     )
-    db.session.add(form_submission)
-    db.session.commit()
     return jsonify({'msg': 'Crisis counselling request submitted successfully'})
 
 @contact_bp.route('/baby-dedication', methods=['POST'])
+@rate_limited('forms')
 def submit_baby_dedication():
     """Public endpoint to submit baby dedication application without authentication"""
-    from models.form_submission import FormSubmission
-    data = request.json
-    form_submission = FormSubmission(
-        form_type='baby_dedication',
+    data = form_payload()
+    submit_form(
+        'baby_dedication', data,
         name=data.get('father_name'),
         email=data.get('email'),
         phone=data.get('father_phone'),
-        message=f"Father: {data.get('father_name')}, Mother: {data.get('mother_name')}, Child: {data.get('child_name')}",
-        additional_data=data
+        message=f"Father: {data.get('father_name')}, Mother: {data.get('mother_name')}, Child: {data.get('child_name')}"
     )
-    db.session.add(form_submission)
-    db.session.commit()
     return jsonify({'msg': 'Baby dedication application submitted successfully'})
 
 @contact_bp.route('/pre-marital', methods=['POST'])
+@rate_limited('forms')
 def submit_pre_marital():
     """Public endpoint to submit pre-marital counselling application without authentication"""
-    from models.form_submission import FormSubmission
-    data = request.json
-    form_submission = FormSubmission(
-        form_type='pre_marital',
+    data = form_payload()
+    submit_form(
+        'pre_marital', data,
         name=data.get('name'),
         email=data.get('email'),
         phone=data.get('phone'),
-        message=f"Partner: {data.get('partner_name')}, Wedding Date: {data.get('wedding_date')}",
-        additional_data=data
+        message=f"Partner: {data.get('partner_name')}, Wedding Date: {data.get('wedding_date')}"
     )
-    db.session.add(form_submission)
-    db.session.commit()
     return jsonify({'msg': 'Pre-marital counselling application submitted successfully'})
 
+def _naive_utc(value):
+    """Parse an ISO timestamp into naive UTC, as timestamps are stored; raises ValueError"""
+    parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+# Columns of the inbox list; the additional_data and data JSON are only sent by the detail view
+INBOX_COLUMNS = ('id', 'form_type', 'name', 'email', 'phone', 'message', 'is_read', 'timestamp')
+
+DEFAULT_PAGE_LIMIT = 50
+MAX_PAGE_LIMIT = 200
+
 @contact_bp.route('/form-submissions', methods=['GET'])
-@jwt_required()
+@admin_required
 def get_form_submissions():
+    """List form submissions, newest first, with optional filters and keyset pagination
+    
+    Query parameters:
+        form_type: only submissions of this type
+        is_read: 'true' or 'false'
+        before_id, before_timestamp: only return submissions older than this one (cursor)
+        limit: page size (max 200); without limit or before_id all matching submissions are returned
+    
+    The cursor for the next page, if any, is returned in the X-Next-Before-Id and
+    X-Next-Before-Timestamp headers. The timestamp keeps the cursor valid when
+    that submission is deleted meanwhile.
+    """
     from models.form_submission import FormSubmission
-    from utils.utils import is_admin
-    if not is_admin():
-        return jsonify({'msg': 'Admins only'}), 403
-    
-    submissions = FormSubmission.query.order_by(FormSubmission.timestamp.desc()).all()
-    return jsonify([{
-        'id': s.id,
-        'form_type': s.form_type,
-        'name': s.name,
-        'email': s.email,
-        'phone': s.phone,
-        'message': s.message,
-        'additional_data': s.additional_data,
-        'is_read': s.is_read,
-        'timestamp': s.timestamp.isoformat() if s.timestamp else None
-    } for s in submissions]) 
+    
+    form_type = request.args.get('form_type')
+    is_read = request.args.get('is_read')
+    before_id = request.args.get('before_id', type=int)
+    before_timestamp = request.args.get('before_timestamp')
+    limit = request.args.get('limit', type=int)
+    if is_read not in (None, 'true', 'false'):
+        return jsonify({'error': "is_read must be 'true' or 'false'"}), 400
+    if before_timestamp is not None:
+        if before_id is None:
+            return jsonify({'error': 'before_timestamp needs before_id'}), 400
+        try:
+            before_timestamp = _naive_utc(before_timestamp)
+        except ValueError:
+            return jsonify({'error': 'before_timestamp must be an ISO timestamp'}), 400
+    
+    query = db.session.query(*[getattr(FormSubmission, column) for column in INBOX_COLUMNS])
+    if form_type:
+        query = query.filter(FormSubmission.form_type == form_type)
+    if is_read is not None:
+        query = query.filter(FormSubmission.is_read == (is_read == 'true'))
+    if before_id is not None:
+        if before_timestamp is None:
+            # A cursor from before X-Next-Before-Timestamp; look the submission up
+            before_timestamp = db.session.query(FormSubmission.timestamp).filter(
+                FormSubmission.id == before_id).scalar()
+        if before_timestamp is not None:
+            # Rows after the cursor in (timestamp, id) order, which the inbox index serves
+            query = query.filter(or_(
+                FormSubmission.timestamp < before_timestamp,
+                and_(FormSubmission.timestamp == before_timestamp, FormSubmission.id < before_id)
+            ))
+        else:
+            # The cursor submission is gone and its time unknown; ids follow arrival order
+            query = query.filter(FormSubmission.id < before_id)
+    query = query.order_by(FormSubmission.timestamp.desc(), FormSubmission.id.desc())
+    
+    paginate = before_id is not None or limit is not None
+    if paginate:
+        limit = min(max(limit or DEFAULT_PAGE_LIMIT, 1), MAX_PAGE_LIMIT)
+        # Fetch one extra row to know whether another page exists
+        rows = query.limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+    else:
+        rows = query.all()
+        has_more = False
+    
+    response = jsonify([
+        dict(row._asdict(), timestamp=row.timestamp.isoformat() if row.timestamp else None) for row in rows
+    ])
+    if has_more:
+        response.headers['X-Next-Before-Id'] = str(rows[-1].id)
+        if rows[-1].timestamp:
+            response.headers['X-Next-Before-Timestamp'] = rows[-1].timestamp.isoformat()
+    return response
+
+@contact_bp.route('/form-submissions/unread-counts', methods=['GET'])
+@admin_required
+def get_unread_counts():
+    """Unread and total submissions per form type, from the counter table"""
+    from models.form_submission import FormSubmissionCounter
+    
+    counters = FormSubmissionCounter.query.order_by(FormSubmissionCounter.form_type).all()
+    return jsonify({
+        'unread': {c.form_type: c.unread for c in counters if c.unread},
+        'total': {c.form_type: c.total for c in counters if c.total},
+        'total_unread': sum(c.unread for c in counters)
+    })
 
 @contact_bp.route('/form-submissions/<int:submission_id>', methods=['GET'])
-@jwt_required()
+@admin_required
 def get_form_submission(submission_id):
     from models.form_submission import FormSubmission
-    from utils.utils import is_admin
-    if not is_admin():
-        return jsonify({'msg': 'Admins only'}), 403
     
     submission = FormSubmission.query.get_or_404(submission_id)
     
-    # Mark as read
-    submission.is_read = True
-    db.session.commit()
+    # Mark as read; viewing a submission that is already read does not write
+    if not submission.is_read:
+        submission.is_read = True
+        db.session.commit()
     
     return jsonify({
         'id': submission.id,
@@ -156,12 +221,9 @@ def get_form_submission(submission_id):
     })
 
 @contact_bp.route('/form-submissions/<int:submission_id>/read', methods=['PUT'])
-@jwt_required()
+@admin_required
 def mark_as_read(submission_id):
     from models.form_submission import FormSubmission
-    from utils.utils import is_admin
-    if not is_admin():
-        return jsonify({'msg': 'Admins only'}), 403
     
     submission = FormSubmission.query.get_or_404(submission_id)
     submission.is_read = True
@@ -170,15 +232,108 @@ def mark_as_read(submission_id):
     return jsonify({'msg': 'Submission marked as read'})
 
 @contact_bp.route('/form-submissions/<int:submission_id>', methods=['DELETE'])
-@jwt_required()
+@admin_required
 def delete_form_submission(submission_id):
     from models.form_submission import FormSubmission
-    from utils.utils import is_admin
-    if not is_admin():
-        return jsonify({'msg': 'Admins only'}), 403
     
     submission = FormSubmission.query.get_or_404(submission_id)
     db.session.delete(submission)
     db.session.commit()
     
-    return jsonify({'msg': 'Submission deleted'}) 
\ No newline at end of file
+    return jsonify({'msg': 'Submission deleted'})
+
+# Bulk actions take {"ids": [...]} or {"filter": {...}} with these keys
+SUBMISSION_FILTER_KEYS = ('form_type', 'is_read', 'before')
+
+def _read_state(is_read):
+    """Condition for read or unread submissions; a NULL read state is unread, as in the counters"""
+    from models.form_submission import FormSubmission
+    
+    if is_read:
+        return FormSubmission.is_read == True
+    return or_(FormSubmission.is_read == False, FormSubmission.is_read.is_(None))
+
+def _bulk_submission_conditions():
+    """WHERE conditions for the submissions selected by a bulk request body; raises ValueError"""
+    from models.form_submission import FormSubmission
+    
+    ids, filters = bulk_selection(request.get_json(silent=True), SUBMISSION_FILTER_KEYS)
+    if ids is not None:
+        return [FormSubmission.id.in_(ids)]
+    conditions = []
+    if filters.get('form_type'):
+        conditions.append(FormSubmission.form_type == filters['form_type'])
+    if 'is_read' in filters:
+        if not isinstance(filters['is_read'], bool):
+            raise ValueError("'is_read' must be true or false")
+        conditions.append(_read_state(filters['is_read']))
+    if filters.get('before'):
+        # Submissions received before this ISO timestamp
+        conditions.append(FormSubmission.timestamp < _naive_utc(filters['before']))
+    return conditions
+
+def _form_types(conditions):
+    """Form types present among the selected submissions; each is updated on its own so the counters stay exact"""
+    from models.form_submission import FormSubmission
+    
+    return [form_type for form_type, in db.session.query(FormSubmission.form_type).filter(*conditions).distinct()]
+
+@contact_bp.route('/form-submissions/bulk/read', methods=['POST'])
+@admin_required
+def bulk_mark_as_read():
+    """Mark the selected submissions read in one transaction and return how many changed"""
+    from models.form_submission import FormSubmission, record_submission_counts
+    
+    try:
+        conditions = _bulk_submission_conditions()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        unread = Counter()
+        conditions.append(_read_state(False))
+        for form_type in _form_types(conditions):
+            result = db.session.execute(
+                update(FormSubmission).where(*conditions, FormSubmission.form_type == form_type)
+                .values(is_read=True).execution_options(synchronize_session=False)
+            )
+            unread[form_type] -= result.rowcount
+        record_submission_counts(db.session.connection(), Counter(), unread)
+        db.session.commit()
+        
+        return jsonify({'updated': -sum(unread.values())})
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@contact_bp.route('/form-submissions/bulk/delete', methods=['POST'])
+@admin_required
+def bulk_delete_form_submissions():
+    """Delete the selected submissions in one transaction and return how many were deleted"""
+    from models.form_submission import FormSubmission, record_submission_counts
+    
+    try:
+        conditions = _bulk_submission_conditions()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        total, unread = Counter(), Counter()
+        for form_type in _form_types(conditions):
+            # Unread and read rows separately, so the unread counter learns how many of each went
+            for is_read in (False, True):
+                result = db.session.execute(
+                    delete(FormSubmission).where(
+                        *conditions, FormSubmission.form_type == form_type, _read_state(is_read)
+                    ).execution_options(synchronize_session=False)
+                )
+                total[form_type] -= result.rowcount
+                if not is_read:
+                    unread[form_type] -= result.rowcount
+        record_submission_counts(db.session.connection(), total, unread)
+        db.session.commit()
+        
+        return jsonify({'deleted': -sum(total.values())})
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
@@ -2,10 +2,80 @@ from flask import Blueprint, request, jsonify
 from extensions import db
 from flask_jwt_extended import jwt_required
 from datetime import datetime, timedelta
-from sqlalchemy import func
+from sqlalchemy import select, literal, case, cast, String, union_all
+from utils.rollups import read_dashboard_rollups
 
 dashboard_bp = Blueprint('dashboard_controller', __name__)
 
+ACTIVITY_ITEMS_PER_TYPE = 3
+
+def _percent_change(current, previous):
+    """Format the change from previous to current as ('+12%', 'increase')"""
+    if not previous:
+        percent = 100 if current > 0 else 0
+    else:
+        percent = round((current - previous) / abs(previous) * 100)
+    return f"{'+' if percent >= 0 else ''}{percent}%", 'increase' if percent >= 0 else 'decrease'
+
+def _recent_activity_query(today, limit):
+    """Build a UNION ALL of the latest items of each type, ordered and limited in SQL
+    
+    Each branch is limited to ACTIVITY_ITEMS_PER_TYPE rows inside a subquery, and
+    timestamps are cast to strings so DATE and DATETIME columns share one column.
+    """
+    from models.sermon import Sermon
+    from models.event import Event
+    from models.announcement import Announcement
+    from models.devotional import Devotional
+    from models.giving_transaction import GivingTransaction
+    
+    def branch(kind, id_column, title, timestamp, amount=None, where=None, order_by=None):
+        query = select(
+            literal(kind).label('type'),
+            id_column.label('id'),
+            title.label('title'),
+            (amount if amount is not None else literal(None)).label('amount'),
+            cast(timestamp, String).label('timestamp')
+        )
+        if where is not None:
+            query = query.where(where)
+        query = query.order_by(order_by if order_by is not None else timestamp.desc())
+        subquery = query.limit(ACTIVITY_ITEMS_PER_TYPE).subquery()
+        return select(subquery)
+    
+    activity = union_all(
+        branch('sermon', Sermon.id, Sermon.title, Sermon.date),
+        branch('event', Event.id, Event.title, Event.start_date,
+               where=Event.start_date >= today, order_by=Event.start_date.asc()),
+        branch('announcement', Announcement.id, Announcement.title, Announcement.created_at),
+        branch('devotional', Devotional.id, Devotional.title, Devotional.created_at),
+        branch('giving', GivingTransaction.id,
+               case((GivingTransaction.is_anonymous == True, 'Anonymous'), else_=GivingTransaction.donor_name),
+               GivingTransaction.created_at, amount=GivingTransaction.amount)
+    ).subquery()
+    
+    return select(activity).order_by(activity.c.timestamp.desc()).limit(limit)
+
+ACTIVITY_MESSAGES = {
+    'sermon': 'New sermon "{title}" uploaded',
+    'event': 'New event "{title}" created',
+    'announcement': 'New announcement "{title}" posted',
+    'devotional': 'New devotional "{title}" published',
+    'giving': 'Giving received: Ksh {amount:,.0f} from {title}'
+}
+
+def _activity_item(row):
+    timestamp = row.timestamp
+    if timestamp and len(timestamp) > 10:
+        timestamp = datetime.fromisoformat(timestamp).isoformat()
+    return {
+        'id': f'{row.type}_{row.id}',
+        'type': row.type,
+        'message': ACTIVITY_MESSAGES[row.type].format(title=row.title, amount=float(row.amount or 0)),
+        'time': timestamp[:10] if timestamp else 'Unknown',
+        'timestamp': timestamp
+    }
+
 @dashboard_bp.route('/stats', methods=['GET'])
 @jwt_required()
 def get_dashboard_stats():
@@ -15,94 +85,38 @@ def get_dashboard_stats():
         from models.sermon import Sermon
         from models.event import Event
         from models.ministry import Ministry
-        from models.giving import Giving
         from models.giving_transaction import GivingTransaction
-        from models.announcement import Announcement
-        from models.devotional import Devotional
         
-        # Get counts
-        sermon_count = Sermon.query.count()
-        event_count = Event.query.filter(Event.start_date >= datetime.now().date()).count()
-        ministry_count = Ministry.query.filter_by(is_active=True).count()
+        today = datetime.now().date()
         
-        # Calculate total giving from actual transactions
-        total_giving_result = db.session.query(func.sum(GivingTransaction.amount)).scalar()
-        total_giving = float(total_giving_result) if total_giving_result else 0.0
+        # Counts, giving totals and month-over-month figures from the rollup table
+        rollups = read_dashboard_rollups(today)
+        sermon_count = int(rollups['all'].get('sermons', 0))
+        event_count = int(rollups['upcoming_events'])
+        ministry_count = int(rollups['all'].get('ministries', 0))
+        total_giving = rollups['all'].get('giving_amount', 0.0)
         
         # Get recent sermons (last 5)
         recent_sermons = Sermon.query.order_by(Sermon.date.desc()).limit(5).all()
         
         # Get upcoming events (next 5)
         upcoming_events = Event.query.filter(
-            Event.start_date >= datetime.now().date()
+            Event.start_date >= today
         ).order_by(Event.start_date.asc()).limit(5).all()
         
-        # Get recent activity (last 10 items)
-        recent_activity = []
-        
-        # Add recent sermons
-        for sermon in recent_sermons[:3]:
-            recent_activity.append({
-                'id': f'sermon_{sermon.id}',
-                'type': 'sermon',
-                'message': f'New sermon "{sermon.title}" uploaded',
-                'time': sermon.date.strftime('%Y-%m-%d'),
-                'timestamp': sermon.date.isoformat()
-            })
-        
-        # Add recent events
-        for event in upcoming_events[:3]:
-            recent_activity.append({
-                'id': f'event_{event.id}',
-                'type': 'event',
-                'message': f'New event "{event.title}" created',
-                'time': event.start_date.strftime('%Y-%m-%d'),
-                'timestamp': event.start_date.isoformat()
-            })
-        
-        # Add recent announcements
-        recent_announcements = Announcement.query.order_by(Announcement.created_at.desc()).limit(3).all()
-        for announcement in recent_announcements:
-            recent_activity.append({
-                'id': f'announcement_{announcement.id}',
-                'type': 'announcement',
-                'message': f'New announcement "{announcement.title}" posted',
-                'time': announcement.created_at.strftime('%Y-%m-%d') if announcement.created_at else 'Unknown',
-                'timestamp': announcement.created_at.isoformat() if announcement.created_at else None
-            })
-        
-        # Add recent devotionals
-        recent_devotionals = Devotional.query.order_by(Devotional.created_at.desc()).limit(3).all()
-        for devotional in recent_devotionals:
-            recent_activity.append({
-                'id': f'devotional_{devotional.id}',
-                'type': 'devotional',
-                'message': f'New devotional "{devotional.title}" published',
-                'time': devotional.created_at.strftime('%Y-%m-%d') if devotional.created_at else 'Unknown',
-                'timestamp': devotional.created_at.isoformat() if devotional.created_at else None
-            })
-        
-        # Add recent giving transactions
-        recent_giving = GivingTransaction.query.order_by(GivingTransaction.created_at.desc()).limit(3).all()
-        for giving in recent_giving:
-            donor_name = "Anonymous" if giving.is_anonymous else giving.donor_name
-            recent_activity.append({
-                'id': f'giving_{giving.id}',
-                'type': 'giving',
-                'message': f'Giving received: Ksh {giving.amount:,.0f} from {donor_name}',
-                'time': giving.created_at.strftime('%Y-%m-%d') if giving.created_at else 'Unknown',
-                'timestamp': giving.created_at.isoformat() if giving.created_at else None
-            })
-        
-        # Sort activity by timestamp
-        recent_activity.sort(key=lambda x: x['timestamp'] or '', reverse=True)
-        recent_activity = recent_activity[:10]
+        # Get recent activity (last 10 items) from one UNION ALL query
+        recent_activity = [_activity_item(row) for row in db.session.execute(_recent_activity_query(today, 10))]
         
-        # Calculate percentage changes based on actual data
-        sermon_change = '+12%' if sermon_count > 0 else '+0%'
-        event_change = '+3%' if event_count > 0 else '+0%'
-        ministry_change = '+2%' if ministry_count > 0 else '+0%'
-        giving_change = '+8%' if total_giving > 0 else '+0%'
+        # Cumulative stats compare this month's additions with the total before them;
+        # flow stats compare this month with last month
+        sermon_change, sermon_change_type = _percent_change(
+            sermon_count, sermon_count - rollups['month'].get('sermons', 0))
+        ministry_change, ministry_change_type = _percent_change(
+            ministry_count, ministry_count - rollups['month'].get('ministries', 0))
+        event_change, event_change_type = _percent_change(
+            rollups['month'].get('events', 0), rollups['previous_month'].get('events', 0))
+        giving_change, giving_change_type = _percent_change(
+            rollups['month'].get('giving_amount', 0), rollups['previous_month'].get('giving_amount', 0))
         
         return jsonify({
             'stats': [
@@ -110,25 +124,25 @@ def get_dashboard_stats():
                     'name': 'Total Sermons',
                     'value': str(sermon_count),
                     'change': sermon_change,
-                    'changeType': 'increase'
+                    'changeType': sermon_change_type
                 },
                 {
                     'name': 'Active Events',
                     'value': str(event_count),
                     'change': event_change,
-                    'changeType': 'increase'
+                    'changeType': event_change_type
                 },
                 {
                     'name': 'Ministries',
                     'value': str(ministry_count),
                     'change': ministry_change,
-                    'changeType': 'increase'
+                    'changeType': ministry_change_type
                 },
                 {
                     'name': 'Total Giving',
                     'value': f'Ksh {total_giving:,.0f}',
                     'change': giving_change,
-                    'changeType': 'increase'
+                    'changeType': giving_change_type
                 }
             ],
             'recent_sermons': [
@@ -148,7 +162,11 @@ def get_dashboard_stats():
                     'attendees': 0  # No attendees tracking in current model
                 } for e in upcoming_events
             ],
-            'recent_activity': recent_activity
+            'recent_activity': recent_activity,
+            'giving_breakdown': {
+                'by_purpose': {k.split(':', 1)[1]: v for k, v in rollups['giving_breakdown'].items() if k.startswith('purpose:')},
+                'by_payment_method': {k.split(':', 1)[1]: v for k, v in rollups['giving_breakdown'].items() if k.startswith('method:')}
+            }
         })
         
     except Exception as e:
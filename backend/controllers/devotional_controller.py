@@ -1,12 +1,15 @@
 from flask import Blueprint, request, jsonify
 from extensions import db
-from flask_jwt_extended import jwt_required
 from datetime import datetime
-from utils.utils import parse_jwt_identity
+from utils.utils import admin_required
+from utils.cache import cached, invalidates_cache
+from utils.http_cache import conditional
 
 devotional_bp = Blueprint('devotional_controller', __name__)
 
 @devotional_bp.route('/', methods=['GET'])
+@conditional('devotionals', 'devotional')
+@cached('devotionals')
 def get_devotionals():
     """Public endpoint to get devotionals without authentication"""
     from models.devotional import Devotional
@@ -24,6 +27,8 @@ def get_devotionals():
 
 @devotional_bp.route('/<int:devotional_id>', methods=['GET'])
 @devotional_bp.route('/<int:devotional_id>/', methods=['GET'])
+@conditional('devotionals', 'devotional')
+@cached('devotionals')
 def get_devotional(devotional_id):
     """Public endpoint to get a single devotional without authentication"""
     from models.devotional import Devotional
@@ -40,12 +45,9 @@ def get_devotional(devotional_id):
     })
 
 @devotional_bp.route('/', methods=['POST'])
-@jwt_required()
+@admin_required
+@invalidates_cache('devotionals')
 def create_devotional():
-    user_info = parse_jwt_identity()
-    if not user_info or not user_info.get('is_admin'):
-        return jsonify({'msg': 'Admins only'}), 403
-    
     from models.devotional import Devotional
     data = request.json
     devotional = Devotional(
@@ -61,12 +63,9 @@ def create_devotional():
 
 @devotional_bp.route('/<int:devotional_id>', methods=['PUT'])
 @devotional_bp.route('/<int:devotional_id>/', methods=['PUT'])
-@jwt_required()
+@admin_required
+@invalidates_cache('devotionals')
 def update_devotional(devotional_id):
-    user_info = parse_jwt_identity()
-    if not user_info or not user_info.get('is_admin'):
-        return jsonify({'msg': 'Admins only'}), 403
-    
     from models.devotional import Devotional
     devotional = Devotional.query.get_or_404(devotional_id)
     data = request.json
@@ -83,12 +82,9 @@ def update_devotional(devotional_id):
 
 @devotional_bp.route('/<int:devotional_id>', methods=['DELETE'])
 @devotional_bp.route('/<int:devotional_id>/', methods=['DELETE'])
-@jwt_required()
+@admin_required
+@invalidates_cache('devotionals')
 def delete_devotional(devotional_id):
-    user_info = parse_jwt_identity()
-    if not user_info or not user_info.get('is_admin'):
-        return jsonify({'msg': 'Admins only'}), 403
-    
     from models.devotional import Devotional
     devotional = Devotional.query.get_or_404(devotional_id)
     devotional.is_active = False
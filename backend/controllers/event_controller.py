@@ -1,13 +1,16 @@
 from flask import Blueprint, request, jsonify
 from extensions import db
-from flask_jwt_extended import jwt_required
 from datetime import datetime
-from utils.utils import is_admin
+from utils.utils import admin_required
+from utils.cache import cached, invalidates_cache
+from utils.http_cache import conditional
 from utils.upload import save_file, delete_file
 
 event_bp = Blueprint('event_controller', __name__)
 
 @event_bp.route('/', methods=['GET'])
+@conditional('events')
+@cached('events')
 def get_events():
     from models.event import Event
     events = Event.query.all()
@@ -26,6 +29,8 @@ def get_events():
 
 @event_bp.route('/<int:event_id>', methods=['GET'])
 @event_bp.route('/<int:event_id>/', methods=['GET'])
+@conditional('events')
+@cached('events')
 def get_event(event_id):
     from models.event import Event
     e = Event.query.get_or_404(event_id)
@@ -43,10 +48,9 @@ def get_event(event_id):
     })
 
 @event_bp.route('/', methods=['POST'])
-@jwt_required()
+@admin_required
+@invalidates_cache('events')
 def create_event():
-    if not is_admin():
-        return jsonify({'msg': 'Admins only'}), 403
     from models.event import Event
     
     # Handle both JSON and FormData
@@ -83,10 +87,9 @@ def create_event():
 
 @event_bp.route('/<int:event_id>', methods=['PUT'])
 @event_bp.route('/<int:event_id>/', methods=['PUT'])
-@jwt_required()
+@admin_required
+@invalidates_cache('events')
 def update_event(event_id):
-    if not is_admin():
-        return jsonify({'msg': 'Admins only'}), 403
     from models.event import Event
     e = Event.query.get_or_404(event_id)
     
@@ -125,10 +128,9 @@ def update_event(event_id):
 
 @event_bp.route('/<int:event_id>', methods=['DELETE'])
 @event_bp.route('/<int:event_id>/', methods=['DELETE'])
-@jwt_required()
+@admin_required
+@invalidates_cache('events')
 def delete_event(event_id):
-    if not is_admin():
-        return jsonify({'msg': 'Admins only'}), 403
     from models.event import Event
     e = Event.query.get_or_404(event_id)
     db.session.delete(e)
@@ -1,8 +1,7 @@
 from flask import Blueprint, request, jsonify
 from extensions import db
-from flask_jwt_extended import jwt_required
 from datetime import datetime
-from utils.utils import parse_jwt_identity
+from utils.utils import admin_required
 
 giving_bp = Blueprint('giving_controller', __name__)
 
@@ -22,14 +21,10 @@ def get_giving_methods():
     } for method in methods])
 
 @giving_bp.route('/admin', methods=['GET'])
-@jwt_required()
+@admin_required
 def get_giving_methods_admin():
     """Admin endpoint to get all giving methods as array"""
     from models.giving import Giving
-    from utils.utils import is_admin
-    
-    if not is_admin():
-        return jsonify({'msg': 'Admins only'}), 403
     
     methods = Giving.query.all()
     return jsonify([{
@@ -58,12 +53,8 @@ def get_giving_method(method_id):
     })
 
 @giving_bp.route('/', methods=['POST'])
-@jwt_required()
+@admin_required
 def create_giving_method():
-    user_info = parse_jwt_identity()
-    if not user_info or not user_info.get('is_admin'):
-        return jsonify({'msg': 'Admins only'}), 403
-    
     from models.giving import Giving
     data = request.json
     method = Giving(
@@ -77,12 +68,8 @@ def create_giving_method():
 
 @giving_bp.route('/<int:method_id>', methods=['PUT'])
 @giving_bp.route('/<int:method_id>/', methods=['PUT'])
-@jwt_required()
+@admin_required
 def update_giving_method(method_id):
-    user_info = parse_jwt_identity()
-    if not user_info or not user_info.get('is_admin'):
-        return jsonify({'msg': 'Admins only'}), 403
-    
     from models.giving import Giving
     method = Giving.query.get_or_404(method_id)
     data = request.json
@@ -97,12 +84,8 @@ def update_giving_method(method_id):
 
 @giving_bp.route('/<int:method_id>', methods=['DELETE'])
 @giving_bp.route('/<int:method_id>/', methods=['DELETE'])
-@jwt_required()
+@admin_required
 def delete_giving_method(method_id):
-    user_info = parse_jwt_identity()
-    if not user_info or not user_info.get('is_admin'):
-        return jsonify({'msg': 'Admins only'}), 403
-    
     from models.giving import Giving
     method = Giving.query.get_or_404(method_id)
     method.is_active = False
@@ -2,7 +2,8 @@ from flask import Blueprint, request, jsonify
 from extensions import db
 from flask_jwt_extended import jwt_required
 from datetime import datetime
-from utils.utils import parse_jwt_identity
+from utils.utils import admin_required
+from utils.rate_limit import rate_limited
 
 giving_transaction_bp = Blueprint('giving_transaction_controller', __name__)
 
@@ -44,6 +45,7 @@ def get_giving_transaction(transaction_id):
     })
 
 @giving_transaction_bp.route('/', methods=['POST'])
+@rate_limited('giving')
 def create_giving_transaction():
     """Public endpoint to create giving transaction without authentication"""
     from models.giving_transaction import GivingTransaction
@@ -63,12 +65,8 @@ def create_giving_transaction():
 
 @giving_transaction_bp.route('/<int:transaction_id>', methods=['PUT'])
 @giving_transaction_bp.route('/<int:transaction_id>/', methods=['PUT'])
-@jwt_required()
+@admin_required
 def update_giving_transaction(transaction_id):
-    user_info = parse_jwt_identity()
-    if not user_info or not user_info.get('is_admin'):
-        return jsonify({'msg': 'Admins only'}), 403
-    
     from models.giving_transaction import GivingTransaction
     transaction = GivingTransaction.query.get_or_404(transaction_id)
     data = request.json
@@ -87,12 +85,8 @@ def update_giving_transaction(transaction_id):
 
 @giving_transaction_bp.route('/<int:transaction_id>', methods=['DELETE'])
 @giving_transaction_bp.route('/<int:transaction_id>/', methods=['DELETE'])
-@jwt_required()
+@admin_required
 def delete_giving_transaction(transaction_id):
-    user_info = parse_jwt_identity()
-    if not user_info or not user_info.get('is_admin'):
-        return jsonify({'msg': 'Admins only'}), 403
-    
     from models.giving_transaction import GivingTransaction
     transaction = GivingTransaction.query.get_or_404(transaction_id)
     db.session.delete(transaction)
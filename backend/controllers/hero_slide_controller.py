@@ -1,12 +1,17 @@
 from flask import Blueprint, request, jsonify
 from extensions import db
-from flask_jwt_extended import jwt_required
 from datetime import datetime
-from utils.utils import parse_jwt_identity
+from utils.utils import admin_required
+from utils.cache import cached, invalidates_cache
+from utils.http_cache import conditional
+from utils.snapshots import snapshot
 
 hero_slide_bp = Blueprint('hero_slide_controller', __name__)
 
 @hero_slide_bp.route('/', methods=['GET'])
+@snapshot('hero-slides')
+@conditional('hero_slides', 'hero_slide')
+@cached('hero_slides')
 def get_hero_slides():
     from models.hero_slide import HeroSlide
     slides = HeroSlide.query.filter_by(is_active=True).order_by(HeroSlide.order_num).all()
@@ -24,6 +29,8 @@ def get_hero_slides():
 
 @hero_slide_bp.route('/<int:slide_id>', methods=['GET'])
 @hero_slide_bp.route('/<int:slide_id>/', methods=['GET'])
+@conditional('hero_slides', 'hero_slide')
+@cached('hero_slides')
 def get_hero_slide(slide_id):
     from models.hero_slide import HeroSlide
     slide = HeroSlide.query.get_or_404(slide_id)
@@ -40,12 +47,9 @@ def get_hero_slide(slide_id):
     })
 
 @hero_slide_bp.route('/', methods=['POST'])
-@jwt_required()
+@admin_required
+@invalidates_cache('hero_slides')
 def create_hero_slide():
-    user_info = parse_jwt_identity()
-    if not user_info or not user_info.get('is_admin'):
-        return jsonify({'msg': 'Admins only'}), 403
-    
     from models.hero_slide import HeroSlide
     from utils.upload import save_file
     
@@ -80,12 +84,9 @@ def create_hero_slide():
 
 @hero_slide_bp.route('/<int:slide_id>', methods=['PUT'])
 @hero_slide_bp.route('/<int:slide_id>/', methods=['PUT'])
-@jwt_required()
+@admin_required
+@invalidates_cache('hero_slides')
 def update_hero_slide(slide_id):
-    user_info = parse_jwt_identity()
-    if not user_info or not user_info.get('is_admin'):
-        return jsonify({'msg': 'Admins only'}), 403
-    
     from models.hero_slide import HeroSlide
     from utils.upload import save_file, delete_file
     
@@ -124,12 +125,9 @@ def update_hero_slide(slide_id):
 
 @hero_slide_bp.route('/<int:slide_id>', methods=['DELETE'])
 @hero_slide_bp.route('/<int:slide_id>/', methods=['DELETE'])
-@jwt_required()
+@admin_required
+@invalidates_cache('hero_slides')
 def delete_hero_slide(slide_id):
-    user_info = parse_jwt_identity()
-    if not user_info or not user_info.get('is_admin'):
-        return jsonify({'msg': 'Admins only'}), 403
-    
     from models.hero_slide import HeroSlide
     slide = HeroSlide.query.get_or_404(slide_id)
     slide.is_active = False
@@ -0,0 +1,75 @@
+from flask import Blueprint, request, jsonify, current_app
+from datetime import date
+import gzip
+import json
+import hashlib
+import inspect
+from utils.cache import cached_bytes, on_invalidate
+
+home_bp = Blueprint('home_controller', __name__)
+
+# Everything the public homepage renders; the bundle is rebuilt whenever one of these is invalidated
+HOME_NAMESPACES = ('hero_slides', 'services', 'events', 'sermons', 'announcements', 'devotionals', 'ministries')
+HOME_EVENT_LIMIT = 6
+HOME_SERMON_LIMIT = 6
+
+def _section(view):
+    """Payload of a public list view, bypassing its response cache and HTTP validators"""
+    return inspect.unwrap(view)().get_json()
+
+def _upcoming_events(events, today):
+    upcoming = [e for e in events if (e['end_date'] or e['start_date']) >= today.isoformat()]
+    upcoming.sort(key=lambda e: (e['start_date'], e['start_time'] or ''))
+    return upcoming[:HOME_EVENT_LIMIT]
+
+def build_home_bundle():
+    """Render the homepage sections to gzip-compressed JSON"""
+    from controllers.hero_slide_controller import get_hero_slides
+    from controllers.service_controller import get_services
+    from controllers.event_controller import get_events
+    from controllers.sermon_controller import get_sermons
+    from controllers.announcement_controller import get_announcements
+    from controllers.devotional_controller import get_devotionals
+    from controllers.ministry_controller import get_ministries
+
+    bundle = {
+        'hero_slides': _section(get_hero_slides),
+        'services': _section(get_services),
+        'events': _upcoming_events(_section(get_events), date.today()),
+        'sermons': _section(get_sermons)[:HOME_SERMON_LIMIT],
+        'announcements': _section(get_announcements),
+        'devotionals': _section(get_devotionals),
+        'ministries': _section(get_ministries)
+    }
+    body = json.dumps(bundle, separators=(',', ':'), sort_keys=True).encode()
+    # mtime=0 keeps the output, and so the ETag, identical across rebuilds and workers
+    return gzip.compress(body, compresslevel=6, mtime=0)
+
+def get_home_bundle(refresh=False):
+    # Keyed by day as well, so upcoming events roll over at midnight
+    return cached_bytes(HOME_NAMESPACES, f"home:{date.today().isoformat()}", build_home_bundle, refresh=refresh)
+
+@on_invalidate(*HOME_NAMESPACES)
+def rebuild_home_bundle():
+    """Precompute the bundle right after an admin write instead of on the next visit"""
+    get_home_bundle(refresh=True)
+
+@home_bp.route('/', methods=['GET'])
+def get_home():
+    """Public endpoint returning every homepage section in one response"""
+    try:
+        compressed = get_home_bundle()
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+    if 'gzip' in request.accept_encodings:
+        response = current_app.response_class(compressed, mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = current_app.response_class(gzip.decompress(compressed), mimetype='application/json')
+    response.vary.add('Accept-Encoding')
+    # Weak because both encodings share it
+    response.set_etag(hashlib.sha1(compressed).hexdigest(), weak=True)
+    response.cache_control.public = True
+    response.cache_control.max_age = current_app.config.get('CACHE_HTTP_MAX_AGE', 60)
+    return response.make_conditional(request)
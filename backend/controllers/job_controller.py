@@ -0,0 +1,51 @@
+from flask import Blueprint, jsonify, send_file
+from utils.utils import admin_required
+from utils.jobs import get_job_queue, get_artifact_path, get_job_mimetype
+
+job_bp = Blueprint('job_controller', __name__)
+
+@job_bp.route('/<job_id>', methods=['GET'])
+@admin_required
+def get_job(job_id):
+    """Poll the status of a background job"""
+    
+    job = get_job_queue().get(job_id)
+    if not job:
+        return jsonify({'msg': 'Job not found'}), 404
+    
+    status = job['status']
+    if status == 'done' and not get_artifact_path(job['artifact']):
+        status = 'expired'
+    
+    return jsonify({
+        'id': job['id'],
+        'kind': job['kind'],
+        'status': status,
+        'error': job['error'],
+        'download_url': f"/api/jobs/{job['id']}/download" if status == 'done' else None,
+        'created_at': job['created_at'].isoformat() if job['created_at'] else None,
+        'started_at': job['started_at'].isoformat() if job['started_at'] else None,
+        'finished_at': job['finished_at'].isoformat() if job['finished_at'] else None
+    })
+
+@job_bp.route('/<job_id>/download', methods=['GET'])
+@admin_required
+def download_job_artifact(job_id):
+    """Download the file produced by a finished job"""
+    
+    job = get_job_queue().get(job_id)
+    if not job:
+        return jsonify({'msg': 'Job not found'}), 404
+    if job['status'] != 'done':
+        return jsonify({'msg': f"Job is {job['status']}"}), 409
+    
+    path = get_artifact_path(job['artifact'])
+    if not path:
+        return jsonify({'msg': 'Export has expired'}), 410
+    
+    return send_file(
+        path,
+        as_attachment=True,
+        download_name=f"{job['kind']}_{job['created_at'].strftime('%Y%m%d_%H%M%S')}.{path.rsplit('.', 1)[-1]}",
+        mimetype=get_job_mimetype(job['kind'])
+    )
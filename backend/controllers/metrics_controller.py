@@ -0,0 +1,30 @@
+from flask import Blueprint, jsonify
+from utils.utils import admin_required
+from utils.pool_metrics import pool_metrics
+from utils.replicas import get_replicas
+from utils.form_ingest import ingest_status
+
+metrics_bp = Blueprint('metrics_controller', __name__)
+
+@metrics_bp.route('/pool', methods=['GET'])
+@admin_required
+def get_pool_metrics():
+    """Connection pool checkout wait, saturation and churn for this worker process"""
+    
+    return jsonify(pool_metrics())
+
+@metrics_bp.route('/replicas', methods=['GET'])
+@admin_required
+def get_replica_status():
+    """Read replicas in rotation, as seen by this worker process"""
+    
+    replicas = get_replicas()
+    return jsonify({'replicas': replicas.status() if replicas is not None else []})
+
+
+@metrics_bp.route('/form-ingest', methods=['GET'])
+@admin_required
+def get_form_ingest_status():
+    """Form submissions accepted, inserted and still waiting in this worker process's log"""
+    
+    return jsonify(ingest_status())
@@ -1,15 +1,22 @@
+import logging
 from flask import Blueprint, request, jsonify
 from extensions import db
-from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
-from utils.utils import is_admin
+from utils.utils import admin_required
+from utils.cache import cached, invalidates_cache
+from utils.http_cache import conditional
+from utils.snapshots import snapshot
 from utils.upload import save_file, delete_file
 
 
+logger = logging.getLogger(__name__)
 
 ministry_bp = Blueprint('ministry_controller', __name__)
 
 @ministry_bp.route('/', methods=['GET'])
+@snapshot('ministries')
+@conditional('ministries', 'ministry')
+@cached('ministries')
 def get_ministries():
     from models.ministry import Ministry
     ministries = Ministry.query.filter_by(is_active=True).order_by(Ministry.order).all()
@@ -32,6 +39,8 @@ def get_ministries():
 
 @ministry_bp.route('/<slug>', methods=['GET'])
 @ministry_bp.route('/<slug>/', methods=['GET'])
+@conditional('ministries', 'ministry')
+@cached('ministries')
 def get_ministry(slug):
     from models.ministry import Ministry
     m = Ministry.query.filter_by(slug=slug, is_active=True).first_or_404()
@@ -53,10 +62,9 @@ def get_ministry(slug):
     })
 
 @ministry_bp.route('/', methods=['POST'])
-@jwt_required()
+@admin_required
+@invalidates_cache('ministries')
 def create_ministry():
-    if not is_admin():
-        return jsonify({'msg': 'Admins only'}), 403
     from models.ministry import Ministry
     
     # Handle both JSON and FormData
@@ -95,10 +103,9 @@ def create_ministry():
 
 @ministry_bp.route('/<int:ministry_id>', methods=['PUT'])
 @ministry_bp.route('/<int:ministry_id>/', methods=['PUT'])
-@jwt_required()
+@admin_required
+@invalidates_cache('ministries')
 def update_ministry(ministry_id):
-    if not is_admin():
-        return jsonify({'msg': 'Admins only'}), 403
     from models.ministry import Ministry
     m = Ministry.query.get_or_404(ministry_id)
     
@@ -140,10 +147,9 @@ def update_ministry(ministry_id):
 
 @ministry_bp.route('/<int:ministry_id>', methods=['DELETE'])
 @ministry_bp.route('/<int:ministry_id>/', methods=['DELETE'])
-@jwt_required()
+@admin_required
+@invalidates_cache('ministries')
 def delete_ministry(ministry_id):
-    if not is_admin():
-        return jsonify({'msg': 'Admins only'}), 403
     from models.ministry import Ministry
     m = Ministry.query.get_or_404(ministry_id)
     m.is_active = False
@@ -152,13 +158,11 @@ def delete_ministry(ministry_id):
 
 # Ministry Images endpoints
 @ministry_bp.route('/<int:ministry_id>/images', methods=['POST'])
-@jwt_required()
+@admin_required
+@invalidates_cache('ministries')
 def add_ministry_image(ministry_id):
     from models.ministry import Ministry
     from models.ministry_image import MinistryImage
-    user_info = parse_jwt_identity()
-    if not user_info or not user_info.get('is_admin'):
-        return jsonify({'msg': 'Admins only'}), 403
     
     ministry = Ministry.query.get_or_404(ministry_id)
     
@@ -185,12 +189,10 @@ def add_ministry_image(ministry_id):
     return jsonify({'msg': 'Image added', 'id': ministry_image.id})
 
 @ministry_bp.route('/<int:ministry_id>/images/<int:image_id>', methods=['DELETE'])
-@jwt_required()
+@admin_required
+@invalidates_cache('ministries')
 def delete_ministry_image(ministry_id, image_id):
     from models.ministry_image import MinistryImage
-    user_info = parse_jwt_identity()
-    if not user_info or not user_info.get('is_admin'):
-        return jsonify({'msg': 'Admins only'}), 403
     
     ministry_image = MinistryImage.query.get_or_404(image_id)
     if ministry_image.ministry_id != ministry_id:
@@ -199,7 +201,8 @@ def delete_ministry_image(ministry_id, image_id):
     # Delete the file
     delete_file(ministry_image.image_url)
     
-    # Delete the database record
+    # Delete the database record; touch the ministry so its Last-Modified moves
+    ministry_image.ministry.updated_at = datetime.utcnow()
     db.session.delete(ministry_image)
     db.session.commit()
     
@@ -207,30 +210,20 @@ def delete_ministry_image(ministry_id, image_id):
 
 # Ministry Cards endpoints
 @ministry_bp.route('/<slug>/cards', methods=['POST'])
-@jwt_required()
+@admin_required
+@invalidates_cache('ministries')
 def create_ministry_card(slug):
     from models.ministry_card import MinistryCard
     from models.ministry import Ministry
     
-    print(f"🔍 DEBUG: Creating ministry card for slug: {slug}")
-    print(f"🔍 DEBUG: Request method: {request.method}")
-    print(f"🔍 DEBUG: Request headers: {dict(request.headers)}")
-    print(f"🔍 DEBUG: Request data: {request.get_data()}")
-    print(f"🔍 DEBUG: Request JSON: {request.json}")
-    
-    if not is_admin():
-        print(f"❌ ERROR: User is not admin")
-        return jsonify({'msg': 'Admins only'}), 403
-    
     try:
         ministry = Ministry.query.filter_by(slug=slug, is_active=True).first_or_404()
-        print(f"✅ DEBUG: Found ministry: {ministry.name} (ID: {ministry.id})")
     except Exception as e:
-        print(f"❌ ERROR: Ministry not found for slug '{slug}': {str(e)}")
+        logger.info('Ministry not found for slug %r: %s', slug, e)
         return jsonify({'msg': f'Ministry not found: {slug}'}), 404
     
     data = request.json
-    print(f"🔍 DEBUG: Processing data: {data}")
+    logger.debug('Creating card for ministry %s: %s', ministry.id, data)
     
     try:
         card = MinistryCard(
@@ -238,24 +231,21 @@ def create_ministry_card(slug):
             title=data['title'],
             description=data.get('description')
         )
-        print(f"✅ DEBUG: Created card object: {card}")
         
         db.session.add(card)
         db.session.commit()
-        print(f"✅ DEBUG: Card saved to database with ID: {card.id}")
         
         return jsonify({'msg': 'Ministry card created', 'id': card.id})
     except Exception as e:
-        print(f"❌ ERROR: Failed to create card: {str(e)}")
+        logger.warning('Failed to create card for ministry %s: %s', ministry.id, e)
         db.session.rollback()
         return jsonify({'msg': f'Error creating card: {str(e)}'}), 422
 
 @ministry_bp.route('/<slug>/cards/<int:card_id>', methods=['PUT'])
-@jwt_required()
+@admin_required
+@invalidates_cache('ministries')
 def update_ministry_card(slug, card_id):
     from models.ministry_card import MinistryCard
-    if not is_admin():
-        return jsonify({'msg': 'Admins only'}), 403
     
     card = MinistryCard.query.get_or_404(card_id)
     data = request.json
@@ -268,13 +258,17 @@ def update_ministry_card(slug, card_id):
     return jsonify({'msg': 'Ministry card updated'})
 
 @ministry_bp.route('/<slug>/cards/<int:card_id>', methods=['DELETE'])
-@jwt_required()
+@admin_required
+@invalidates_cache('ministries')
 def delete_ministry_card(slug, card_id):
     from models.ministry_card import MinistryCard
-    if not is_admin():
-        return jsonify({'msg': 'Admins only'}), 403
+    from models.ministry import Ministry
     
     card = MinistryCard.query.get_or_404(card_id)
+    # Touch the ministry so its Last-Modified moves
+    ministry = Ministry.query.get(card.ministry_id)
+    if ministry:
+        ministry.updated_at = datetime.utcnow()
     db.session.delete(card)
     db.session.commit()
     return jsonify({'msg': 'Ministry card deleted'}) 
@@ -282,6 +276,8 @@ def delete_ministry_card(slug, card_id):
 # GET endpoints for ministry cards and images
 @ministry_bp.route('/<slug>/cards', methods=['GET'])
 @ministry_bp.route('/<slug>/cards/', methods=['GET'])
+@conditional('ministries', 'ministry', 'ministry_card')
+@cached('ministries')
 def get_ministry_cards(slug):
     """Get all cards for a specific ministry by slug"""
     from models.ministry import Ministry
@@ -301,6 +297,8 @@ def get_ministry_cards(slug):
 
 @ministry_bp.route('/<slug>/images', methods=['GET'])
 @ministry_bp.route('/<slug>/images/', methods=['GET'])
+@conditional('ministries', 'ministry', 'ministry_image')
+@cached('ministries')
 def get_ministry_images(slug):
     """Get all images for a specific ministry by slug (max 10)"""
     from models.ministry import Ministry
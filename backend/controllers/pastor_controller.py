@@ -1,13 +1,18 @@
 from flask import Blueprint, request, jsonify
 from extensions import db
-from flask_jwt_extended import jwt_required
 from datetime import datetime
-from utils.utils import is_admin
+from utils.utils import admin_required
+from utils.cache import cached, invalidates_cache
+from utils.http_cache import conditional
+from utils.snapshots import snapshot
 from utils.upload import save_file, delete_file
 
 pastor_bp = Blueprint('pastor_controller', __name__)
 
 @pastor_bp.route('/', methods=['GET'])
+@snapshot('pastors')
+@conditional('pastors', 'pastor')
+@cached('pastors')
 def get_pastors():
     from models.pastor import Pastor
     pastors = Pastor.query.filter_by(is_active=True).order_by(Pastor.order).all()
@@ -29,6 +34,8 @@ def get_pastors():
 
 @pastor_bp.route('/<int:pastor_id>', methods=['GET'])
 @pastor_bp.route('/<int:pastor_id>/', methods=['GET'])
+@conditional('pastors', 'pastor')
+@cached('pastors')
 def get_pastor(pastor_id):
     from models.pastor import Pastor
     p = Pastor.query.get_or_404(pastor_id)
@@ -49,10 +56,9 @@ def get_pastor(pastor_id):
     })
 
 @pastor_bp.route('/', methods=['POST'])
-@jwt_required()
+@admin_required
+@invalidates_cache('pastors')
 def create_pastor():
-    if not is_admin():
-        return jsonify({'msg': 'Admins only'}), 403
     from models.pastor import Pastor
     
     # Handle both JSON and FormData
@@ -90,10 +96,9 @@ def create_pastor():
 
 @pastor_bp.route('/<int:pastor_id>', methods=['PUT'])
 @pastor_bp.route('/<int:pastor_id>/', methods=['PUT'])
-@jwt_required()
+@admin_required
+@invalidates_cache('pastors')
 def update_pastor(pastor_id):
-    if not is_admin():
-        return jsonify({'msg': 'Admins only'}), 403
     from models.pastor import Pastor
     p = Pastor.query.get_or_404(pastor_id)
     
@@ -134,10 +139,9 @@ def update_pastor(pastor_id):
 
 @pastor_bp.route('/<int:pastor_id>', methods=['DELETE'])
 @pastor_bp.route('/<int:pastor_id>/', methods=['DELETE'])
-@jwt_required()
+@admin_required
+@invalidates_cache('pastors')
 def delete_pastor(pastor_id):
-    if not is_admin():
-        return jsonify({'msg': 'Admins only'}), 403
     from models.pastor import Pastor
     p = Pastor.query.get_or_404(pastor_id)
     p.is_active = False
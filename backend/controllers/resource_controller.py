@@ -1,13 +1,16 @@
 from flask import Blueprint, request, jsonify
 from extensions import db
-from flask_jwt_extended import jwt_required
 from datetime import datetime
-from utils.utils import parse_jwt_identity
+from utils.utils import admin_required
+from utils.cache import cached, invalidates_cache
+from utils.http_cache import conditional
 from utils.upload import save_file, delete_file
 
 resource_bp = Blueprint('resource_controller', __name__)
 
 @resource_bp.route('/', methods=['GET'])
+@conditional('resources', 'resource')
+@cached('resources')
 def get_resources():
     """Public endpoint to get resources without authentication"""
     from models.resource import Resource
@@ -28,6 +31,8 @@ def get_resources():
 
 @resource_bp.route('/<int:resource_id>', methods=['GET'])
 @resource_bp.route('/<int:resource_id>/', methods=['GET'])
+@conditional('resources', 'resource')
+@cached('resources')
 def get_resource(resource_id):
     """Public endpoint to get a single resource without authentication"""
     from models.resource import Resource
@@ -47,12 +52,10 @@ def get_resource(resource_id):
     })
 
 @resource_bp.route('/', methods=['POST'])
-@jwt_required()
+@admin_required
+@invalidates_cache('resources')
 def create_resource():
     from models.resource import Resource
-    user_info = parse_jwt_identity()
-    if not user_info or not user_info.get('is_admin'):
-        return jsonify({'msg': 'Admins only'}), 403
     
     # Handle both JSON and FormData
     if request.is_json:
@@ -95,12 +98,10 @@ def create_resource():
 
 @resource_bp.route('/<int:resource_id>', methods=['PUT'])
 @resource_bp.route('/<int:resource_id>/', methods=['PUT'])
-@jwt_required()
+@admin_required
+@invalidates_cache('resources')
 def update_resource(resource_id):
     from models.resource import Resource
-    user_info = parse_jwt_identity()
-    if not user_info or not user_info.get('is_admin'):
-        return jsonify({'msg': 'Admins only'}), 403
     
     resource = Resource.query.get_or_404(resource_id)
     
@@ -147,12 +148,10 @@ def update_resource(resource_id):
 
 @resource_bp.route('/<int:resource_id>', methods=['DELETE'])
 @resource_bp.route('/<int:resource_id>/', methods=['DELETE'])
-@jwt_required()
+@admin_required
+@invalidates_cache('resources')
 def delete_resource(resource_id):
     from models.resource import Resource
-    user_info = parse_jwt_identity()
-    if not user_info or not user_info.get('is_admin'):
-        return jsonify({'msg': 'Admins only'}), 403
     
     resource = Resource.query.get_or_404(resource_id)
     
@@ -1,12 +1,15 @@
 from flask import Blueprint, request, jsonify
 from extensions import db
-from flask_jwt_extended import jwt_required
 from datetime import datetime
-from utils.utils import is_admin
+from utils.utils import admin_required
+from utils.cache import cached, invalidates_cache
+from utils.http_cache import conditional
 
 sermon_bp = Blueprint('sermon_controller', __name__)
 
 @sermon_bp.route('/public', methods=['GET'])
+@conditional('sermons')
+@cached('sermons')
 def get_public_sermons():
     """Public endpoint to get sermons without authentication"""
     from models.sermon import Sermon
@@ -21,6 +24,8 @@ def get_public_sermons():
     } for s in sermons])
 
 @sermon_bp.route('/', methods=['GET'])
+@conditional('sermons')
+@cached('sermons')
 def get_sermons():
     """Public endpoint to get sermons without authentication"""
     from models.sermon import Sermon
@@ -36,6 +41,8 @@ def get_sermons():
 
 @sermon_bp.route('/<int:sermon_id>', methods=['GET'])
 @sermon_bp.route('/<int:sermon_id>/', methods=['GET'])
+@conditional('sermons')
+@cached('sermons')
 def get_sermon(sermon_id):
     """Public endpoint to get a single sermon without authentication"""
     from models.sermon import Sermon
@@ -50,10 +57,9 @@ def get_sermon(sermon_id):
     })
 
 @sermon_bp.route('/', methods=['POST'])
-@jwt_required()
+@admin_required
+@invalidates_cache('sermons')
 def create_sermon():
-    if not is_admin():
-        return jsonify({'msg': 'Admins only'}), 403
     from models.sermon import Sermon
     data = request.json
     s = Sermon(
@@ -69,10 +75,9 @@ def create_sermon():
 
 @sermon_bp.route('/<int:sermon_id>', methods=['PUT'])
 @sermon_bp.route('/<int:sermon_id>/', methods=['PUT'])
-@jwt_required()
+@admin_required
+@invalidates_cache('sermons')
 def update_sermon(sermon_id):
-    if not is_admin():
-        return jsonify({'msg': 'Admins only'}), 403
     from models.sermon import Sermon
     s = Sermon.query.get_or_404(sermon_id)
     data = request.json
@@ -87,10 +92,9 @@ def update_sermon(sermon_id):
 
 @sermon_bp.route('/<int:sermon_id>', methods=['DELETE'])
 @sermon_bp.route('/<int:sermon_id>/', methods=['DELETE'])
-@jwt_required()
+@admin_required
+@invalidates_cache('sermons')
 def delete_sermon(sermon_id):
-    if not is_admin():
-        return jsonify({'msg': 'Admins only'}), 403
     from models.sermon import Sermon
     s = Sermon.query.get_or_404(sermon_id)
     db.session.delete(s)
@@ -1,13 +1,18 @@
 from flask import Blueprint, request, jsonify
 from extensions import db
-from flask_jwt_extended import jwt_required
 from datetime import datetime
-from utils.utils import is_admin
+from utils.utils import admin_required
+from utils.cache import cached, invalidates_cache
+from utils.http_cache import conditional
+from utils.snapshots import snapshot
 from utils.upload import save_file, delete_file
 
 service_bp = Blueprint('service_controller', __name__)
 
 @service_bp.route('/', methods=['GET'])
+@snapshot('services')
+@conditional('services', 'service')
+@cached('services')
 def get_services():
     from models.service import Service
     services = Service.query.filter_by(is_active=True).all()
@@ -24,6 +29,8 @@ def get_services():
 
 @service_bp.route('/<int:service_id>', methods=['GET'])
 @service_bp.route('/<int:service_id>/', methods=['GET'])
+@conditional('services', 'service')
+@cached('services')
 def get_service(service_id):
     from models.service import Service
     s = Service.query.get_or_404(service_id)
@@ -39,10 +46,9 @@ def get_service(service_id):
     })
 
 @service_bp.route('/', methods=['POST'])
-@jwt_required()
+@admin_required
+@invalidates_cache('services')
 def create_service():
-    if not is_admin():
-        return jsonify({'msg': 'Admins only'}), 403
     from models.service import Service
     
     # Handle both JSON and FormData
@@ -68,10 +74,9 @@ def create_service():
 
 @service_bp.route('/<int:service_id>', methods=['PUT'])
 @service_bp.route('/<int:service_id>/', methods=['PUT'])
-@jwt_required()
+@admin_required
+@invalidates_cache('services')
 def update_service(service_id):
-    if not is_admin():
-        return jsonify({'msg': 'Admins only'}), 403
     from models.service import Service
     s = Service.query.get_or_404(service_id)
     
@@ -97,10 +102,9 @@ def update_service(service_id):
 
 @service_bp.route('/<int:service_id>', methods=['DELETE'])
 @service_bp.route('/<int:service_id>/', methods=['DELETE'])
-@jwt_required()
+@admin_required
+@invalidates_cache('services')
 def delete_service(service_id):
-    if not is_admin():
-        return jsonify({'msg': 'Admins only'}), 403
     from models.service import Service
     s = Service.query.get_or_404(service_id)
     s.is_active = False
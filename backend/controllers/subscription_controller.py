@@ -1,12 +1,13 @@
 from flask import Blueprint, request, jsonify
 from extensions import db
 from models.subscription import Subscription
-from utils.utils import is_admin
-from flask_jwt_extended import jwt_required
+from utils.utils import admin_required
+from utils.rate_limit import rate_limited
 
 subscription_bp = Blueprint('subscription', __name__)
 
 @subscription_bp.route('/subscribe', methods=['POST'])
+@rate_limited('subscriptions')
 def subscribe():
     """Public endpoint to subscribe to newsletter"""
     data = request.json
@@ -36,6 +37,7 @@ def subscribe():
     return jsonify({'msg': 'Subscribed successfully'})
 
 @subscription_bp.route('/unsubscribe', methods=['POST'])
+@rate_limited('subscriptions')
 def unsubscribe():
     """Public endpoint to unsubscribe from newsletter"""
     data = request.json
@@ -54,11 +56,9 @@ def unsubscribe():
     return jsonify({'msg': 'Unsubscribed successfully'})
 
 @subscription_bp.route('/subscriptions', methods=['GET'])
-@jwt_required()
+@admin_required
 def get_subscriptions():
     """Admin endpoint to get all subscriptions"""
-    if not is_admin():
-        return jsonify({'msg': 'Admins only'}), 403
     
     subscriptions = Subscription.query.order_by(Subscription.created_at.desc()).all()
     return jsonify([{
@@ -71,11 +71,9 @@ def get_subscriptions():
     } for s in subscriptions])
 
 @subscription_bp.route('/subscriptions/<int:subscription_id>', methods=['DELETE'])
-@jwt_required()
+@admin_required
 def delete_subscription(subscription_id):
     """Admin endpoint to delete a subscription"""
-    if not is_admin():
-        return jsonify({'msg': 'Admins only'}), 403
     
     subscription = Subscription.query.get_or_404(subscription_id)
     db.session.delete(subscription)
@@ -3,6 +3,7 @@ from extensions import db
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from werkzeug.security import generate_password_hash
 from datetime import datetime
+from utils.passwords import PasswordHasherBusy, hasher_busy_response
 
 user_bp = Blueprint('user_controller', __name__)
 
@@ -69,6 +70,9 @@ def create_user():
                 'lastLogin': user.last_login.strftime('%Y-%m-%d') if user.last_login else None
             }
         }), 201
+    except PasswordHasherBusy:
+        db.session.rollback()
+        return hasher_busy_response()
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -113,6 +117,9 @@ def update_user(user_id):
                 'lastLogin': user.last_login.strftime('%Y-%m-%d') if user.last_login else None
             }
         }), 200
+    except PasswordHasherBusy:
+        db.session.rollback()
+        return hasher_busy_response()
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -3,9 +3,13 @@ Flask extensions initialization
 """
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
-from flask_migrate import Migrate
+from utils.replicas import RoutingSession
 
 # Initialize extensions
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 jwt = JWTManager()
-migrate = Migrate() 
\ No newline at end of file
+
+def init_migrate(app):
+    """Set up Flask-Migrate; it pulls in alembic, so servers skip it and only the flask CLI loads it"""
+    from flask_migrate import Migrate
+    Migrate(app, db)
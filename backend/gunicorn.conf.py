@@ -0,0 +1,83 @@
+"""
+Gunicorn settings for production.
+
+    cd backend && gunicorn -c gunicorn.conf.py wsgi:app
+
+WORKER_MODE picks the worker model (see DEPLOYMENT.md for measured numbers):
+
+- 'gthread' (default): (CPU + 1) processes, each running GUNICORN_THREADS
+  threads. Good fit for the I/O bound public and admin endpoints
+- 'sync': (2 x CPU) + 1 single threaded processes, the most isolated option
+- 'gevent': (CPU + 1) processes serving up to GUNICORN_WORKER_CONNECTIONS
+  greenlets each. Needs the gevent package and a pure Python MySQL driver
+  (DATABASE_URL=mysql+pymysql://...), because mysqlclient blocks the event loop
+
+The app is preloaded once in the master and workers are forked from it, so
+each worker starts without importing anything. Every worker is recycled after
+GUNICORN_MAX_REQUESTS (+ jitter) requests and given GUNICORN_GRACEFUL_TIMEOUT
+seconds to finish in-flight requests on reload or shutdown.
+"""
+import os
+import multiprocessing
+
+WORKER_MODE = os.getenv('WORKER_MODE', 'gthread')
+if WORKER_MODE not in ('sync', 'gthread', 'gevent'):
+    raise ValueError(f"Unknown WORKER_MODE '{WORKER_MODE}', expected sync, gthread or gevent")
+
+if WORKER_MODE == 'gevent':
+    # Patch before the preloaded app imports socket, ssl and threading
+    from gevent import monkey
+    monkey.patch_all()
+
+cpu_count = multiprocessing.cpu_count()
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+preload_app = True
+
+if WORKER_MODE == 'sync':
+    worker_class = 'sync'
+    workers = int(os.getenv('GUNICORN_WORKERS', cpu_count * 2 + 1))
+elif WORKER_MODE == 'gthread':
+    worker_class = 'gthread'
+    workers = int(os.getenv('GUNICORN_WORKERS', cpu_count + 1))
+    threads = int(os.getenv('GUNICORN_THREADS', 4))
+else:
+    worker_class = 'gevent'
+    workers = int(os.getenv('GUNICORN_WORKERS', cpu_count + 1))
+    worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 200))
+
+# In-process job state is only visible to the worker that queued the job
+if os.getenv('JOB_BACKEND', 'database') == 'thread' and workers > 1:
+    raise ValueError("JOB_BACKEND 'thread' keeps jobs per process; use 'database' or GUNICORN_WORKERS=1")
+
+# Graceful recycling keeps slow leaks (e.g. large exports) from accumulating
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 100))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+# Heartbeat files on tmpfs so a slow disk cannot get workers killed
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+errorlog = os.getenv('GUNICORN_ERROR_LOG', '-')
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+def post_fork(server, worker):
+    """Drop database connections inherited from the master; each worker opens its own"""
+    flask_app = getattr(server.app, 'callable', None)
+    if flask_app is None:
+        # Not preloaded, nothing was inherited
+        return
+    from extensions import db
+    from utils.replicas import get_replicas
+    from utils.form_ingest import get_ingestor
+    with flask_app.app_context():
+        db.engine.dispose(close=False)
+        if get_replicas() is not None:
+            get_replicas().dispose(close=False)
+        if flask_app.config['FORM_INGEST'] == 'batched':
+            # Start the flusher now so submissions left by a crashed worker are inserted without waiting for a new one
+            get_ingestor()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+
+from sqlalchemy import inspect
+from app import create_app, db
+
+def migrate_form_submission_inbox():
+    """Create the inbox indexes and the form submission counter table on an existing database"""
+    from models.form_submission import FormSubmission, rebuild_submission_counts
+    
+    app = create_app()
+    
+    with app.app_context():
+        try:
+            # New tables (form_submission_counter) are created by create_all
+            db.create_all()
+            
+            table = FormSubmission.__table__
+            existing = {index['name'] for index in inspect(db.engine).get_indexes(table.name)}
+            with db.engine.connect() as connection:
+                # The inbox filters on is_read = false, which must not miss rows stored as NULL
+                updated = connection.execute(
+                    table.update().where(table.c.is_read.is_(None)).values(is_read=False)
+                ).rowcount
+                if updated:
+                    print(f"✅ Marked {updated} submissions without a read state as unread")
+                for index in table.indexes:
+                    if index.name in existing:
+                        print(f"   - {index.name} already exists")
+                        continue
+                    index.create(bind=connection)
+                    print(f"✅ Created index {index.name} on {table.name}")
+                connection.commit()
+            
+            count = rebuild_submission_counts()
+            print(f"✅ Counted submissions for {count} form types")
+            print("✅ Form submission inbox migration completed successfully!")
+            
+        except Exception as e:
+            print(f"❌ Migration error: {e}")
+            raise e
+
+if __name__ == '__main__':
+    print("🔧 Migrating form submission inbox...")
+    migrate_form_submission_inbox()
+    print("✅ Migration completed!")
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+from sqlalchemy import inspect
+from app import create_app, db
+
+def migrate_member_indexes():
+    """Create the member search table and composite filter indexes on an existing database"""
+    from models.church_member import ChurchMember, MemberMinistry, MemberSearchTerm
+    
+    app = create_app()
+    
+    with app.app_context():
+        try:
+            # New tables (member_search_term) are created by create_all
+            db.create_all()
+            if db.engine.dialect.name == 'sqlite':
+                upgrade_sqlite_search_terms()
+            
+            inspector = inspect(db.engine)
+            with db.engine.connect() as connection:
+                for model in (ChurchMember, MemberMinistry, MemberSearchTerm):
+                    table = model.__table__
+                    existing = {index['name'] for index in inspector.get_indexes(table.name)}
+                    for index in table.indexes:
+                        if index.name in existing:
+                            print(f"   - {index.name} already exists")
+                            continue
+                        index.create(bind=connection)
+                        print(f"✅ Created index {index.name} on {table.name}")
+                connection.commit()
+            
+            print("✅ Member index migration completed successfully!")
+            explain_member_filters()
+            
+        except Exception as e:
+            print(f"❌ Migration error: {e}")
+            raise e
+
+def upgrade_sqlite_search_terms():
+    """Recreate member_search_term with a NOCASE term column, which SQLite needs to use the index for LIKE"""
+    from models.church_member import MemberSearchTerm
+    from utils.member_search import rebuild_member_search_terms
+    
+    table = MemberSearchTerm.__table__
+    # The SQLite inspector does not report collations, so read the table definition
+    with db.engine.connect() as connection:
+        definition = connection.execute(
+            db.text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': table.name}
+        ).scalar()
+    if 'NOCASE' in (definition or '').upper():
+        return
+    table.drop(db.engine)
+    table.create(db.engine)
+    count = rebuild_member_search_terms()
+    print(f"✅ Recreated {table.name} with a NOCASE term column and indexed {count} members")
+
+def explain_member_filters():
+    """Print the query plan of the common member filters and check that an index is used"""
+    from models.church_member import ChurchMember, MemberMinistry, MemberSearchTerm
+    from utils.member_query import build_member_query
+    
+    sample_filters = {
+        'ministry': {'ministry_id': 1, 'is_active': True},
+        'gender': {'is_active': True, 'gender': 'Female'},
+        'marital_status': {'is_active': True, 'marital_status': 'Married'},
+        'search': {'search': 'john'},
+    }
+    
+    member_tables = [model.__tablename__ for model in (ChurchMember, MemberMinistry, MemberSearchTerm)]
+    dialect = db.engine.dialect.name
+    explain = 'EXPLAIN QUERY PLAN' if dialect == 'sqlite' else 'EXPLAIN'
+    
+    print(f"📋 Query plans ({dialect}):")
+    all_indexed = True
+    for name, filters in sample_filters.items():
+        statement = build_member_query(filters).statement.compile(
+            dialect=db.engine.dialect, compile_kwargs={'literal_binds': True}
+        )
+        rows = db.session.execute(db.text(f"{explain} {statement}")).mappings().all()
+        if dialect == 'sqlite':
+            plan = [row['detail'] for row in rows]
+            # SCAN of a member table reads all of it, even "USING INDEX"; SCAN of a subquery is fine
+            indexed = not any(detail.split(' ')[:2] == ['SCAN', table] for detail in plan for table in member_tables)
+        else:
+            plan = [f"{row['table']}: type={row['type']} key={row['key']}" for row in rows]
+            indexed = any(row['key'] for row in rows)
+        all_indexed = all_indexed and indexed
+        print(f"   {'✅' if indexed else '❌'} {name}")
+        for line in plan:
+            print(f"      {line}")
+    
+    if not all_indexed:
+        print("⚠️ Some member filters are not using an index")
+    return all_indexed
+
+if __name__ == '__main__':
+    print("🔧 Migrating church member indexes...")
+    migrate_member_indexes()
+    print("✅ Migration completed!")
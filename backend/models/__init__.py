@@ -15,6 +15,8 @@ from .service import Service
 from .church_info import ChurchInfo
 from .giving import Giving
 from .giving_transaction import GivingTransaction
-from .church_member import ChurchMember, MemberMinistry
+from .church_member import ChurchMember, MemberMinistry, MemberSearchTerm
 from .hero_slide import HeroSlide
-from .form_submission import FormSubmission 
\ No newline at end of file
+from .form_submission import FormSubmission, FormSubmissionCounter
+from .background_job import BackgroundJob
+from .stat_rollup import StatRollup
\ No newline at end of file
@@ -0,0 +1,20 @@
+from extensions import db
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from datetime import datetime
+
+class BackgroundJob(db.Model):
+    id = Column(String(32), primary_key=True)  # uuid4 hex
+    kind = Column(String(50), nullable=False)  # Registered job handler, e.g. 'members_pdf'
+    params = Column(db.JSON)
+    status = Column(String(20), nullable=False, default='queued', index=True)  # queued, running, done, failed
+    artifact = Column(String(255))  # File name under uploads/exports once done
+    error = Column(Text)
+    created_by = Column(Integer, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    owner = Column(String(100), nullable=True)  # host:pid of the process running the job
+    heartbeat_at = Column(DateTime, nullable=True)  # Refreshed by the owner while the job runs
+    finished_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<BackgroundJob {self.id} {self.kind} {self.status}>'
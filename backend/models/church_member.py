@@ -1,27 +1,41 @@
 from extensions import db
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, event, inspect
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime
+from utils.member_search import member_search_terms, sync_member_search_terms
 
 class ChurchMember(db.Model):
+    __table_args__ = (
+        # Admin listing filters always combine is_active with gender or marital status
+        db.Index('ix_church_member_active_gender', 'is_active', 'gender'),
+        db.Index('ix_church_member_active_marital', 'is_active', 'marital_status'),
+    )
+
     id = Column(Integer, primary_key=True)
     first_name = Column(String(50), nullable=False)
     last_name = Column(String(50), nullable=False)
     email = Column(String(120), unique=True, nullable=True)
     phone = Column(String(20), nullable=True)
     date_of_birth = Column(DateTime, nullable=True)
-    address = Column(Text, nullable=True)
+    address = deferred(Column(Text, nullable=True), group='details')
     gender = Column(String(10), nullable=True)  # Male, Female, Other
     marital_status = Column(String(20), nullable=True)  # Single, Married, Divorced, Widowed
     baptism_date = Column(DateTime, nullable=True)
     membership_date = Column(DateTime, default=datetime.utcnow)
     is_active = Column(Boolean, default=True)
-    notes = Column(Text, nullable=True)
+    notes = deferred(Column(Text, nullable=True), group='details')
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
     ministry_assignments = relationship('MemberMinistry', back_populates='member', cascade='all, delete-orphan')
+    # Read-only view of the currently active assignments, used for eager loading in listings
+    active_ministry_assignments = relationship(
+        'MemberMinistry',
+        primaryjoin='and_(ChurchMember.id == MemberMinistry.member_id, MemberMinistry.is_active == True)',
+        order_by='MemberMinistry.id',
+        viewonly=True
+    )
 
     def __repr__(self):
         return f'<ChurchMember {self.first_name} {self.last_name}>'
@@ -31,6 +45,13 @@ class ChurchMember(db.Model):
         return f"{self.first_name} {self.last_name}"
 
 class MemberMinistry(db.Model):
+    __table_args__ = (
+        # Covers the ministry_id filter semi-join without touching the table
+        db.Index('ix_member_ministry_ministry_active_member', 'ministry_id', 'is_active', 'member_id'),
+        # Active assignments of a batch of members (eager loading)
+        db.Index('ix_member_ministry_member_active', 'member_id', 'is_active'),
+    )
+
     id = Column(Integer, primary_key=True)
     member_id = Column(Integer, ForeignKey('church_member.id'), nullable=False)
     ministry_id = Column(Integer, ForeignKey('ministry.id'), nullable=False)
@@ -46,4 +67,34 @@ class MemberMinistry(db.Model):
     ministry = relationship('Ministry')
 
     def __repr__(self):
-        return f'<MemberMinistry {self.member.full_name} - {self.ministry.name}>' 
\ No newline at end of file
+        return f'<MemberMinistry {self.member.full_name} - {self.ministry.name}>'
+
+class MemberSearchTerm(db.Model):
+    """Normalized search terms of a member, maintained by the ChurchMember mapper events below"""
+    id = Column(Integer, primary_key=True)
+    member_id = Column(Integer, ForeignKey('church_member.id', ondelete='CASCADE'), nullable=False, index=True)
+    # SQLite only uses an index for LIKE 'prefix%' when it is NOCASE; terms are stored lowercase anyway
+    term = Column(String(120).with_variant(String(120, collation='NOCASE'), 'sqlite'), nullable=False, index=True)
+
+    def __repr__(self):
+        return f'<MemberSearchTerm {self.member_id} {self.term}>'
+
+SEARCHABLE_MEMBER_FIELDS = ('first_name', 'last_name', 'email', 'phone')
+
+def _index_member(connection, member):
+    terms = member_search_terms(member.first_name, member.last_name, member.email, member.phone)
+    sync_member_search_terms(connection, member.id, terms)
+
+@event.listens_for(ChurchMember, 'after_insert')
+def _index_new_member(mapper, connection, member):
+    _index_member(connection, member)
+
+@event.listens_for(ChurchMember, 'after_update')
+def _reindex_member(mapper, connection, member):
+    state = inspect(member)
+    if any(state.attrs[field].history.has_changes() for field in SEARCHABLE_MEMBER_FIELDS):
+        _index_member(connection, member)
+
+@event.listens_for(ChurchMember, 'before_delete')
+def _unindex_member(mapper, connection, member):
+    sync_member_search_terms(connection, member.id, set())
@@ -1,9 +1,17 @@
 from extensions import db
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, String, Text, Boolean
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, String, Text, Boolean, event, inspect
 from sqlalchemy.dialects.mysql import JSON
 from datetime import datetime
+from collections import Counter
+from utils.rollups import upsert_add
 
 class FormSubmission(db.Model):
+    __table_args__ = (
+        # The admin inbox: filtered by type and read state, newest first
+        db.Index('ix_form_submission_inbox', 'form_type', 'is_read', 'timestamp'),
+        db.Index('ix_form_submission_timestamp', 'timestamp'),
+    )
+
     id = Column(Integer, primary_key=True)
     form_type = Column(String(50), nullable=False)  # 'contact', 'prayer_request', 'pastoral_care', etc.
     name = Column(String(100))
@@ -17,4 +25,69 @@ class FormSubmission(db.Model):
     timestamp = Column(DateTime, default=datetime.utcnow)
 
     def __repr__(self):
-        return f'<FormSubmission {self.id} - {self.form_type}>' 
\ No newline at end of file
+        return f'<FormSubmission {self.id} - {self.form_type}>'
+
+class FormSubmissionCounter(db.Model):
+    """Submissions and unread submissions per form type, so the inbox never counts form_submission"""
+
+    form_type = Column(String(50), primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+    unread = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<FormSubmissionCounter {self.form_type} {self.unread}/{self.total}>'
+
+def record_submission_counts(connection, total, unread):
+    """Add Counter deltas of submissions and unread submissions per form type, on the connection of the change"""
+    now = datetime.utcnow()
+    rows = [{'form_type': form_type, 'total': total[form_type], 'unread': unread[form_type], 'updated_at': now}
+            for form_type in sorted(set(total) | set(unread)) if total[form_type] or unread[form_type]]
+    if rows:
+        upsert_add(connection, FormSubmissionCounter.__table__, ['form_type'], rows, ['total', 'unread'])
+
+def record_inserted_submissions(connection, rows):
+    """Count rows inserted without the ORM (dicts with form_type and is_read)"""
+    record_submission_counts(connection, Counter(row['form_type'] for row in rows),
+                             Counter(row['form_type'] for row in rows if not row.get('is_read')))
+
+def rebuild_submission_counts():
+    """Recompute the counters from form_submission; returns the number of form types"""
+    from sqlalchemy import case, func
+
+    FormSubmissionCounter.query.delete()
+    rows = db.session.query(
+        FormSubmission.form_type, func.count(FormSubmission.id),
+        func.sum(case((FormSubmission.is_read == True, 0), else_=1))
+    ).group_by(FormSubmission.form_type).all()
+    record_submission_counts(db.session.connection(), Counter({form_type: total for form_type, total, _ in rows}),
+                             Counter({form_type: int(unread or 0) for form_type, _, unread in rows}))
+    db.session.commit()
+    return len(rows)
+
+# ORM changes keep the counters in step in the same flush; set-based writes call
+# record_submission_counts themselves
+
+@event.listens_for(FormSubmission, 'after_insert')
+def _submission_inserted(mapper, connection, submission):
+    record_submission_counts(connection, Counter({submission.form_type: 1}),
+                             Counter({submission.form_type: 0 if submission.is_read else 1}))
+
+@event.listens_for(FormSubmission, 'after_update')
+def _submission_updated(mapper, connection, submission):
+    state = inspect(submission)
+    if not (state.attrs.is_read.history.has_changes() or state.attrs.form_type.history.has_changes()):
+        return
+    old_type = (state.attrs.form_type.history.deleted or [submission.form_type])[0]
+    was_read = (state.attrs.is_read.history.deleted or [submission.is_read])[0]
+    total, unread = Counter(), Counter()
+    total[old_type] -= 1
+    total[submission.form_type] += 1
+    unread[old_type] -= 0 if was_read else 1
+    unread[submission.form_type] += 0 if submission.is_read else 1
+    record_submission_counts(connection, total, unread)
+
+@event.listens_for(FormSubmission, 'after_delete')
+def _submission_deleted(mapper, connection, submission):
+    record_submission_counts(connection, Counter({submission.form_type: -1}),
+                             Counter({submission.form_type: 0 if submission.is_read else -1}))
@@ -0,0 +1,112 @@
+from extensions import db
+from sqlalchemy import Column, Integer, String, Date, Numeric, DateTime, event, inspect
+from datetime import datetime
+from models.sermon import Sermon
+from models.event import Event
+from models.ministry import Ministry
+from models.giving_transaction import GivingTransaction
+from utils.rollups import record_rollup, giving_dimensions
+
+class StatRollup(db.Model):
+    """Pre-aggregated dashboard counters, one row per metric/period/bucket/dimension"""
+    __table_args__ = (
+        db.UniqueConstraint('metric', 'period', 'period_start', 'dimension', name='uq_stat_rollup_bucket'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    metric = Column(String(50), nullable=False)  # sermons, events, ministries, giving_amount, giving_count
+    period = Column(String(10), nullable=False)  # day, month, all
+    period_start = Column(Date, nullable=False)  # First day of the bucket (1970-01-01 for 'all')
+    dimension = Column(String(120), nullable=False, default='')  # '' for totals, 'purpose:Tithe', 'method:M-Pesa'
+    value = Column(Numeric(14, 2), nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<StatRollup {self.metric} {self.period} {self.period_start} {self.dimension}={self.value}>'
+
+# Counters are kept in step with their source rows by the mapper events below,
+# using the flush connection so they commit or roll back with the change itself.
+
+def _old_value(target, attribute):
+    history = inspect(target).attrs[attribute].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(target, attribute)
+
+def _changed(target, *attributes):
+    state = inspect(target)
+    return any(state.attrs[attribute].history.has_changes() for attribute in attributes)
+
+# Sermons, bucketed by sermon date
+@event.listens_for(Sermon, 'after_insert')
+def _sermon_inserted(mapper, connection, sermon):
+    record_rollup(connection, 'sermons', sermon.date, 1)
+
+@event.listens_for(Sermon, 'after_update')
+def _sermon_updated(mapper, connection, sermon):
+    if _changed(sermon, 'date'):
+        record_rollup(connection, 'sermons', _old_value(sermon, 'date'), -1)
+        record_rollup(connection, 'sermons', sermon.date, 1)
+
+@event.listens_for(Sermon, 'after_delete')
+def _sermon_deleted(mapper, connection, sermon):
+    record_rollup(connection, 'sermons', sermon.date, -1)
+
+# Events, bucketed by start date so upcoming events are a range over day buckets
+@event.listens_for(Event, 'after_insert')
+def _event_inserted(mapper, connection, event_row):
+    record_rollup(connection, 'events', event_row.start_date, 1)
+
+@event.listens_for(Event, 'after_update')
+def _event_updated(mapper, connection, event_row):
+    if _changed(event_row, 'start_date'):
+        record_rollup(connection, 'events', _old_value(event_row, 'start_date'), -1)
+        record_rollup(connection, 'events', event_row.start_date, 1)
+
+@event.listens_for(Event, 'after_delete')
+def _event_deleted(mapper, connection, event_row):
+    record_rollup(connection, 'events', event_row.start_date, -1)
+
+# Active ministries; buckets hold the net change on the day it happened
+@event.listens_for(Ministry, 'after_insert')
+def _ministry_inserted(mapper, connection, ministry):
+    if ministry.is_active is not False:
+        record_rollup(connection, 'ministries', datetime.utcnow().date(), 1)
+
+@event.listens_for(Ministry, 'after_update')
+def _ministry_updated(mapper, connection, ministry):
+    if _changed(ministry, 'is_active'):
+        was_active = _old_value(ministry, 'is_active') is not False
+        is_active = ministry.is_active is not False
+        if was_active != is_active:
+            record_rollup(connection, 'ministries', datetime.utcnow().date(), 1 if is_active else -1)
+
+@event.listens_for(Ministry, 'after_delete')
+def _ministry_deleted(mapper, connection, ministry):
+    if _old_value(ministry, 'is_active') is not False:
+        record_rollup(connection, 'ministries', datetime.utcnow().date(), -1)
+
+# Giving, bucketed by transaction date with purpose and payment method breakdowns
+def _record_giving(connection, created_at, amount, purpose, payment_method, sign):
+    day = (created_at or datetime.utcnow()).date()
+    for dimension in giving_dimensions(purpose, payment_method):
+        record_rollup(connection, 'giving_amount', day, sign * (amount or 0), dimension)
+        record_rollup(connection, 'giving_count', day, sign, dimension)
+
+@event.listens_for(GivingTransaction, 'after_insert')
+def _giving_inserted(mapper, connection, transaction):
+    _record_giving(connection, transaction.created_at, transaction.amount,
+                   transaction.purpose, transaction.payment_method, 1)
+
+@event.listens_for(GivingTransaction, 'after_update')
+def _giving_updated(mapper, connection, transaction):
+    if _changed(transaction, 'amount', 'purpose', 'payment_method', 'created_at'):
+        _record_giving(connection, _old_value(transaction, 'created_at'), _old_value(transaction, 'amount'),
+                       _old_value(transaction, 'purpose'), _old_value(transaction, 'payment_method'), -1)
+        _record_giving(connection, transaction.created_at, transaction.amount,
+                       transaction.purpose, transaction.payment_method, 1)
+
+@event.listens_for(GivingTransaction, 'after_delete')
+def _giving_deleted(mapper, connection, transaction):
+    _record_giving(connection, transaction.created_at, transaction.amount,
+                   transaction.purpose, transaction.payment_method, -1)
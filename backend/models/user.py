@@ -1,23 +1,27 @@
 from extensions import db
 from sqlalchemy import Column, Integer, String, Boolean, DateTime
-from werkzeug.security import generate_password_hash, check_password_hash
+from utils.passwords import hash_password, verify_password
 from datetime import datetime
 
 class User(db.Model):
     id = Column(Integer, primary_key=True)
     username = Column(String(80), unique=True, nullable=False)
     email = Column(String(120), unique=True, nullable=True)  # Added email field
-    password_hash = Column(String(128), nullable=False)
+    password_hash = Column(String(255), nullable=False)
     is_admin = Column(Boolean, default=False)
     active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     last_login = Column(DateTime, nullable=True)
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        """Verify password, upgrading the stored hash when the hashing settings changed; the caller commits"""
+        ok, new_hash = verify_password(password, self.password_hash)
+        if new_hash:
+            self.password_hash = new_hash
+        return ok
     
     def update_last_login(self):
         self.last_login = datetime.utcnow()
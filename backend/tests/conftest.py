@@ -0,0 +1,72 @@
+import os
+import pytest
+from sqlalchemy import event
+
+# Config reads the environment at import time, so this must run before the app is imported
+os.environ['DATABASE_URL'] = 'sqlite://'
+os.environ['JWT_SECRET_KEY'] = 'test-secret-key-that-is-long-enough-for-hs256'
+os.environ['FORM_INGEST'] = 'direct'
+os.environ['SNAPSHOTS_ENABLED'] = 'false'
+os.environ['RATE_LIMIT_ENABLED'] = 'false'
+# One process, and no job worker threads polling the in-memory database
+os.environ['JOB_BACKEND'] = 'thread'
+
+@pytest.fixture
+def app():
+    """The application on a fresh in-memory SQLite database"""
+    from app import create_app
+    from extensions import db
+    from controllers.church_member_controller import invalidate_member_count_cache
+
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.create_all()
+        invalidate_member_count_cache()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def admin_headers(app):
+    from flask_jwt_extended import create_access_token
+    from extensions import db
+    from models.user import User
+
+    admin = User(username='admin', password_hash='unused', is_admin=True)
+    db.session.add(admin)
+    db.session.commit()
+    return {'Authorization': f'Bearer {create_access_token(identity=f"{admin.id}:admin:True")}'}
+
+class QueryCounter:
+    """SQL statements sent to the database while active"""
+
+    def __init__(self):
+        self.statements = []
+
+    def __len__(self):
+        return len(self.statements)
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+@pytest.fixture
+def count_queries(app):
+    """count_queries() returns a context manager that records the statements run inside it"""
+    from contextlib import contextmanager
+    from extensions import db
+
+    @contextmanager
+    def counting():
+        counter = QueryCounter()
+        event.listen(db.engine, 'before_cursor_execute', counter)
+        try:
+            yield counter
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', counter)
+
+    return counting
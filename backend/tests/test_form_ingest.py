@@ -0,0 +1,58 @@
+"""The batched form log keeps flowing when a segment holds a row the database keeps refusing"""
+import json
+import time
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from extensions import db
+
+@pytest.fixture
+def ingestor(app, tmp_path):
+    from utils.form_ingest import FormIngestor
+
+    app.config.update(FORM_INGEST_DIR=str(tmp_path), FORM_INGEST_BATCH_SIZE=2, FORM_INGEST_MAX_AGE_MS=60000,
+                      FORM_INGEST_RETRY_SECONDS=0, FORM_INGEST_MAX_ATTEMPTS=3)
+    ingestor = FormIngestor(app)
+    yield ingestor
+    ingestor.stop(timeout=5)
+
+@pytest.fixture
+def poison(app):
+    # Fails any statement carrying the poison value the way MySQL's 1366 surfaces, as OperationalError
+    def refuse(conn, cursor, statement, parameters, context, executemany):
+        if 'poison' in str(parameters):
+            raise OperationalError(statement, parameters, Exception("(1366, \"Incorrect string value\")"))
+
+    event.listen(db.engine, 'before_cursor_execute', refuse)
+    yield
+    event.remove(db.engine, 'before_cursor_execute', refuse)
+
+def row(name):
+    return {'form_type': 'contact', 'name': name, 'email': None, 'phone': None, 'message': 'hello',
+            'additional_data': {}, 'is_read': False, 'timestamp': '2026-01-01T00:00:00'}
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.01)
+
+def test_segment_failing_with_other_errors_is_split_and_rejected(ingestor, poison, tmp_path):
+    from models.form_submission import FormSubmission
+
+    # Two segments of two; the first holds the row that can never go in
+    for name in ('first', 'poison', 'second', 'third'):
+        ingestor.append(row(name))
+
+    wait_for(lambda: ingestor.status()['pending'] == 0)
+    status = ingestor.status()
+    assert status['inserted'] == 3
+    assert status['rejected'] == 1
+    assert status['failures'] == 3
+    db.session.expire_all()
+    assert sorted(name for name, in db.session.query(FormSubmission.name)) == ['first', 'second', 'third']
+
+    rejected = [json.loads(line) for line in (tmp_path / 'rejected.log').read_text().splitlines()]
+    assert [entry['row']['name'] for entry in rejected] == ['poison']
+    assert '1366' in rejected[0]['error']
+    assert not list(tmp_path.glob('forms-*.log'))
@@ -0,0 +1,49 @@
+"""Bulk read and delete of form submissions keep the unread counters exact, NULL read state included"""
+import pytest
+from extensions import db
+
+@pytest.fixture
+def submissions(app):
+    from models.form_submission import FormSubmission, rebuild_submission_counts
+
+    # Rows stored before is_read had a default have no read state; they count as unread
+    db.session.execute(FormSubmission.__table__.insert(), [
+        {'form_type': form_type, 'name': f'{form_type} {i}', 'is_read': is_read}
+        for form_type in ('contact', 'prayer_request')
+        for i, is_read in enumerate((None, None, False, True))
+    ])
+    db.session.commit()
+    rebuild_submission_counts()
+
+def unread_counts(client, admin_headers):
+    return client.get('/api/contact/form-submissions/unread-counts', headers=admin_headers).get_json()
+
+def test_counts_include_submissions_without_read_state(client, admin_headers, submissions):
+    assert unread_counts(client, admin_headers)['unread'] == {'contact': 3, 'prayer_request': 3}
+
+def test_bulk_read_marks_submissions_without_read_state(client, admin_headers, submissions):
+    from models.form_submission import FormSubmission
+
+    response = client.post('/api/contact/form-submissions/bulk/read', headers=admin_headers,
+                           json={'filter': {'form_type': 'contact'}})
+    assert response.get_json() == {'updated': 3}
+    assert FormSubmission.query.filter_by(form_type='contact').filter(FormSubmission.is_read.isnot(True)).count() == 0
+    assert unread_counts(client, admin_headers)['unread'] == {'prayer_request': 3}
+
+def test_bulk_delete_of_unread_includes_submissions_without_read_state(client, admin_headers, submissions):
+    from models.form_submission import FormSubmission
+
+    response = client.post('/api/contact/form-submissions/bulk/delete', headers=admin_headers,
+                           json={'filter': {'is_read': False}})
+    assert response.get_json() == {'deleted': 6}
+    assert FormSubmission.query.count() == 2
+    counts = unread_counts(client, admin_headers)
+    assert counts['unread'] == {} and counts['total'] == {'contact': 1, 'prayer_request': 1}
+
+def test_bulk_delete_by_ids_counts_submissions_without_read_state_as_unread(client, admin_headers, submissions):
+    response = client.post('/api/contact/form-submissions/bulk/delete', headers=admin_headers,
+                           json={'ids': [1, 4]})
+    assert response.get_json() == {'deleted': 2}
+    counts = unread_counts(client, admin_headers)
+    assert counts['unread'] == {'contact': 2, 'prayer_request': 3}
+    assert counts['total'] == {'contact': 2, 'prayer_request': 4}
@@ -0,0 +1,53 @@
+"""Keyset paging of the form submission inbox"""
+from datetime import datetime, timedelta
+import pytest
+from extensions import db
+
+@pytest.fixture
+def submissions(app):
+    from models.form_submission import FormSubmission
+
+    start = datetime(2026, 1, 1, 12, 0)
+    # Submissions 1..6, one minute apart; 5 and 6 share a timestamp to exercise the id tie-break
+    for i in range(1, 7):
+        db.session.add(FormSubmission(form_type='contact', name=f'Visitor {i}',
+                                      timestamp=start + timedelta(minutes=min(i, 5))))
+    db.session.commit()
+
+def page(client, admin_headers, query):
+    response = client.get(f'/api/contact/form-submissions?{query}', headers=admin_headers)
+    assert response.status_code == 200, response.get_json()
+    return [row['id'] for row in response.get_json()], response.headers
+
+def delete_submission(submission_id):
+    from models.form_submission import FormSubmission
+
+    db.session.delete(db.session.get(FormSubmission, submission_id))
+    db.session.commit()
+
+def test_pages_follow_the_cursor(client, admin_headers, submissions):
+    ids, headers = page(client, admin_headers, 'limit=2')
+    seen = list(ids)
+    while 'X-Next-Before-Id' in headers:
+        ids, headers = page(client, admin_headers, f"limit=2&before_id={headers['X-Next-Before-Id']}"
+                                                   f"&before_timestamp={headers['X-Next-Before-Timestamp']}")
+        seen += ids
+    assert seen == [6, 5, 4, 3, 2, 1]
+
+def test_cursor_survives_deleting_its_submission(client, admin_headers, submissions):
+    ids, headers = page(client, admin_headers, 'limit=3')
+    assert ids == [6, 5, 4] and headers['X-Next-Before-Id'] == '4'
+    delete_submission(4)
+
+    ids, _ = page(client, admin_headers, f"limit=3&before_id=4&before_timestamp={headers['X-Next-Before-Timestamp']}")
+    assert ids == [3, 2, 1]
+
+def test_id_only_cursor_falls_back_to_ids_when_its_submission_is_gone(client, admin_headers, submissions):
+    assert page(client, admin_headers, 'limit=2&before_id=5')[0] == [4, 3]
+    delete_submission(5)
+    assert page(client, admin_headers, 'limit=2&before_id=5')[0] == [4, 3]
+
+def test_invalid_cursor_timestamp(client, admin_headers, submissions):
+    for query in ('before_id=4&before_timestamp=yesterday', 'before_timestamp=2026-01-01T12:00:00'):
+        response = client.get(f'/api/contact/form-submissions?{query}', headers=admin_headers)
+        assert response.status_code == 400
@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta
+
+
+def add_announcements(count):
+    from extensions import db
+    from models.announcement import Announcement
+
+    # Old enough that MAX(updated_at) alone would put Last-Modified in the past
+    stamp = datetime.utcnow() - timedelta(days=1)
+    announcements = [Announcement(title=f'Announcement {i}', content='...', created_at=stamp, updated_at=stamp)
+                     for i in range(count)]
+    db.session.add_all(announcements)
+    db.session.commit()
+    return [a.id for a in announcements]
+
+
+def hard_delete_announcement(announcement_id):
+    from extensions import db
+    from models.announcement import Announcement
+    from utils.cache import invalidate_cache
+
+    db.session.delete(db.session.get(Announcement, announcement_id))
+    db.session.commit()
+    invalidate_cache('announcements')
+
+
+def test_unchanged_table_answers_if_modified_since_with_304(client):
+    add_announcements(2)
+    first = client.get('/api/announcements/')
+    assert first.status_code == 200
+
+    again = client.get('/api/announcements/', headers={'If-Modified-Since': first.headers['Last-Modified']})
+    assert again.status_code == 304
+
+
+def test_hard_delete_moves_last_modified_forward(client):
+    ids = add_announcements(3)
+    first = client.get('/api/announcements/')
+    assert len(first.get_json()) == 3
+
+    hard_delete_announcement(ids[0])
+
+    again = client.get('/api/announcements/', headers={'If-Modified-Since': first.headers['Last-Modified']})
+    assert again.status_code == 200
+    assert len(again.get_json()) == 2
+    assert again.last_modified > first.last_modified
+
+
+def test_deleted_detail_resource_is_404_not_304(client):
+    ids = add_announcements(2)
+    first = client.get(f'/api/announcements/{ids[0]}')
+    assert first.status_code == 200
+
+    hard_delete_announcement(ids[0])
+
+    again = client.get(f'/api/announcements/{ids[0]}', headers={'If-Modified-Since': first.headers['Last-Modified']})
+    assert again.status_code == 404
@@ -0,0 +1,23 @@
+"""SQL timing state must not outlive the statement it was started for"""
+import pytest
+from sqlalchemy.exc import OperationalError
+from extensions import db
+
+def test_failed_statement_does_not_leak_its_start_time(app):
+    with db.engine.connect() as connection:
+        with pytest.raises(OperationalError):
+            connection.exec_driver_sql('SELECT * FROM no_such_table')
+        assert connection.info.get('query_started') == []
+
+        connection.exec_driver_sql('SELECT 1')
+        assert connection.info['query_started'] == []
+
+def test_failed_statement_counts_towards_request_timing(app):
+    from flask import g
+
+    with app.test_request_context('/'):
+        app.preprocess_request()
+        with pytest.raises(OperationalError):
+            db.session.execute(db.text('SELECT * FROM no_such_table'))
+        db.session.rollback()
+        assert g.perf_queries == 1
@@ -0,0 +1,95 @@
+"""Background job backends"""
+import os
+import runpy
+import time
+from datetime import datetime, timedelta
+import pytest
+from extensions import db
+from utils.jobs import register_job, get_artifact_path, ThreadJobBackend, DatabaseJobBackend
+
+@register_job('test_echo', extension='txt', mimetype='text/plain')
+def echo_job(params, output_path):
+    with open(output_path, 'w') as f:
+        f.write(params['text'])
+
+@pytest.fixture
+def file_app(tmp_path, monkeypatch):
+    """The application on an SQLite file, so job worker threads get connections of their own
+
+    The in-memory database of the app fixture is a single connection, which
+    sqlite3 does not allow several threads to use at once.
+    """
+    from app import create_app
+    from config import Config, engine_options
+
+    uri = f"sqlite:///{tmp_path / 'jobs.db'}"
+    monkeypatch.setattr(Config, 'SQLALCHEMY_DATABASE_URI', uri)
+    monkeypatch.setattr(Config, 'SQLALCHEMY_ENGINE_OPTIONS', engine_options(uri))
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+@pytest.fixture
+def artifacts():
+    """Job ids whose artifacts are removed after the test"""
+    job_ids = []
+    yield job_ids
+    for job_id in job_ids:
+        path = get_artifact_path(f'{job_id}.txt')
+        if path:
+            os.remove(path)
+
+def wait_for(backend, job_id, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = backend.get(job_id)
+        if job and job['status'] in ('done', 'failed'):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f'job {job_id} did not finish')
+
+def test_thread_backend_forgets_finished_jobs(app, artifacts):
+    backend = ThreadJobBackend(app)
+    try:
+        job_id = backend.submit('test_echo', {'text': 'hi'})
+        artifacts.append(job_id)
+        job = wait_for(backend, job_id)
+        assert job['status'] == 'done'
+
+        backend.forget_finished(job['finished_at'])
+        assert backend.get(job_id) is not None
+        backend.forget_finished(job['finished_at'] + timedelta(seconds=1))
+        assert backend.get(job_id) is None
+    finally:
+        backend.shutdown()
+
+def test_database_backend_jobs_are_visible_to_every_process(file_app, artifacts):
+    # A second backend on the same database stands in for another gunicorn worker
+    worker, other_worker = DatabaseJobBackend(file_app), DatabaseJobBackend(file_app)
+    file_app.config['JOB_POLL_INTERVAL'] = 0.05
+    try:
+        job_id = worker.submit('test_echo', {'text': 'hi'})
+        artifacts.append(job_id)
+        job = wait_for(other_worker, job_id)
+        assert job['status'] == 'done' and job['artifact'] == f'{job_id}.txt'
+
+        other_worker.forget_finished(datetime.utcnow() - timedelta(hours=1))
+        assert worker.get(job_id) is not None
+        other_worker.forget_finished(datetime.utcnow() + timedelta(seconds=1))
+        assert worker.get(job_id) is None
+    finally:
+        worker.shutdown()
+        other_worker.shutdown()
+
+def test_gunicorn_refuses_the_thread_backend_with_several_workers(monkeypatch):
+    config = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'gunicorn.conf.py')
+    monkeypatch.setenv('JOB_BACKEND', 'thread')
+    monkeypatch.setenv('GUNICORN_WORKERS', '2')
+    with pytest.raises(ValueError, match='JOB_BACKEND'):
+        runpy.run_path(config)
+    monkeypatch.setenv('GUNICORN_WORKERS', '1')
+    assert runpy.run_path(config)['workers'] == 1
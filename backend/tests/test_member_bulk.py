@@ -0,0 +1,74 @@
+"""Bulk member actions select by ids or by the listing filters, set-based in the database"""
+import pytest
+from extensions import db
+from test_member_listing_queries import add_members, add_ministries
+
+@pytest.fixture
+def members(app):
+    # 20 members, odd ids Female; the first ten are in ministry 1
+    ministry_id, = add_ministries(1)
+    add_members(10, [ministry_id])
+    add_members(10, [])
+    return ministry_id
+
+def active_ids():
+    from models.church_member import ChurchMember
+    return {member_id for member_id, in db.session.query(ChurchMember.id).filter(ChurchMember.is_active == True)}
+
+def ministry_member_ids(ministry_id):
+    from models.church_member import MemberMinistry
+    return sorted(member_id for member_id, in db.session.query(MemberMinistry.member_id).filter_by(
+        ministry_id=ministry_id, is_active=True))
+
+def test_status_by_ids(client, admin_headers, members):
+    response = client.post('/api/church-members/bulk/status', headers=admin_headers,
+                           json={'ids': [1, 2, 3, 999], 'is_active': False})
+    assert response.get_json() == {'updated': 3}
+    assert active_ids() == set(range(4, 21))
+
+def test_status_by_filter_runs_one_update(client, admin_headers, count_queries, members):
+    client.get('/api/church-members/?limit=1', headers=admin_headers)
+    with count_queries() as queries:
+        response = client.post('/api/church-members/bulk/status', headers=admin_headers,
+                               json={'filter': {'ministry_id': members, 'gender': 'Female'}, 'is_active': False})
+    assert response.get_json() == {'updated': 5}
+    assert active_ids() == set(range(1, 21)) - {2, 4, 6, 8, 10}
+    # The selected ids are never read back into the app
+    assert [statement.split()[0] for statement in queries.statements] == ['UPDATE']
+
+def test_status_by_search_filter(client, admin_headers, members):
+    response = client.post('/api/church-members/bulk/status', headers=admin_headers,
+                           json={'filter': {'search': 'member1'}, 'is_active': False})
+    # Member1 of either batch
+    assert response.get_json() == {'updated': 2}
+    assert active_ids() == set(range(1, 21)) - {2, 12}
+
+def test_assign_ministry_by_filter_skips_current_members(client, admin_headers, count_queries, members):
+    ministry_id, = add_ministries(1, 'Choir')
+    response = client.post('/api/church-members/bulk/ministries', headers=admin_headers,
+                           json={'ministry_id': ministry_id, 'ids': [1, 2]})
+    assert response.get_json() == {'assigned': 2, 'already_assigned': 0}
+
+    with count_queries() as queries:
+        response = client.post('/api/church-members/bulk/ministries', headers=admin_headers,
+                               json={'ministry_id': ministry_id, 'role': 'Singer', 'filter': {'ministry_id': members}})
+    assert response.get_json() == {'assigned': 8, 'already_assigned': 2}
+    assert ministry_member_ids(ministry_id) == list(range(1, 11))
+    assert [statement.split()[0] for statement in queries.statements][-2:] == ['SELECT', 'INSERT']
+
+def test_bulk_selection_errors(client, admin_headers, members):
+    for body in ({'is_active': False}, {'is_active': False, 'filter': {}}, {'is_active': False, 'filter': {'city': 'x'}},
+                 {'is_active': False, 'ids': [1], 'filter': {'gender': 'Male'}}):
+        response = client.post('/api/church-members/bulk/status', headers=admin_headers, json=body)
+        assert response.status_code == 400, body
+    assert active_ids() == set(range(1, 21))
+
+def test_search_without_usable_tokens_matches_nothing(client, admin_headers, members):
+    response = client.get('/api/church-members/?search=!!!', headers=admin_headers)
+    assert response.get_json() == []
+    assert response.headers['X-Total-Count'] == '0'
+
+    response = client.post('/api/church-members/bulk/status', headers=admin_headers,
+                           json={'filter': {'search': '!!!'}, 'is_active': False})
+    assert response.get_json() == {'updated': 0}
+    assert active_ids() == set(range(1, 21))
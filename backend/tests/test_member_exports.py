@@ -0,0 +1,55 @@
+"""Member exports are rendered a batch at a time and match the listing filters"""
+import re
+import pytest
+from io import BytesIO
+from test_member_listing_queries import add_members
+
+def pdf_page_count(data):
+    return len(re.findall(rb'/Type /Page\b(?!s)', data))
+
+def test_pdf_layout_matches_doc_template(tmp_path):
+    # The page by page build must paginate exactly like SimpleDocTemplate.build
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.units import inch
+    from reportlab.pdfgen.canvas import Canvas
+    from reportlab.platypus import Frame, SimpleDocTemplate, Table
+    from controllers.church_member_controller import _draw_pdf_pages
+
+    def tables():
+        return [Table([['Name', 'Status']] + [[f'Member{i}', 'Active'] for i in range(start, start + 40)], repeatRows=1)
+                for start in range(0, 1000, 40)]
+
+    SimpleDocTemplate(str(tmp_path / 'expected.pdf'), pagesize=letter).build(tables())
+    width, height = letter
+    pages = _draw_pdf_pages(Canvas(str(tmp_path / 'actual.pdf'), pagesize=letter),
+                            lambda: Frame(inch, inch, width - 2*inch, height - 2*inch),
+                            ([table] for table in tables()))
+
+    expected = pdf_page_count((tmp_path / 'expected.pdf').read_bytes())
+    assert expected > 1
+    assert pages == pdf_page_count((tmp_path / 'actual.pdf').read_bytes()) == expected
+
+@pytest.mark.parametrize('count, pages', [(0, 1), (300, 10)])
+def test_pdf_export_page_count(client, admin_headers, count, pages):
+    add_members(count, [])
+    response = client.get('/api/church-members/export-pdf', headers=admin_headers)
+    assert response.status_code == 200
+    assert response.mimetype == 'application/pdf'
+    assert pdf_page_count(response.get_data()) == pages
+
+def test_xlsx_export_applies_filters(client, admin_headers, monkeypatch):
+    openpyxl = pytest.importorskip('openpyxl')
+    import controllers.church_member_controller as members
+
+    # Several batches, so rows come from more than one query
+    monkeypatch.setattr(members, 'EXPORT_BATCH_SIZE', 7)
+    add_members(30, [])
+    response = client.get('/api/church-members/export-xlsx?gender=Female', headers=admin_headers)
+    assert response.status_code == 200
+    assert response.mimetype == members.XLSX_MIMETYPE
+
+    rows = list(openpyxl.load_workbook(BytesIO(response.get_data())).active.values)
+    assert list(rows[0]) == members.EXPORT_COLUMNS
+    # Odd members are Female
+    assert [row[0] for row in rows[1:]] == [f'Member{i} Test' for i in range(1, 30, 2)]
+    assert all(row[3] == 'Female' for row in rows[1:])
@@ -0,0 +1,91 @@
+"""The member listing and detail views must not issue queries per member or per assignment"""
+import pytest
+from extensions import db
+
+def add_members(count, ministry_ids):
+    from models.church_member import ChurchMember, MemberMinistry
+
+    for i in range(count):
+        member = ChurchMember(first_name=f'Member{i}', last_name='Test', gender='Female' if i % 2 else 'Male')
+        db.session.add(member)
+        db.session.flush()
+        for ministry_id in ministry_ids:
+            db.session.add(MemberMinistry(member_id=member.id, ministry_id=ministry_id, role='Member'))
+    db.session.commit()
+
+def add_ministries(count, prefix='Ministry'):
+    from models.ministry import Ministry
+
+    ministries = [Ministry(name=f'{prefix} {i}', slug=f'{prefix.lower()}-{i}') for i in range(count)]
+    db.session.add_all(ministries)
+    db.session.commit()
+    return [ministry.id for ministry in ministries]
+
+@pytest.fixture
+def ministry_ids(app):
+    return add_ministries(3)
+
+def list_members(client, admin_headers, count_queries, query_string=''):
+    from controllers.church_member_controller import invalidate_member_count_cache
+
+    invalidate_member_count_cache()
+    db.session.expunge_all()
+    with count_queries() as queries:
+        response = client.get(f'/api/church-members/{query_string}', headers=admin_headers)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json(), len(queries)
+
+@pytest.mark.parametrize('query_string, share', [('', 1), ('?limit=500', 1), ('?gender=Female&is_active=true', 0.5)])
+def test_listing_query_count_does_not_grow_with_members(client, admin_headers, count_queries, ministry_ids,
+                                                        query_string, share):
+    # Warm up so the admin lookup is cached and not part of either count
+    client.get('/api/church-members/?limit=1', headers=admin_headers)
+
+    add_members(10, ministry_ids)
+    members, few = list_members(client, admin_headers, count_queries, query_string)
+    assert len(members) == 10 * share
+    assert all(len(m['ministry_assignments']) == 3 for m in members)
+    assert all(a['ministry_name'] for m in members for a in m['ministry_assignments'])
+
+    add_members(90, ministry_ids)
+    members, many = list_members(client, admin_headers, count_queries, query_string)
+    assert len(members) == 100 * share
+
+    # Count, members, then one SELECT ... IN for all assignments with their ministries
+    assert few == many <= 3
+
+def test_member_detail_query_count_does_not_grow_with_assignments(client, admin_headers, count_queries, ministry_ids):
+    from models.church_member import MemberMinistry
+
+    client.get('/api/church-members/?limit=1', headers=admin_headers)
+    add_members(1, ministry_ids)
+    db.session.expunge_all()
+    with count_queries() as queries:
+        response = client.get('/api/church-members/1', headers=admin_headers)
+    few = len(queries)
+    assert len(response.get_json()['ministry_assignments']) == 3
+
+    db.session.add_all(MemberMinistry(member_id=1, ministry_id=ministry_id) for ministry_id in add_ministries(10, 'Extra'))
+    db.session.commit()
+    db.session.expunge_all()
+    with count_queries() as queries:
+        response = client.get('/api/church-members/1', headers=admin_headers)
+    assert len(response.get_json()['ministry_assignments']) == 13
+    assert len(queries) == few
+
+def test_member_count_cache_is_bounded(client, admin_headers, ministry_ids):
+    from controllers import church_member_controller
+
+    add_members(3, ministry_ids)
+    for i in range(church_member_controller.MEMBER_COUNT_CACHE_ENTRIES + 50):
+        response = client.get(f'/api/church-members/?limit=1&search=member{i}', headers=admin_headers)
+        assert response.status_code == 200
+    assert len(church_member_controller._member_counts._entries) == church_member_controller.MEMBER_COUNT_CACHE_ENTRIES
+
+    # A write drops cached counts right away
+    response = client.get('/api/church-members/?limit=1', headers=admin_headers)
+    assert response.headers['X-Total-Count'] == '3'
+    response = client.post('/api/church-members/', json={'first_name': 'New', 'last_name': 'Member'}, headers=admin_headers)
+    assert response.status_code == 201
+    response = client.get('/api/church-members/?limit=1', headers=admin_headers)
+    assert response.headers['X-Total-Count'] == '4'
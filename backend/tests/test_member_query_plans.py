@@ -0,0 +1,45 @@
+"""Every member filter combination must be answered from its index (EXPLAIN QUERY PLAN on SQLite)"""
+import pytest
+from extensions import db
+from utils.member_query import build_member_query
+
+MINISTRY_INDEX = 'ix_member_ministry_ministry_active_member'
+ACTIVE_GENDER_INDEX = 'ix_church_member_active_gender'
+ACTIVE_MARITAL_INDEX = 'ix_church_member_active_marital'
+SEARCH_TERM_INDEX = 'ix_member_search_term_term'
+
+FILTER_PLANS = [
+    ({'ministry_id': 1}, [MINISTRY_INDEX]),
+    # Either composite index serves is_active alone through its leading column
+    ({'is_active': True}, ['ix_church_member_active_']),
+    ({'is_active': True, 'gender': 'Female'}, [ACTIVE_GENDER_INDEX]),
+    ({'is_active': False, 'marital_status': 'Married'}, [ACTIVE_MARITAL_INDEX]),
+    ({'search': 'john'}, [SEARCH_TERM_INDEX]),
+    ({'search': 'john doe'}, [SEARCH_TERM_INDEX]),
+    ({'search': '0712 345'}, [SEARCH_TERM_INDEX]),
+    ({'ministry_id': 1, 'is_active': True}, [MINISTRY_INDEX, 'ix_church_member_active_']),
+    ({'ministry_id': 1, 'gender': 'Female'}, [MINISTRY_INDEX]),
+    ({'ministry_id': 1, 'is_active': True, 'gender': 'Female'}, [MINISTRY_INDEX, ACTIVE_GENDER_INDEX]),
+    ({'ministry_id': 1, 'is_active': True, 'marital_status': 'Single'}, [MINISTRY_INDEX, ACTIVE_MARITAL_INDEX]),
+    ({'ministry_id': 1, 'search': 'john'}, [MINISTRY_INDEX, SEARCH_TERM_INDEX]),
+    ({'is_active': True, 'gender': 'Male', 'search': 'john'}, [SEARCH_TERM_INDEX]),
+    ({'ministry_id': 2, 'is_active': True, 'gender': 'Male', 'marital_status': 'Married', 'search': 'mary'},
+     [MINISTRY_INDEX, SEARCH_TERM_INDEX]),
+]
+
+def query_plan(query):
+    """EXPLAIN QUERY PLAN details of query, run with bound parameters like the real request"""
+    compiled = query.statement.compile(dialect=db.engine.dialect, compile_kwargs={'render_postcompile': True})
+    parameters = tuple(compiled.params[name] for name in compiled.positiontup)
+    rows = db.session.connection().exec_driver_sql(f'EXPLAIN QUERY PLAN {compiled.string}', parameters)
+    return [row[-1] for row in rows]
+
+@pytest.mark.parametrize('filters, indexes', FILTER_PLANS, ids=lambda value: '+'.join(value) if isinstance(value, dict) else None)
+def test_member_filters_use_their_indexes(app, filters, indexes):
+    plan = query_plan(build_member_query(filters))
+    details = '\n'.join(plan)
+
+    for index in indexes:
+        assert index in details, f"{index} not used for {filters}:\n{details}"
+    assert not any(detail.startswith('SCAN church_member') for detail in plan), details
+    assert not any(detail.startswith('SCAN member_search_term') for detail in plan), details
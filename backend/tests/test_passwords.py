@@ -0,0 +1,65 @@
+"""The password hashing pool sheds load before it holds every request thread"""
+import threading
+import pytest
+from flask import Flask
+from extensions import db
+
+@pytest.fixture
+def fresh_pool():
+    from utils import passwords
+
+    passwords._reset_after_fork()
+    yield
+    passwords._reset_after_fork()
+
+@pytest.mark.parametrize('env, expected', [
+    ({'GUNICORN_THREADS': '4'}, 2),
+    ({'GUNICORN_THREADS': '8'}, 6),
+    ({'WORKER_MODE': 'sync'}, 0)
+])
+def test_max_pending_leaves_a_request_thread_free(monkeypatch, env, expected):
+    from utils.passwords import init_passwords
+
+    for key in ('WORKER_MODE', 'GUNICORN_THREADS', 'PASSWORD_HASH_WORKERS', 'PASSWORD_HASH_MAX_PENDING'):
+        monkeypatch.delenv(key, raising=False)
+    for key, value in env.items():
+        monkeypatch.setenv(key, value)
+    app = Flask(__name__)
+    init_passwords(app)
+    assert app.config['PASSWORD_HASH_MAX_PENDING'] == expected
+
+def test_login_is_answered_503_when_the_pool_is_full(app, client, fresh_pool):
+    from models.user import User
+    from utils import passwords
+
+    user = User(username='pastor', email='pastor@example.org')
+    user.set_password('secret')
+    db.session.add(user)
+    db.session.commit()
+
+    # One hashing thread and no queue: a hash in progress fills the pool
+    app.config.update(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_MAX_PENDING=0)
+    passwords._reset_after_fork()
+    running, release = threading.Event(), threading.Event()
+
+    def slow_hash():
+        running.set()
+        release.wait(5)
+
+    def hold():
+        with app.app_context():
+            passwords._run(slow_hash)
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    try:
+        assert running.wait(5)
+        response = client.post('/api/auth/login', json={'username': 'pastor', 'password': 'secret'})
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
+    finally:
+        release.set()
+        holder.join(5)
+
+    response = client.post('/api/auth/login', json={'username': 'pastor', 'password': 'secret'})
+    assert response.status_code == 200
@@ -0,0 +1,234 @@
+"""
+Response cache for the public read endpoints.
+
+@cached('pastors') stores the serialized JSON body of a successful GET per
+path and query string. Every key embeds a version token for its namespace,
+and @invalidates_cache('pastors') on the admin write handlers drops that
+token, so the next read starts a fresh generation and the old entries are
+never read again (they age out through the TTL / LRU).
+
+Backends implement the small subset of the redis-py client used here
+(get, set with ex/nx, delete), selected by CACHE_BACKEND:
+
+- 'memory' (default): per-process LRU with TTL. Invalidation only reaches the
+  process that handled the write, other workers may serve the old response
+  for up to CACHE_DEFAULT_TTL seconds
+- 'redis': shared by all workers, needs the redis package and CACHE_REDIS_URL
+
+Any object with the same methods can be passed to init_cache(app, backend=...).
+"""
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+from functools import wraps
+from collections import OrderedDict
+from urllib.parse import urlencode
+from flask import current_app, request, make_response
+
+logger = logging.getLogger(__name__)
+
+class MemoryCache:
+    """Thread-safe in-process LRU cache with per-entry TTL"""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ex=None, nx=False):
+        with self._lock:
+            if nx and key in self._entries:
+                _, expires_at = self._entries[key]
+                if expires_at is None or expires_at > time.monotonic():
+                    return None
+            self._entries[key] = (value, time.monotonic() + ex if ex else None)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def delete(self, *keys):
+        with self._lock:
+            return sum(1 for key in keys if self._entries.pop(key, None) is not None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+def _memory_backend(app):
+    return MemoryCache(max_entries=app.config['CACHE_MAX_ENTRIES'])
+
+def _redis_backend(app):
+    try:
+        import redis
+    except ImportError:
+        raise RuntimeError("CACHE_BACKEND 'redis' requires the redis package (pip install redis)")
+    return redis.Redis.from_url(app.config['CACHE_REDIS_URL'])
+
+CACHE_BACKENDS = {
+    'memory': _memory_backend,
+    'redis': _redis_backend
+}
+
+def init_cache(app, backend=None):
+    """Configure the response cache for app; backend overrides CACHE_BACKEND"""
+    app.config.setdefault('CACHE_BACKEND', os.getenv('CACHE_BACKEND', 'memory'))
+    app.config.setdefault('CACHE_DEFAULT_TTL', int(os.getenv('CACHE_DEFAULT_TTL', 300)))
+    app.config.setdefault('CACHE_MAX_ENTRIES', int(os.getenv('CACHE_MAX_ENTRIES', 1024)))
+    app.config.setdefault('CACHE_REDIS_URL', os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/0'))
+    app.config.setdefault('CACHE_KEY_PREFIX', os.getenv('CACHE_KEY_PREFIX', 'dck'))
+    app.config.setdefault('CACHE_HTTP_MAX_AGE', int(os.getenv('CACHE_HTTP_MAX_AGE', 60)))
+
+    if backend is None:
+        name = app.config['CACHE_BACKEND']
+        if name not in CACHE_BACKENDS:
+            raise ValueError(f"Unknown CACHE_BACKEND '{name}', expected one of {', '.join(CACHE_BACKENDS)}")
+        backend = CACHE_BACKENDS[name](app)
+    app.extensions['cache'] = backend
+
+def get_cache():
+    """The configured cache backend, or None when init_cache was not called"""
+    return current_app.extensions.get('cache')
+
+def _text(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+def _version_key(namespace):
+    return f"{current_app.config['CACHE_KEY_PREFIX']}:version:{namespace}"
+
+def _namespace_version(cache, namespace):
+    """Current version token of a namespace, starting a new one if there is none"""
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        # nx so concurrent workers agree on a single token
+        cache.set(key, uuid.uuid4().hex[:12], nx=True)
+        version = cache.get(key)
+    return _text(version)
+
+def _response_key(namespace, version):
+    query = urlencode(sorted(request.args.items(multi=True)))
+    return f"{current_app.config['CACHE_KEY_PREFIX']}:response:{namespace}:{version}:{request.path}?{query}"
+
+def cached(namespace, ttl=None):
+    """Cache the JSON body of a successful GET view under namespace"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            cache = get_cache()
+            if cache is None or request.method != 'GET':
+                return view(*args, **kwargs)
+
+            try:
+                key = _response_key(namespace, _namespace_version(cache, namespace))
+                body = cache.get(key)
+            except Exception as e:
+                # A cache outage must not take the public site down with it
+                logger.warning(f"Cache read failed for {namespace}: {e}")
+                return view(*args, **kwargs)
+
+            if body is not None:
+                response = current_app.response_class(body, mimetype='application/json')
+                response.headers['X-Cache'] = 'HIT'
+                return response
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200 and response.mimetype == 'application/json':
+                try:
+                    cache.set(key, response.get_data(), ex=ttl or current_app.config['CACHE_DEFAULT_TTL'])
+                except Exception as e:
+                    logger.warning(f"Cache write failed for {namespace}: {e}")
+            response.headers['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
+
+def _value_key(cache, namespaces, name):
+    versions = '.'.join(_namespace_version(cache, namespace) for namespace in namespaces)
+    return f"{current_app.config['CACHE_KEY_PREFIX']}:value:{'+'.join(namespaces)}:{versions}:{name}"
+
+def cached_bytes(namespaces, name, compute, ttl=None, refresh=False):
+    """Return compute() (bytes), memoized until any of namespaces is invalidated
+
+    namespaces is a single namespace or a tuple of them; refresh recomputes
+    and stores the value even if it is cached.
+    """
+    namespaces = (namespaces,) if isinstance(namespaces, str) else tuple(namespaces)
+    cache = get_cache()
+    if cache is None:
+        return compute()
+
+    try:
+        key = _value_key(cache, namespaces, name)
+        value = None if refresh else cache.get(key)
+    except Exception as e:
+        logger.warning(f"Cache read failed for {', '.join(namespaces)}: {e}")
+        return compute()
+    if value is not None:
+        return value
+
+    value = compute()
+    try:
+        cache.set(key, value, ex=ttl or current_app.config['CACHE_DEFAULT_TTL'])
+    except Exception as e:
+        logger.warning(f"Cache write failed for {', '.join(namespaces)}: {e}")
+    return value
+
+def cached_value(namespaces, name, compute, ttl=None):
+    """Like cached_bytes for any JSON serializable value"""
+    raw = cached_bytes(namespaces, name, lambda: json.dumps(compute()).encode(), ttl=ttl)
+    return json.loads(raw)
+
+_invalidation_hooks = []
+
+def on_invalidate(*namespaces):
+    """Register func() to run after any of namespaces (or any namespace, when none are given) is invalidated"""
+    def decorator(func):
+        _invalidation_hooks.append((set(namespaces), func))
+        return func
+    return decorator
+
+def invalidate_cache(*namespaces):
+    """Drop every cached response of the given namespaces and run their invalidation hooks"""
+    cache = get_cache()
+    if cache is None:
+        return
+    try:
+        cache.delete(*[_version_key(namespace) for namespace in namespaces])
+    except Exception as e:
+        logger.warning(f"Cache invalidation failed for {', '.join(namespaces)}: {e}")
+        return
+
+    for hook_namespaces, func in _invalidation_hooks:
+        if not hook_namespaces or hook_namespaces.intersection(namespaces):
+            try:
+                func()
+            except Exception as e:
+                logger.warning(f"Cache rebuild {func.__name__} failed: {e}")
+
+def invalidates_cache(*namespaces):
+    """Invalidate namespaces after the wrapped write view succeeds"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            response = make_response(view(*args, **kwargs))
+            if response.status_code < 400:
+                invalidate_cache(*namespaces)
+            return response
+        return wrapper
+    return decorator
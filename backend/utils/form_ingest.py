@@ -0,0 +1,351 @@
+"""
+Write-behind ingestion of public form submissions.
+
+With FORM_INGEST='batched' (default) a submission is validated, appended to a
+local append-only log and acknowledged; a background flusher thread in each
+worker later writes it to form_submission together with the submissions
+around it, as one multi-row INSERT per batch. FORM_INGEST='direct' inserts
+each submission in the request as before.
+
+The log is a directory of segment files (FORM_INGEST_DIR), one open segment
+per worker process. A segment is sealed and inserted once it holds
+FORM_INGEST_BATCH_SIZE submissions or its oldest one has waited
+FORM_INGEST_MAX_AGE_MS, and deleted once the INSERT has committed. Each
+append is fsynced (FORM_INGEST_FSYNC) before the request is answered, so an
+acknowledged submission survives a crash of the worker or the host. Segments
+left behind by a dead process are inserted by the next worker to start; an
+exclusive flock tells a live worker's segments from orphaned ones.
+
+If the database is unavailable, segments stay on disk and the flusher retries
+every FORM_INGEST_RETRY_SECONDS, while the forms keep accepting submissions.
+A row the database refuses (e.g. a value too long for its column) does not
+block its batch: it is skipped and appended to rejected.log in the same
+directory. A segment that fails with any other error FORM_INGEST_MAX_ATTEMPTS
+times in a row (e.g. MySQL's 1366 Incorrect string value, raised as
+OperationalError) is inserted row by row, and the rows that still fail go to
+rejected.log, so one bad row cannot hold back the queue. Errors that drop the
+connection count as an outage and are retried. A crash between a batch's
+COMMIT and the deletion of its segment inserts that batch a second time on
+recovery.
+"""
+import os
+import json
+import time
+import atexit
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from flask import current_app, request
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, IntegrityError, SQLAlchemyError
+from extensions import db
+
+try:
+    import fcntl
+except ImportError:
+    # Windows development server: single process, no segment locking
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Column lengths of FormSubmission, checked up front so one long value cannot fail a whole batch
+FIELD_LIMITS = {'name': 100, 'email': 120, 'phone': 20}
+
+class SubmissionInvalid(ValueError):
+    """A submission that is rejected with 400 before it is accepted"""
+
+def form_payload():
+    """The JSON object posted to a form endpoint"""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        raise SubmissionInvalid('Expected a JSON object')
+    if len(json.dumps(data, default=str)) > current_app.config['FORM_INGEST_MAX_BYTES']:
+        raise SubmissionInvalid('Submission is too large')
+    return data
+
+def submit_form(form_type, data, name=None, email=None, phone=None, message=None):
+    """Validate a form submission and store it, through the log or directly depending on FORM_INGEST"""
+    row = {'form_type': form_type, 'name': name, 'email': email, 'phone': phone, 'message': message}
+    for field, limit in FIELD_LIMITS.items():
+        if row[field] is not None:
+            row[field] = str(row[field])
+            if len(row[field]) > limit:
+                raise SubmissionInvalid(f'{field} must be at most {limit} characters')
+    if message is not None:
+        row['message'] = str(message)
+    row.update(additional_data=data, is_read=False, timestamp=datetime.utcnow().isoformat())
+
+    if current_app.config['FORM_INGEST'] == 'direct':
+        from models.form_submission import record_inserted_submissions
+        db.session.execute(insert(_table()), [_values(row)])
+        record_inserted_submissions(db.session.connection(), [row])
+        db.session.commit()
+    else:
+        get_ingestor().append(row)
+
+def _table():
+    from models.form_submission import FormSubmission
+    return FormSubmission.__table__
+
+def _values(row):
+    return dict(row, timestamp=datetime.fromisoformat(row['timestamp']))
+
+class Segment:
+    """One log file and the submissions appended to it"""
+
+    def __init__(self, path, file, rows):
+        self.path = path
+        self.file = file
+        self.rows = rows
+        self.opened_at = time.monotonic()
+        self.attempts = 0
+
+    def discard(self):
+        # Unlink while still holding the lock, so no starting worker can pick the file up in between
+        if fcntl is not None:
+            os.unlink(self.path)
+            self.file.close()
+        else:
+            self.file.close()
+            os.unlink(self.path)
+
+class FormIngestor:
+    """The log and flusher thread of one worker process"""
+
+    def __init__(self, app):
+        self.app = app
+        self.folder = app.config['FORM_INGEST_DIR']
+        self.batch_size = app.config['FORM_INGEST_BATCH_SIZE']
+        self.max_age = app.config['FORM_INGEST_MAX_AGE_MS'] / 1000
+        self.retry_seconds = app.config['FORM_INGEST_RETRY_SECONDS']
+        self.max_attempts = app.config['FORM_INGEST_MAX_ATTEMPTS']
+        self.fsync = app.config['FORM_INGEST_FSYNC']
+        self.lock = threading.Lock()
+        self.wakeup = threading.Condition(self.lock)
+        self.active = None
+        self.sealed = deque()
+        self.sequence = 0
+        self.stopping = False
+        self.stats = {'accepted': 0, 'inserted': 0, 'batches': 0, 'rejected': 0, 'recovered': 0,
+                      'failures': 0, 'last_error': None}
+        os.makedirs(self.folder, exist_ok=True)
+        self.thread = threading.Thread(target=self._run, name='form-ingest', daemon=True)
+        self.thread.start()
+        atexit.register(self.stop)
+
+    def append(self, row):
+        line = (json.dumps(row, default=str) + '\n').encode()
+        with self.lock:
+            if self.active is None:
+                self.active = self._open_segment()
+                # The flusher may be waiting without a deadline; give it this segment's
+                self.wakeup.notify()
+            self.active.file.write(line)
+            self.active.file.flush()
+            if self.fsync:
+                os.fsync(self.active.file.fileno())
+            self.active.rows.append(row)
+            self.stats['accepted'] += 1
+            if len(self.active.rows) >= self.batch_size:
+                self._seal()
+
+    def _open_segment(self):
+        self.sequence += 1
+        path = os.path.join(self.folder, f'forms-{os.getpid()}-{int(time.time() * 1000)}-{self.sequence}.log')
+        file = open(path, 'ab')
+        if fcntl is not None:
+            fcntl.flock(file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return Segment(path, file, [])
+
+    def _seal(self):
+        """Queue the active segment for insertion; called with the lock held"""
+        self.sealed.append(self.active)
+        self.active = None
+        self.wakeup.notify()
+
+    def _recover(self):
+        """Queue the segments of processes that died before inserting them"""
+        for name in sorted(os.listdir(self.folder)):
+            if not (name.startswith('forms-') and name.endswith('.log')):
+                continue
+            path = os.path.join(self.folder, name)
+            try:
+                file = open(path, 'rb')
+            except FileNotFoundError:
+                continue
+            if fcntl is not None:
+                try:
+                    fcntl.flock(file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    # A live worker's segment
+                    file.close()
+                    continue
+                if not os.path.exists(path):
+                    # Inserted and deleted by its owner while we were opening it
+                    file.close()
+                    continue
+            elif name.startswith(f'forms-{os.getpid()}-'):
+                file.close()
+                continue
+            rows = []
+            for line in file.read().splitlines():
+                try:
+                    rows.append(json.loads(line))
+                except ValueError:
+                    # The last line of a segment can be torn by a crash mid-write; it was never acknowledged
+                    logger.warning('Skipping unreadable line in %s', path)
+            with self.lock:
+                self.sealed.append(Segment(path, file, rows))
+                self.stats['recovered'] += len(rows)
+            logger.info('Recovered %d form submissions from %s', len(rows), name)
+
+    def _run(self):
+        try:
+            self._recover()
+        except OSError:
+            logger.exception('Form submission log recovery failed')
+        while True:
+            with self.lock:
+                while not self.sealed and not self.stopping:
+                    timeout = None
+                    if self.active is not None:
+                        timeout = self.max_age - (time.monotonic() - self.active.opened_at)
+                        if timeout <= 0:
+                            self._seal()
+                            break
+                    self.wakeup.wait(timeout)
+                if self.stopping and self.active is not None:
+                    self._seal()
+                if not self.sealed:
+                    return
+                segment = self.sealed[0]
+
+            inserted = self._insert(segment)
+            if inserted is not None:
+                with self.lock:
+                    self.sealed.popleft()
+                    self.stats['inserted'] += inserted
+                    self.stats['batches'] += 1
+                segment.discard()
+            elif self.stopping:
+                # Leave the remaining segments on disk for the next worker
+                return
+            else:
+                with self.lock:
+                    self.wakeup.wait(self.retry_seconds)
+
+    def _insert(self, segment):
+        """Insert a segment's rows in one transaction and return how many went in; None when it must be retried"""
+        from models.form_submission import record_inserted_submissions
+
+        rows = segment.rows
+        try:
+            with self.app.app_context():
+                if segment.attempts < self.max_attempts:
+                    try:
+                        with db.engine.begin() as connection:
+                            connection.execute(insert(_table()), [_values(row) for row in rows])
+                            record_inserted_submissions(connection, rows)
+                        return len(rows)
+                    except (DataError, IntegrityError):
+                        return self._insert_each(rows, (DataError, IntegrityError))
+                # Failed too often as a batch: find the rows the database will not take
+                return self._insert_each(rows, SQLAlchemyError)
+        except SQLAlchemyError as error:
+            # Not str(error): it would put the submitted names and messages in the log
+            reason = str(getattr(error, 'orig', None) or error.__class__.__name__)
+            segment.attempts += 1
+            with self.lock:
+                self.stats['failures'] += 1
+                self.stats['last_error'] = reason
+            logger.warning('Inserting %d form submissions failed (attempt %d), retrying in %ss: %s',
+                           len(rows), segment.attempts, self.retry_seconds, reason)
+            return None
+
+    def _insert_each(self, rows, refused):
+        """Insert rows one savepoint each, rejecting those that raise refused; returns how many went in"""
+        from models.form_submission import record_inserted_submissions
+
+        inserted, rejected = [], []
+        with db.engine.begin() as connection:
+            for row in rows:
+                try:
+                    with connection.begin_nested():
+                        connection.execute(insert(_table()), [_values(row)])
+                    inserted.append(row)
+                except refused as error:
+                    if getattr(error, 'connection_invalidated', False):
+                        # The database went away, not this row
+                        raise
+                    rejected.append({'row': row, 'error': str(getattr(error, 'orig', None) or error)})
+            record_inserted_submissions(connection, inserted)
+        if rejected:
+            self._reject(rejected)
+        return len(inserted)
+
+    def _reject(self, rejected):
+        with open(os.path.join(self.folder, 'rejected.log'), 'a') as file:
+            for entry in rejected:
+                file.write(json.dumps(entry, default=str) + '\n')
+        with self.lock:
+            self.stats['rejected'] += len(rejected)
+        logger.error('%d form submissions were refused by the database and written to rejected.log', len(rejected))
+
+    def stop(self, timeout=None):
+        """Insert what is pending and stop the flusher; segments that cannot be inserted stay on disk"""
+        with self.lock:
+            self.stopping = True
+            self.wakeup.notify()
+        self.thread.join(self.app.config['FORM_INGEST_SHUTDOWN_SECONDS'] if timeout is None else timeout)
+
+    def status(self):
+        with self.lock:
+            segments = list(self.sealed) + ([self.active] if self.active is not None else [])
+            oldest = min((segment.opened_at for segment in segments), default=None)
+            return dict(self.stats,
+                        pending=sum(len(segment.rows) for segment in segments),
+                        pending_segments=len(segments),
+                        oldest_pending_seconds=round(time.monotonic() - oldest, 3) if oldest is not None else 0)
+
+def init_form_ingest(app):
+    """Configure form submission ingestion for app"""
+    app.config.setdefault('FORM_INGEST', os.getenv('FORM_INGEST', 'batched'))
+    app.config.setdefault('FORM_INGEST_DIR', os.getenv(
+        'FORM_INGEST_DIR', os.path.join(os.path.dirname(app.root_path), 'spool', 'forms')))
+    app.config.setdefault('FORM_INGEST_BATCH_SIZE', int(os.getenv('FORM_INGEST_BATCH_SIZE', 100)))
+    app.config.setdefault('FORM_INGEST_MAX_AGE_MS', int(os.getenv('FORM_INGEST_MAX_AGE_MS', 1000)))
+    app.config.setdefault('FORM_INGEST_RETRY_SECONDS', int(os.getenv('FORM_INGEST_RETRY_SECONDS', 5)))
+    app.config.setdefault('FORM_INGEST_MAX_ATTEMPTS', int(os.getenv('FORM_INGEST_MAX_ATTEMPTS', 5)))
+    app.config.setdefault('FORM_INGEST_SHUTDOWN_SECONDS', int(os.getenv('FORM_INGEST_SHUTDOWN_SECONDS', 10)))
+    app.config.setdefault('FORM_INGEST_FSYNC', os.getenv('FORM_INGEST_FSYNC', 'true').lower() == 'true')
+    app.config.setdefault('FORM_INGEST_MAX_BYTES', int(os.getenv('FORM_INGEST_MAX_BYTES', 65536)))
+    if app.config['FORM_INGEST'] not in ('batched', 'direct'):
+        raise ValueError(f"Unknown FORM_INGEST '{app.config['FORM_INGEST']}', expected batched or direct")
+
+_ingestor = None
+_ingestor_lock = threading.Lock()
+
+def get_ingestor():
+    """This process's FormIngestor, started on first use so that each gunicorn worker gets its own"""
+    global _ingestor
+    if _ingestor is None:
+        with _ingestor_lock:
+            if _ingestor is None:
+                _ingestor = FormIngestor(current_app._get_current_object())
+    return _ingestor
+
+def _reset_after_fork():
+    # The flusher thread does not survive a fork, and its segment belongs to the parent
+    global _ingestor, _ingestor_lock
+    _ingestor = None
+    _ingestor_lock = threading.Lock()
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+def ingest_status():
+    """Log and flusher counters for this worker process"""
+    if current_app.config['FORM_INGEST'] == 'direct':
+        return {'mode': 'direct'}
+    ingestor = _ingestor
+    return dict(ingestor.status() if ingestor is not None else {}, mode='batched')
@@ -0,0 +1,118 @@
+"""
+Conditional GET support for the public content endpoints.
+
+@conditional(namespace, *tables) sets validators and Cache-Control on a JSON
+view and answers If-None-Match / If-Modified-Since with 304:
+
+- ETag is a hash of the response body. Stacked on @cached the body comes
+  straight from the response cache, so a revalidation does not serialize
+- Last-Modified is derived from MAX(updated_at) and COUNT(*) of tables,
+  memoized in the cache namespace so it is recomputed only after an admin
+  write. A request whose If-Modified-Since is still current gets its 304
+  before the view runs
+
+A hard delete lowers COUNT(*) without moving MAX(updated_at), so the newest
+updated_at alone is not a safe Last-Modified. The last seen (MAX, COUNT) pair
+is kept under an unversioned key, and whenever a recompute finds a different
+pair (or none was seen before, e.g. after a restart) Last-Modified becomes
+the current time, so clients holding an older date revalidate against the
+view and a deleted detail resource answers 404 instead of 304.
+
+Tables without an updated_at column (sermon, event) are left out; an edit
+there changes neither aggregate, so their endpoints get an ETag only.
+"""
+import json
+import hashlib
+import logging
+from datetime import datetime, timedelta, timezone
+from functools import wraps
+from flask import current_app, request, make_response
+from sqlalchemy import select, func
+from extensions import db
+from utils.cache import cached_value, get_cache
+
+logger = logging.getLogger(__name__)
+
+def _table_signature(tables):
+    """[newest updated_at (isoformat) or None, row count] across tables"""
+    columns = []
+    for name in tables:
+        table = db.metadata.tables[name]
+        columns.append(select(func.max(table.c.updated_at)).scalar_subquery())
+        columns.append(select(func.count()).select_from(table).scalar_subquery())
+    row = db.session.execute(select(*columns)).one()
+    values = [value for value in row[0::2] if value]
+    return [max(values).isoformat() if values else None, sum(row[1::2])]
+
+def _state_key(namespace, tables):
+    return f"{current_app.config['CACHE_KEY_PREFIX']}:last-modified:{namespace}:{','.join(tables)}"
+
+def _changed_at(namespace, tables, signature):
+    """When signature was first seen for tables (isoformat), recording it if it is new"""
+    cache = get_cache()
+    key = _state_key(namespace, tables)
+    try:
+        state = cache.get(key) if cache is not None else None
+        state = json.loads(state) if state is not None else None
+    except Exception as e:
+        logger.warning(f"Cache read failed for {namespace}: {e}")
+        state = None
+    if state and state['signature'] == signature:
+        return state['changed_at']
+
+    # Rounded up, and always past the previous state, so a client that revalidated
+    # earlier in the same second is not answered with 304
+    changed_at = datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0) + timedelta(seconds=1)
+    if state:
+        changed_at = max(changed_at, datetime.fromisoformat(state['changed_at']) + timedelta(seconds=1))
+    changed_at = changed_at.isoformat()
+    if cache is not None:
+        try:
+            # No expiry: losing this key only costs one round of full responses
+            cache.set(key, json.dumps({'signature': signature, 'changed_at': changed_at}).encode())
+        except Exception as e:
+            logger.warning(f"Cache write failed for {namespace}: {e}")
+    return changed_at
+
+def _table_last_modified(namespace, tables):
+    """Last-Modified for tables as an aware datetime (second precision), or None"""
+    if not tables:
+        return None
+
+    def compute():
+        signature = _table_signature(tables)
+        changed_at = _changed_at(namespace, tables, signature)
+        return max(value for value in (signature[0], changed_at) if value)
+
+    value = cached_value(namespace, f"last-modified:{','.join(tables)}", compute)
+    if not value:
+        return None
+    return datetime.fromisoformat(value).replace(microsecond=0, tzinfo=timezone.utc)
+
+def _set_cache_headers(response, last_modified):
+    if last_modified:
+        response.last_modified = last_modified
+    response.cache_control.public = True
+    response.cache_control.max_age = current_app.config.get('CACHE_HTTP_MAX_AGE', 60)
+    return response
+
+def conditional(namespace, *tables):
+    """Add ETag / Last-Modified / Cache-Control to a JSON GET view and answer conditional requests"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            last_modified = _table_last_modified(namespace, tables)
+
+            # If-None-Match takes precedence, so only short-circuit on the date when there is none
+            if (last_modified and not request.if_none_match and request.if_modified_since
+                    and request.if_modified_since >= last_modified):
+                return _set_cache_headers(current_app.response_class(status=304), last_modified)
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+            response.set_etag(hashlib.sha1(response.get_data()).hexdigest())
+            _set_cache_headers(response, last_modified)
+            return response.make_conditional(request)
+        return wrapper
+    return decorator
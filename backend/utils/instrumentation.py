@@ -0,0 +1,196 @@
+"""
+Request timing, SQL accounting and Prometheus metrics.
+
+init_instrumentation(app) times every request and, through SQLAlchemy's
+before/after_cursor_execute events on all engines (primary and replicas),
+counts its SQL statements and the time spent in them. Statements that raise
+never reach after_cursor_execute, so handle_error closes their timing. Each
+response gets a Server-Timing header:
+
+    Server-Timing: db;dur=4.2;desc="3 queries", app;dur=11.8
+
+Queries slower than PERF_SLOW_QUERY_MS and requests slower than
+PERF_SLOW_REQUEST_MS are logged with their statements. Latency, query count
+and DB time histograms per endpoint, together with the connection pool
+metrics, are rendered in the Prometheus text format by render_metrics().
+
+Like the pool metrics, the numbers are per process.
+"""
+import os
+import time
+import logging
+import threading
+from flask import current_app, g, has_app_context, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from utils.pool_metrics import CHECKOUT_WAIT_BUCKETS_MS, pool_metrics
+from utils.form_ingest import ingest_status
+
+logger = logging.getLogger(__name__)
+
+REQUEST_SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+# Statements kept per request for the slow request log
+MAX_LOGGED_STATEMENTS = 20
+
+class Histogram:
+    """Prometheus-style histogram keyed by a tuple of label values"""
+
+    def __init__(self, name, help_text, label_names, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['buckets'][i] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for labels, series in sorted(self._series.items()):
+                label_text = ','.join(f'{name}="{value}"' for name, value in zip(self.label_names, labels))
+                for bound, count in zip(self.buckets, series['buckets']):
+                    lines.append(f'{self.name}_bucket{{{label_text},le="{bound}"}} {count}')
+                lines.append(f'{self.name}_bucket{{{label_text},le="+Inf"}} {series["count"]}')
+                lines.append(f'{self.name}_sum{{{label_text}}} {series["sum"]:.6f}')
+                lines.append(f'{self.name}_count{{{label_text}}} {series["count"]}')
+        return lines
+
+REQUEST_LABELS = ('endpoint', 'method', 'status')
+request_seconds = Histogram('http_request_duration_seconds', 'Request latency', REQUEST_LABELS, REQUEST_SECONDS_BUCKETS)
+request_queries = Histogram('http_request_db_queries', 'SQL statements per request', REQUEST_LABELS, QUERY_COUNT_BUCKETS)
+request_db_seconds = Histogram('http_request_db_duration_seconds', 'Time spent in SQL per request', REQUEST_LABELS, REQUEST_SECONDS_BUCKETS)
+
+def init_instrumentation(app):
+    """Time requests and SQL statements for app"""
+    app.config.setdefault('PERF_SLOW_REQUEST_MS', int(os.getenv('PERF_SLOW_REQUEST_MS', 500)))
+    app.config.setdefault('PERF_SLOW_QUERY_MS', int(os.getenv('PERF_SLOW_QUERY_MS', 100)))
+    app.config.setdefault('PERF_SERVER_TIMING', os.getenv('PERF_SERVER_TIMING', 'true').lower() == 'true')
+    app.config.setdefault('METRICS_TOKEN', os.getenv('METRICS_TOKEN'))
+
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(Engine, 'handle_error', _handle_error)
+
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _record_query(conn.info['query_started'].pop(), statement)
+
+def _handle_error(context):
+    # A failed statement skips after_cursor_execute; without this pop its start time would stay
+    # on the pooled connection and be taken for a later statement's
+    started = context.connection.info.get('query_started') if context.connection is not None else None
+    if started:
+        _record_query(started.pop(), context.statement or '')
+
+def _record_query(started, statement):
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    if has_request_context() and 'perf_started' in g:
+        g.perf_queries += 1
+        g.perf_db_ms += elapsed_ms
+        if len(g.perf_statements) < MAX_LOGGED_STATEMENTS:
+            g.perf_statements.append((elapsed_ms, statement))
+
+    if has_app_context() and elapsed_ms >= current_app.config.get('PERF_SLOW_QUERY_MS', 100):
+        logger.warning(f"🐢 Slow query ({elapsed_ms:.1f} ms): {' '.join(statement.split())}")
+
+def _start_request():
+    g.perf_started = time.perf_counter()
+    g.perf_queries = 0
+    g.perf_db_ms = 0.0
+    g.perf_statements = []
+
+def _finish_request(response):
+    if 'perf_started' not in g:
+        return response
+    total_ms = (time.perf_counter() - g.perf_started) * 1000
+    endpoint = request.endpoint or 'unmatched'
+    labels = (endpoint, request.method, f'{response.status_code // 100}xx')
+    request_seconds.observe(labels, total_ms / 1000)
+    request_queries.observe(labels, g.perf_queries)
+    request_db_seconds.observe(labels, g.perf_db_ms / 1000)
+
+    if current_app.config['PERF_SERVER_TIMING']:
+        response.headers.add('Server-Timing', f'db;dur={g.perf_db_ms:.1f};desc="{g.perf_queries} queries", '
+                                              f'app;dur={total_ms - g.perf_db_ms:.1f}')
+
+    if total_ms >= current_app.config['PERF_SLOW_REQUEST_MS']:
+        statements = ''.join(f"\n    {ms:7.1f} ms  {' '.join(statement.split())}" for ms, statement in g.perf_statements)
+        logger.warning(f"🐢 Slow request {request.method} {request.path} ({endpoint}) {response.status_code}: "
+                       f"{total_ms:.1f} ms, {g.perf_queries} queries in {g.perf_db_ms:.1f} ms{statements}")
+    return response
+
+def _pool_lines():
+    pools = pool_metrics()
+    gauges = (
+        ('db_pool_size', 'Connections kept open', 'pool_size'),
+        ('db_pool_checked_out', 'Connections in use', 'checked_out'),
+        ('db_pool_saturation', 'Connections in use / pool capacity', 'saturation'),
+        ('db_pool_timeouts_total', 'Checkouts that timed out', 'timeouts'),
+        ('db_pool_connects_total', 'DBAPI connections opened', 'connects'),
+        ('db_pool_closes_total', 'DBAPI connections closed', 'closes'),
+        ('db_pool_invalidations_total', 'DBAPI connections invalidated', 'invalidations')
+    )
+    lines = []
+    for name, help_text, key in gauges:
+        kind = 'counter' if name.endswith('_total') else 'gauge'
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+        lines += [f'{name}{{pool="{pool}"}} {stats[key] or 0}' for pool, stats in sorted(pools.items())]
+
+    name = 'db_pool_checkout_wait_seconds'
+    lines += [f'# HELP {name} Time spent waiting for a connection', f'# TYPE {name} histogram']
+    for pool, stats in sorted(pools.items()):
+        cumulative = 0
+        for bound in CHECKOUT_WAIT_BUCKETS_MS:
+            cumulative += stats['checkout_wait_buckets'][str(bound)]
+            lines.append(f'{name}_bucket{{pool="{pool}",le="{bound / 1000}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{pool="{pool}",le="+Inf"}} {stats["checkouts"]}')
+        lines.append(f'{name}_sum{{pool="{pool}"}} {stats["checkout_wait_ms_total"] / 1000:.6f}')
+        lines.append(f'{name}_count{{pool="{pool}"}} {stats["checkouts"]}')
+    return lines
+
+def _ingest_lines():
+    status = ingest_status()
+    if status['mode'] != 'batched' or 'pending' not in status:
+        return []
+    metrics = (
+        ('form_ingest_pending', 'Submissions accepted but not yet inserted', 'pending'),
+        ('form_ingest_oldest_pending_seconds', 'Age of the oldest pending batch', 'oldest_pending_seconds'),
+        ('form_ingest_accepted_total', 'Submissions appended to the log', 'accepted'),
+        ('form_ingest_inserted_total', 'Submissions inserted into the database', 'inserted'),
+        ('form_ingest_batches_total', 'Batches inserted', 'batches'),
+        ('form_ingest_rejected_total', 'Submissions refused by the database', 'rejected'),
+        ('form_ingest_failures_total', 'Batch inserts that failed and were retried', 'failures')
+    )
+    lines = []
+    for name, help_text, key in metrics:
+        kind = 'counter' if name.endswith('_total') else 'gauge'
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}', f'{name} {status[key]}']
+    return lines
+
+def render_metrics():
+    """All request, pool and form ingestion metrics in the Prometheus text exposition format"""
+    lines = []
+    for histogram in (request_seconds, request_queries, request_db_seconds):
+        lines += histogram.render()
+    lines += _pool_lines()
+    lines += _ingest_lines()
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,352 @@
+"""
+Background jobs for slow admin work such as member exports.
+
+Handlers are registered with @register_job and write a single artifact file
+under uploads/exports. Two backends are available, selected by JOB_BACKEND:
+
+- 'database' (default): jobs stored in the background_job table and picked
+  up by a polling worker thread, so every worker process can report on any
+  job and queued jobs survive a restart. The process
+  running a job refreshes its heartbeat every JOB_HEARTBEAT_INTERVAL
+  seconds; any process requeues running jobs whose heartbeat is older than
+  JOB_STALE_AFTER, so a crashed worker's jobs are picked up again
+- 'thread': in-process thread pool, job state kept in memory. Only for a
+  single process (the dev server, or one gunicorn worker), since a status
+  poll served by another process would not find the job
+
+Finished jobs are forgotten together with their artifact after JOB_ARTIFACT_TTL.
+"""
+import os
+import time
+import uuid
+import socket
+import logging
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+_handlers = {}
+
+def register_job(kind, extension, mimetype):
+    """Register handler(params, output_path) as the job for kind"""
+    def decorator(func):
+        _handlers[kind] = {'func': func, 'extension': extension, 'mimetype': mimetype}
+        return func
+    return decorator
+
+def get_job_mimetype(kind):
+    handler = _handlers.get(kind)
+    return handler['mimetype'] if handler else 'application/octet-stream'
+
+def get_exports_folder(app=None):
+    app = app or current_app
+    folder = os.path.join(app.root_path, '..', 'uploads', 'exports')
+    os.makedirs(folder, exist_ok=True)
+    return folder
+
+def get_artifact_path(artifact, app=None):
+    """Absolute path of an artifact, or None if it has been evicted"""
+    if not artifact:
+        return None
+    path = os.path.join(get_exports_folder(app), os.path.basename(artifact))
+    return path if os.path.exists(path) else None
+
+def evict_expired_artifacts(app=None):
+    """Delete export artifacts, and the records of jobs finished, more than JOB_ARTIFACT_TTL seconds ago"""
+    app = app or current_app
+    app.extensions['jobs'].forget_finished(datetime.utcnow() - timedelta(seconds=app.config['JOB_ARTIFACT_TTL']))
+    folder = get_exports_folder(app)
+    cutoff = time.time() - app.config['JOB_ARTIFACT_TTL']
+    removed = 0
+    for name in os.listdir(folder):
+        path = os.path.join(folder, name)
+        try:
+            if os.path.isfile(path) and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            pass
+    return removed
+
+def _run_handler(app, job_id, kind, params):
+    """Run a registered handler inside an app context and return the artifact name"""
+    handler = _handlers[kind]
+    artifact = f"{job_id}.{handler['extension']}"
+    output_path = os.path.join(get_exports_folder(app), artifact)
+    with app.app_context():
+        try:
+            handler['func'](params, output_path)
+        except Exception:
+            if os.path.exists(output_path):
+                os.remove(output_path)
+            raise
+    return artifact
+
+class ThreadJobBackend:
+    """Runs jobs on an in-process thread pool; state is lost on restart"""
+
+    def __init__(self, app):
+        self.app = app
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.executor = None
+
+    def _get_executor(self):
+        # Created lazily so forked workers each get their own threads
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(
+                    max_workers=self.app.config['JOB_WORKERS'],
+                    thread_name_prefix='job'
+                )
+            return self.executor
+
+    def submit(self, kind, params, created_by=None):
+        job_id = uuid.uuid4().hex
+        with self.lock:
+            self.jobs[job_id] = {
+                'id': job_id,
+                'kind': kind,
+                'status': 'queued',
+                'artifact': None,
+                'error': None,
+                'created_by': created_by,
+                'created_at': datetime.utcnow(),
+                'started_at': None,
+                'finished_at': None
+            }
+        self._get_executor().submit(self._run, job_id, kind, params)
+        return job_id
+
+    def _run(self, job_id, kind, params):
+        self._update(job_id, status='running', started_at=datetime.utcnow())
+        try:
+            artifact = _run_handler(self.app, job_id, kind, params)
+            self._update(job_id, status='done', artifact=artifact, finished_at=datetime.utcnow())
+        except Exception as e:
+            logger.exception(f"Job {job_id} ({kind}) failed")
+            self._update(job_id, status='failed', error=str(e), finished_at=datetime.utcnow())
+
+    def _update(self, job_id, **values):
+        with self.lock:
+            self.jobs[job_id].update(values)
+
+    def start(self):
+        pass
+
+    def get(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def forget_finished(self, cutoff):
+        """Drop jobs that finished before cutoff"""
+        with self.lock:
+            for job_id in [job_id for job_id, job in self.jobs.items()
+                           if job['finished_at'] is not None and job['finished_at'] < cutoff]:
+                del self.jobs[job_id]
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+
+class DatabaseJobBackend:
+    """Stores jobs in the background_job table and runs them from a polling worker thread"""
+
+    def __init__(self, app):
+        self.app = app
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.stopping = threading.Event()
+        self.workers = []
+        self.owner = None
+        self.running = set()
+
+    def start(self):
+        """Start the worker threads; called lazily so forked workers each get their own"""
+        if self.workers:
+            return
+        with self.lock:
+            if self.workers:
+                return
+            self.owner = f'{socket.gethostname()}:{os.getpid()}'
+            with self.app.app_context():
+                self._requeue_stale_jobs()
+            for i in range(self.app.config['JOB_WORKERS']):
+                worker = threading.Thread(target=self._work, name=f'job-worker-{i}', daemon=True)
+                worker.start()
+                self.workers.append(worker)
+            heartbeat = threading.Thread(target=self._heartbeat, name='job-heartbeat', daemon=True)
+            heartbeat.start()
+            self.workers.append(heartbeat)
+
+    def _requeue_stale_jobs(self):
+        """Put jobs whose owner stopped sending heartbeats (crashed or restarted) back in the queue"""
+        from models.background_job import BackgroundJob
+        from extensions import db
+        cutoff = datetime.utcnow() - timedelta(seconds=self.app.config['JOB_STALE_AFTER'])
+        requeued = BackgroundJob.query.filter(
+            BackgroundJob.status == 'running',
+            BackgroundJob.heartbeat_at < cutoff
+        ).update({'status': 'queued', 'started_at': None, 'owner': None, 'heartbeat_at': None},
+                 synchronize_session=False)
+        db.session.commit()
+        if requeued:
+            logger.warning(f"Requeued {requeued} background jobs without a heartbeat since {cutoff}")
+            self.wakeup.set()
+
+    def _heartbeat(self):
+        """Mark this process's running jobs as alive, then requeue other processes' dead ones"""
+        from models.background_job import BackgroundJob
+        from extensions import db
+        while not self.stopping.wait(self.app.config['JOB_HEARTBEAT_INTERVAL']):
+            with self.app.app_context():
+                try:
+                    with self.lock:
+                        running = list(self.running)
+                    if running:
+                        BackgroundJob.query.filter(
+                            BackgroundJob.id.in_(running),
+                            BackgroundJob.owner == self.owner
+                        ).update({'heartbeat_at': datetime.utcnow()}, synchronize_session=False)
+                        db.session.commit()
+                    self._requeue_stale_jobs()
+                except Exception:
+                    logger.exception("Failed to refresh background job heartbeats")
+                    db.session.rollback()
+
+    def submit(self, kind, params, created_by=None):
+        from models.background_job import BackgroundJob
+        from extensions import db
+        job = BackgroundJob(id=uuid.uuid4().hex, kind=kind, params=params, status='queued', created_by=created_by)
+        db.session.add(job)
+        db.session.commit()
+        self.start()
+        self.wakeup.set()
+        return job.id
+
+    def _claim_next(self):
+        """Atomically move the oldest queued job to running; returns (id, kind, params) or None"""
+        from models.background_job import BackgroundJob
+        from extensions import db
+        candidates = BackgroundJob.query.filter_by(status='queued') \
+            .order_by(BackgroundJob.created_at).limit(5).all()
+        for job in candidates:
+            job_id, kind, params = job.id, job.kind, job.params or {}
+            # The status check in the UPDATE makes the claim safe across processes
+            now = datetime.utcnow()
+            claimed = BackgroundJob.query.filter_by(id=job_id, status='queued').update(
+                {'status': 'running', 'started_at': now, 'owner': self.owner, 'heartbeat_at': now},
+                synchronize_session=False
+            )
+            db.session.commit()
+            if claimed:
+                with self.lock:
+                    self.running.add(job_id)
+                return job_id, kind, params
+        return None
+
+    def _work(self):
+        from models.background_job import BackgroundJob
+        from extensions import db
+        while not self.stopping.is_set():
+            with self.app.app_context():
+                try:
+                    claimed = self._claim_next()
+                except Exception:
+                    logger.exception("Failed to poll background jobs")
+                    db.session.rollback()
+                    claimed = None
+                if claimed:
+                    job_id, kind, params = claimed
+                    values = {}
+                    try:
+                        values['artifact'] = _run_handler(self.app, job_id, kind, params)
+                        values['status'] = 'done'
+                    except Exception as e:
+                        logger.exception(f"Job {job_id} ({kind}) failed")
+                        values['status'] = 'failed'
+                        values['error'] = str(e)
+                    values['finished_at'] = datetime.utcnow()
+                    # Only while still the owner; a job requeued after a missed heartbeat belongs to its new runner
+                    BackgroundJob.query.filter_by(id=job_id, owner=self.owner, status='running') \
+                        .update(values, synchronize_session=False)
+                    db.session.commit()
+                    with self.lock:
+                        self.running.discard(job_id)
+                    continue
+            self.wakeup.wait(self.app.config['JOB_POLL_INTERVAL'])
+            self.wakeup.clear()
+
+    def get(self, job_id):
+        from models.background_job import BackgroundJob
+        from extensions import db
+        self.start()
+        job = db.session.get(BackgroundJob, job_id)
+        if not job:
+            return None
+        return {
+            'id': job.id,
+            'kind': job.kind,
+            'status': job.status,
+            'artifact': job.artifact,
+            'error': job.error,
+            'created_by': job.created_by,
+            'created_at': job.created_at,
+            'started_at': job.started_at,
+            'finished_at': job.finished_at
+        }
+
+    def forget_finished(self, cutoff):
+        """Delete the rows of jobs that finished before cutoff"""
+        from models.background_job import BackgroundJob
+        from extensions import db
+        BackgroundJob.query.filter(
+            BackgroundJob.status.in_(('done', 'failed')),
+            BackgroundJob.finished_at < cutoff
+        ).delete(synchronize_session=False)
+        db.session.commit()
+
+    def shutdown(self):
+        self.stopping.set()
+        self.wakeup.set()
+        for worker in self.workers:
+            worker.join()
+
+JOB_BACKENDS = {
+    'thread': ThreadJobBackend,
+    'database': DatabaseJobBackend
+}
+
+def init_jobs(app):
+    """Configure the job backend for app"""
+    app.config.setdefault('JOB_BACKEND', os.getenv('JOB_BACKEND', 'database'))
+    app.config.setdefault('JOB_WORKERS', int(os.getenv('JOB_WORKERS', 2)))
+    app.config.setdefault('JOB_ARTIFACT_TTL', int(os.getenv('JOB_ARTIFACT_TTL', 24 * 3600)))
+    app.config.setdefault('JOB_POLL_INTERVAL', float(os.getenv('JOB_POLL_INTERVAL', 2)))
+    app.config.setdefault('JOB_HEARTBEAT_INTERVAL', float(os.getenv('JOB_HEARTBEAT_INTERVAL', 15)))
+    # A running job whose heartbeat is older than this is assumed to have lost its process
+    app.config.setdefault('JOB_STALE_AFTER', float(os.getenv('JOB_STALE_AFTER', 60)))
+    if app.config['JOB_STALE_AFTER'] <= 2 * app.config['JOB_HEARTBEAT_INTERVAL']:
+        raise ValueError("JOB_STALE_AFTER must be more than twice JOB_HEARTBEAT_INTERVAL")
+
+    backend = app.config['JOB_BACKEND']
+    if backend not in JOB_BACKENDS:
+        raise ValueError(f"Unknown JOB_BACKEND '{backend}', expected one of {', '.join(JOB_BACKENDS)}")
+    app.extensions['jobs'] = JOB_BACKENDS[backend](app)
+
+    # Pick up jobs queued before a restart as soon as this process serves traffic
+    app.before_request(app.extensions['jobs'].start)
+
+def get_job_queue():
+    return current_app.extensions['jobs']
+
+def enqueue_job(kind, params, created_by=None):
+    """Queue a registered job and return its id; also evicts expired artifacts"""
+    if kind not in _handlers:
+        raise ValueError(f"Unknown job kind '{kind}'")
+    evict_expired_artifacts()
+    return get_job_queue().submit(kind, params, created_by=created_by)
@@ -0,0 +1,117 @@
+"""
+Process-wide logging.
+
+configure_logging() routes every logger through a QueueHandler: the request
+thread only puts the record on a queue, and a QueueListener thread formats it
+and writes it to stderr. Settings come from the environment, because logging
+is set up once per process, before any app exists:
+
+- LOG_FORMAT: 'json' (default), one object per line, or 'text'
+- LOG_LEVEL: root level (default INFO)
+- LOG_LEVELS: per-module levels, e.g. 'utils.utils=DEBUG,sqlalchemy.engine=INFO'
+
+Call sites log with %-style arguments (logger.debug('x %s', value)), so a
+disabled level costs a single level check and nothing is formatted.
+"""
+import os
+import sys
+import copy
+import json
+import queue
+import atexit
+import logging
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from flask import has_request_context, request
+
+# Attributes every LogRecord has; anything else was passed through extra=
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'taskName'}
+
+_queue_handler = None
+_listener = None
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, including extra= fields and the request it belongs to"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+class TextFormatter(logging.Formatter):
+    """The classic one-line format, followed by the traceback if there is one"""
+
+    def __init__(self):
+        super().__init__('%(asctime)s - %(levelname)s - %(name)s - %(message)s')
+
+    def format(self, record):
+        text = super().format(record)
+        exc = getattr(record, 'exc', None)
+        return f'{text}\n{exc}' if exc else text
+
+class StructuredQueueHandler(QueueHandler):
+    """QueueHandler that keeps extra= fields and the traceback as separate attributes"""
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+            record.exc_text = None
+        return record
+
+class RequestContextFilter(logging.Filter):
+    """Tag records with the current request; runs in the calling thread, before the record is queued"""
+
+    def filter(self, record):
+        if has_request_context():
+            record.method = request.method
+            record.path = request.path
+        return True
+
+def _formatter(log_format):
+    return JsonFormatter() if log_format == 'json' else TextFormatter()
+
+def _start_listener():
+    global _listener
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(_formatter(os.getenv('LOG_FORMAT', 'json').lower()))
+    _queue_handler.queue = queue.SimpleQueue()
+    _listener = QueueListener(_queue_handler.queue, stream_handler, respect_handler_level=False)
+    _listener.start()
+
+def _stop_listener():
+    if _listener is not None:
+        _listener.stop()
+
+def configure_logging():
+    """Install the queue-based handler on the root logger; safe to call more than once"""
+    global _queue_handler
+    if _queue_handler is not None:
+        return
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.setLevel(os.getenv('LOG_LEVEL', 'INFO').upper())
+    for item in os.getenv('LOG_LEVELS', '').split(','):
+        if '=' in item:
+            name, level = item.split('=', 1)
+            logging.getLogger(name.strip()).setLevel(level.strip().upper())
+
+    _queue_handler = StructuredQueueHandler(queue.SimpleQueue())
+    _queue_handler.addFilter(RequestContextFilter())
+    root.addHandler(_queue_handler)
+    _start_listener()
+    atexit.register(_stop_listener)
+    # The listener thread does not survive a fork (gunicorn preload), so each child starts its own
+    os.register_at_fork(after_in_child=_start_listener)
@@ -0,0 +1,73 @@
+"""
+Query builder for church member listings and exports.
+
+All member endpoints read the same filters (ministry_id, gender,
+marital_status, is_active, search) and build the query through
+build_member_query so the filters stay consistent and index friendly:
+
+- ministry_id is a semi-join (IN over member_ministry) that is answered from
+  the ix_member_ministry_ministry_active_member covering index
+- gender / marital_status / is_active are served by the composite
+  ix_church_member_active_* indexes
+- search goes through the indexed member_search_term table
+"""
+from flask import request
+from sqlalchemy import select, false
+from utils.member_search import member_search_subquery
+
+MEMBER_FILTER_KEYS = ('ministry_id', 'gender', 'marital_status', 'is_active', 'search')
+
+def _parse_bool(value):
+    return value.lower() == 'true' if value else None
+
+def member_filters_from_args(args=None):
+    """Read member filters from request args (or any mapping with a werkzeug-style get)"""
+    args = request.args if args is None else args
+    return {
+        'ministry_id': args.get('ministry_id', type=int),
+        'gender': args.get('gender'),
+        'marital_status': args.get('marital_status'),
+        'is_active': args.get('is_active', type=_parse_bool),
+        'search': args.get('search')
+    }
+
+def ministry_member_ids(ministry_id):
+    """SELECT of the members actively assigned to a ministry, for use in IN (...)"""
+    from models.church_member import MemberMinistry
+    return select(MemberMinistry.member_id).where(
+        MemberMinistry.ministry_id == ministry_id,
+        MemberMinistry.is_active == True
+    )
+
+def apply_member_filters(query, filters):
+    """Apply member filters to a ChurchMember query"""
+    from models.church_member import ChurchMember
+
+    if filters.get('ministry_id'):
+        query = query.filter(ChurchMember.id.in_(ministry_member_ids(filters['ministry_id'])))
+
+    # is_active first to match the leading column of the composite indexes
+    if filters.get('is_active') is not None:
+        query = query.filter(ChurchMember.is_active == filters['is_active'])
+
+    if filters.get('gender'):
+        query = query.filter(ChurchMember.gender == filters['gender'])
+
+    if filters.get('marital_status'):
+        query = query.filter(ChurchMember.marital_status == filters['marital_status'])
+
+    if filters.get('search'):
+        # Prefix match against the indexed search terms (see utils.member_search)
+        matches = member_search_subquery(filters['search'])
+        if matches is None:
+            # Nothing searchable (e.g. only punctuation) matches no member, like the old ILIKE did
+            query = query.filter(false())
+        else:
+            query = query.join(matches, ChurchMember.id == matches.c.member_id)
+
+    return query
+
+def build_member_query(filters):
+    """Return a ChurchMember query with filters applied"""
+    from models.church_member import ChurchMember
+    return apply_member_filters(ChurchMember.query, filters)
@@ -0,0 +1,136 @@
+"""
+Indexed member search.
+
+Searchable member fields are broken into normalized terms stored in the
+member_search_term side table (one row per term, indexed on term). A search
+matches members that have, for every word of the query, a term starting with
+that word, so each lookup is an index range scan instead of a full table scan
+with ILIKE '%word%'.
+
+Phone numbers are reduced to digits and stored in international (254...),
+national (07...) and subscriber (7...) forms so any of them can be typed as
+a prefix.
+"""
+import re
+from extensions import db
+from sqlalchemy import func, case, and_, or_
+
+DEFAULT_COUNTRY_CODE = '254'
+MAX_TERM_LENGTH = 120
+
+_word_split = re.compile(r'[^0-9a-z]+')
+_phone_like = re.compile(r'^\+?[0-9][0-9 ()\-]{2,}$')
+
+def normalize_phone(phone):
+    """Return the digit-only forms of a phone number that can be prefix matched"""
+    digits = re.sub(r'\D', '', phone or '')
+    if not digits:
+        return set()
+
+    forms = {digits}
+    if digits.startswith(DEFAULT_COUNTRY_CODE):
+        subscriber = digits[len(DEFAULT_COUNTRY_CODE):]
+    elif digits.startswith('0'):
+        subscriber = digits[1:]
+    else:
+        subscriber = digits
+    if subscriber:
+        forms.update({subscriber, '0' + subscriber, DEFAULT_COUNTRY_CODE + subscriber})
+    return forms
+
+def _words(text):
+    return {word for word in _word_split.split((text or '').lower()) if word}
+
+def member_search_terms(first_name=None, last_name=None, email=None, phone=None):
+    """Build the set of index terms for a member's searchable fields"""
+    terms = _words(first_name) | _words(last_name)
+    if email:
+        email = email.strip().lower()
+        terms.add(email)
+        terms |= _words(email.split('@')[0])
+    terms |= normalize_phone(phone)
+    return {term[:MAX_TERM_LENGTH] for term in terms}
+
+def tokenize_search(search):
+    """Split a search string into normalized tokens, using the same rules as the index"""
+    search = (search or '').strip().lower()
+    if _phone_like.match(search):
+        # A phone number typed with spaces or dashes is a single token
+        return [re.sub(r'\D', '', search)[:MAX_TERM_LENGTH]]
+
+    tokens = []
+    for part in search.split():
+        if _phone_like.match(part):
+            digits = re.sub(r'\D', '', part)
+            tokens.append(digits)
+        elif '@' in part:
+            tokens.append(part)
+        else:
+            tokens.extend(word for word in _word_split.split(part) if word)
+    # Preserve order but drop duplicates
+    return list(dict.fromkeys(token[:MAX_TERM_LENGTH] for token in tokens))
+
+def _like_prefix(token):
+    return token.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+def member_search_subquery(search):
+    """Subquery of (member_id, score) for members matching every token of search
+
+    Returns None when search contains no usable tokens. Score counts matched
+    terms, with exact term matches counting double.
+    """
+    from models.church_member import MemberSearchTerm
+
+    tokens = tokenize_search(search)
+    if not tokens:
+        return None
+
+    term = MemberSearchTerm.term
+    matches = [term.like(_like_prefix(token), escape='\\') for token in tokens]
+    score = func.count() + func.sum(case((term.in_(tokens), 1), else_=0))
+
+    query = db.session.query(
+        MemberSearchTerm.member_id.label('member_id'),
+        score.label('score')
+    ).filter(or_(*matches)).group_by(MemberSearchTerm.member_id)
+
+    if len(tokens) > 1:
+        # Every token has to match at least one of the member's terms
+        query = query.having(and_(*[func.max(case((match, 1), else_=0)) == 1 for match in matches]))
+
+    return query.subquery()
+
+def sync_member_search_terms(connection, member_id, terms):
+    """Replace the stored terms of a member using the flush connection"""
+    from models.church_member import MemberSearchTerm
+
+    table = MemberSearchTerm.__table__
+    connection.execute(table.delete().where(table.c.member_id == member_id))
+    if terms:
+        connection.execute(table.insert(), [{'member_id': member_id, 'term': term} for term in terms])
+
+def rebuild_member_search_terms(batch_size=1000):
+    """Rebuild the whole search index from church_member; returns the number of members indexed"""
+    from models.church_member import ChurchMember, MemberSearchTerm
+
+    MemberSearchTerm.query.delete()
+    indexed = 0
+    last_id = 0
+    while True:
+        rows = db.session.query(
+            ChurchMember.id, ChurchMember.first_name, ChurchMember.last_name,
+            ChurchMember.email, ChurchMember.phone
+        ).filter(ChurchMember.id > last_id).order_by(ChurchMember.id).limit(batch_size).all()
+        if not rows:
+            break
+        values = [
+            {'member_id': row.id, 'term': term}
+            for row in rows
+            for term in member_search_terms(row.first_name, row.last_name, row.email, row.phone)
+        ]
+        if values:
+            db.session.execute(MemberSearchTerm.__table__.insert(), values)
+        indexed += len(rows)
+        last_id = rows[-1].id
+    db.session.commit()
+    return indexed
@@ -0,0 +1,211 @@
+"""
+Password hashing.
+
+PASSWORD_HASHER selects the scheme new hashes use: 'scrypt' (default),
+'argon2' (argon2-cffi), 'bcrypt' or 'pbkdf2'. Hashes of every scheme keep
+verifying, and a hash made with another scheme or with other cost parameters
+is replaced on the next successful login (User.check_password), so changing
+PASSWORD_HASHER or the cost settings migrates users as they sign in.
+
+The key derivation runs in a small per-process thread pool
+(PASSWORD_HASH_WORKERS threads). scrypt, bcrypt and argon2 release the GIL,
+so request threads keep being served while logins hash. When more than
+PASSWORD_HASH_MAX_PENDING hashes are already queued, hash_password and
+verify_password raise PasswordHasherBusy at once instead of queueing, so a
+login burst cannot tie up every worker thread.
+
+A request thread waits for its hash, so the limit only helps if it is below
+the threads a worker serves requests with. By default it is sized from the
+gunicorn settings (GUNICORN_THREADS for gthread) to leave one request thread
+free for everything else.
+"""
+import os
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app, jsonify
+from werkzeug.security import check_password_hash, generate_password_hash
+
+logger = logging.getLogger(__name__)
+
+class PasswordHasherBusy(Exception):
+    """Too many password hashes are already waiting in this process"""
+
+def hasher_busy_response(error=None):
+    """503 asking the client to retry, for requests that hit PasswordHasherBusy"""
+    return jsonify({'msg': 'Too many password checks in progress, please retry'}), 503, {'Retry-After': '1'}
+
+class WerkzeugHasher:
+    """scrypt or pbkdf2 through werkzeug; hashes look like 'scrypt:32768:8:1$salt$hash'"""
+
+    def __init__(self, method):
+        self.method = method
+        self.scheme = method.split(':')[0]
+
+    def hash(self, password):
+        return generate_password_hash(password, method=self.method)
+
+    def verify(self, password, password_hash):
+        return check_password_hash(password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        return password_hash.split('$', 1)[0] != self.method
+
+class BcryptHasher:
+    scheme = 'bcrypt'
+
+    def __init__(self, rounds):
+        try:
+            import bcrypt
+        except ImportError:
+            raise RuntimeError("PASSWORD_HASHER 'bcrypt' requires the bcrypt package (pip install bcrypt)")
+        self.bcrypt = bcrypt
+        self.rounds = rounds
+
+    def hash(self, password):
+        return self.bcrypt.hashpw(password.encode(), self.bcrypt.gensalt(self.rounds)).decode()
+
+    def verify(self, password, password_hash):
+        try:
+            return self.bcrypt.checkpw(password.encode(), password_hash.encode())
+        except ValueError:
+            return False
+
+    def needs_rehash(self, password_hash):
+        # $2b$<rounds>$<salt and hash>
+        return int(password_hash.split('$')[2]) != self.rounds
+
+class Argon2Hasher:
+    scheme = 'argon2'
+
+    def __init__(self, time_cost, memory_cost, parallelism):
+        try:
+            from argon2 import PasswordHasher, exceptions
+        except ImportError:
+            raise RuntimeError("PASSWORD_HASHER 'argon2' requires the argon2-cffi package (pip install argon2-cffi)")
+        self.hasher = PasswordHasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+        self.errors = (exceptions.VerificationError, exceptions.InvalidHashError)
+
+    def hash(self, password):
+        return self.hasher.hash(password)
+
+    def verify(self, password, password_hash):
+        try:
+            return self.hasher.verify(password_hash, password)
+        except self.errors:
+            return False
+
+    def needs_rehash(self, password_hash):
+        return self.hasher.check_needs_rehash(password_hash)
+
+PASSWORD_HASHERS = {
+    'scrypt': lambda config: WerkzeugHasher(
+        f"scrypt:{config['PASSWORD_SCRYPT_N']}:{config['PASSWORD_SCRYPT_R']}:{config['PASSWORD_SCRYPT_P']}"),
+    'pbkdf2': lambda config: WerkzeugHasher(f"pbkdf2:sha256:{config['PASSWORD_PBKDF2_ITERATIONS']}"),
+    'bcrypt': lambda config: BcryptHasher(config['PASSWORD_BCRYPT_ROUNDS']),
+    'argon2': lambda config: Argon2Hasher(config['PASSWORD_ARGON2_TIME_COST'], config['PASSWORD_ARGON2_MEMORY_COST'],
+                                          config['PASSWORD_ARGON2_PARALLELISM'])
+}
+
+def _request_threads():
+    """Requests one gunicorn worker serves at once, read from the same settings as gunicorn.conf.py"""
+    mode = os.getenv('WORKER_MODE', 'gthread')
+    if mode == 'sync':
+        return 1
+    if mode == 'gevent':
+        return int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 200))
+    return int(os.getenv('GUNICORN_THREADS', 4))
+
+def init_passwords(app):
+    """Configure password hashing for app"""
+    defaults = {
+        'PASSWORD_HASHER': 'scrypt',
+        'PASSWORD_SCRYPT_N': 32768,
+        'PASSWORD_SCRYPT_R': 8,
+        'PASSWORD_SCRYPT_P': 1,
+        'PASSWORD_PBKDF2_ITERATIONS': 600000,
+        'PASSWORD_BCRYPT_ROUNDS': 12,
+        'PASSWORD_ARGON2_TIME_COST': 3,
+        'PASSWORD_ARGON2_MEMORY_COST': 65536,
+        'PASSWORD_ARGON2_PARALLELISM': 4,
+        'PASSWORD_HASH_WORKERS': 1
+    }
+    for key, default in defaults.items():
+        value = os.getenv(key, default)
+        app.config.setdefault(key, value if isinstance(default, str) else int(value))
+    threads = _request_threads()
+    app.config.setdefault('PASSWORD_HASH_MAX_PENDING', int(os.getenv(
+        'PASSWORD_HASH_MAX_PENDING', max(threads - app.config['PASSWORD_HASH_WORKERS'] - 1, 0))))
+    if app.config['PASSWORD_HASH_WORKERS'] + app.config['PASSWORD_HASH_MAX_PENDING'] >= threads > 1:
+        logger.warning(f"PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_PENDING admit {threads} or more hashes, "
+                       f"so a login burst can occupy all {threads} request threads of a worker")
+
+    name = app.config['PASSWORD_HASHER']
+    if name not in PASSWORD_HASHERS:
+        raise ValueError(f"Unknown PASSWORD_HASHER '{name}', expected one of {', '.join(PASSWORD_HASHERS)}")
+    app.extensions['password_hasher'] = PASSWORD_HASHERS[name](app.config)
+    # Any view that sets or checks a password without catching it answers 503 instead of 500
+    app.register_error_handler(PasswordHasherBusy, hasher_busy_response)
+
+def _configured_hasher():
+    hasher = current_app.extensions.get('password_hasher')
+    if hasher is None:
+        raise RuntimeError('Password hashing is not configured; call init_passwords(app) when creating the app')
+    return hasher
+
+def _hasher_for(password_hash):
+    """The hasher able to verify password_hash, whatever scheme made it"""
+    current = _configured_hasher()
+    if password_hash.startswith('$2'):
+        scheme = 'bcrypt'
+    elif password_hash.startswith('$argon2'):
+        scheme = 'argon2'
+    else:
+        scheme = password_hash.split(':', 1)[0]
+    if scheme == current.scheme:
+        return current
+    if scheme in PASSWORD_HASHERS:
+        return PASSWORD_HASHERS[scheme](current_app.config)
+    return WerkzeugHasher(password_hash.split('$', 1)[0])
+
+_executor = None
+_executor_lock = threading.Lock()
+_pending = None
+
+def _run(func, *args):
+    """Run func in the KDF pool and wait for it, or fail fast when the pool is backed up"""
+    global _executor, _pending
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                workers = current_app.config['PASSWORD_HASH_WORKERS']
+                _pending = threading.BoundedSemaphore(workers + current_app.config['PASSWORD_HASH_MAX_PENDING'])
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+    if not _pending.acquire(blocking=False):
+        raise PasswordHasherBusy()
+    try:
+        return _executor.submit(func, *args).result()
+    finally:
+        _pending.release()
+
+def _reset_after_fork():
+    # Pool threads do not survive a fork; each gunicorn worker starts its own pool
+    global _executor, _pending
+    _executor = None
+    _pending = None
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+def hash_password(password):
+    """Hash password with the configured scheme"""
+    return _run(_configured_hasher().hash, password)
+
+def verify_password(password, password_hash):
+    """Check password against password_hash; returns (ok, new_hash), new_hash set when it should be replaced"""
+    hasher = _hasher_for(password_hash)
+    if not _run(hasher.verify, password, password_hash):
+        return False, None
+    current = _configured_hasher()
+    if hasher is not current or current.needs_rehash(password_hash):
+        return True, _run(current.hash, password)
+    return True, None
@@ -0,0 +1,111 @@
+"""
+Connection pool metrics.
+
+Engines created from config.engine_options() use InstrumentedQueuePool, which
+records per pool (keyed by pool_logging_name, 'primary' by default):
+
+- checkout wait: how long requests waited for a connection, as a count,
+  total, max and a histogram over CHECKOUT_WAIT_BUCKETS_MS
+- timeouts: checkouts that gave up after pool_timeout
+- saturation: connections checked out / (pool_size + max_overflow)
+- churn: DBAPI connections opened, closed and invalidated
+
+Numbers are per process; with several gunicorn workers each reports its own.
+"""
+import time
+import threading
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+CHECKOUT_WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+_lock = threading.Lock()
+_stats = {}
+_live_pools = {}
+
+def _pool_stats(name):
+    stats = _stats.get(name)
+    if stats is None:
+        stats = _stats[name] = {
+            'checkouts': 0,
+            'checkout_wait_ms_total': 0.0,
+            'checkout_wait_ms_max': 0.0,
+            'checkout_wait_buckets': [0] * (len(CHECKOUT_WAIT_BUCKETS_MS) + 1),
+            'timeouts': 0,
+            'connects': 0,
+            'closes': 0,
+            'invalidations': 0
+        }
+    return stats
+
+def _record(name, **increments):
+    with _lock:
+        stats = _pool_stats(name)
+        for key, value in increments.items():
+            stats[key] += value
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times every checkout"""
+
+    def __init__(self, creator, pool_size=5, max_overflow=10, timeout=30.0, **kw):
+        super().__init__(creator, pool_size=pool_size, max_overflow=max_overflow, timeout=timeout, **kw)
+        self.metrics_name = kw.get('logging_name') or 'primary'
+        self.max_overflow_setting = max_overflow
+        _live_pools[self.metrics_name] = self
+        if not kw.get('_dispatch'):
+            # recreate() copies these listeners onto the new pool
+            name = self.metrics_name
+            event.listen(self, 'connect', lambda dbapi_connection, record: _record(name, connects=1))
+            event.listen(self, 'close', lambda dbapi_connection, record: _record(name, closes=1))
+            event.listen(self, 'invalidate', lambda dbapi_connection, record, exception: _record(name, invalidations=1))
+
+    def recreate(self):
+        pool = super().recreate()
+        _live_pools[pool.metrics_name] = pool
+        return pool
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            _record(self.metrics_name, timeouts=1)
+            raise
+        waited = (time.perf_counter() - started) * 1000
+        with _lock:
+            stats = _pool_stats(self.metrics_name)
+            stats['checkouts'] += 1
+            stats['checkout_wait_ms_total'] += waited
+            stats['checkout_wait_ms_max'] = max(stats['checkout_wait_ms_max'], waited)
+            bucket = next((i for i, bound in enumerate(CHECKOUT_WAIT_BUCKETS_MS) if waited <= bound),
+                          len(CHECKOUT_WAIT_BUCKETS_MS))
+            stats['checkout_wait_buckets'][bucket] += 1
+        return connection
+
+def pool_metrics():
+    """Snapshot of the counters and current gauges of every instrumented pool"""
+    result = {}
+    with _lock:
+        for name, pool in _live_pools.items():
+            stats = dict(_pool_stats(name))
+            stats['checkout_wait_buckets'] = dict(zip(
+                [str(bound) for bound in CHECKOUT_WAIT_BUCKETS_MS] + ['+Inf'],
+                stats['checkout_wait_buckets']
+            ))
+            capacity = pool.size() + max(pool.max_overflow_setting, 0)
+            stats.update({
+                'pool_size': pool.size(),
+                'max_overflow': pool.max_overflow_setting,
+                'checked_out': pool.checkedout(),
+                'idle': pool.checkedin(),
+                'overflow': pool.overflow(),
+                'saturation': round(pool.checkedout() / capacity, 3) if capacity else None,
+                'checkout_wait_ms_avg': round(stats['checkout_wait_ms_total'] / stats['checkouts'], 3)
+                                        if stats['checkouts'] else 0.0
+            })
+            result[name] = stats
+    return result
+
+def reset_pool_metrics():
+    with _lock:
+        _stats.clear()
@@ -0,0 +1,105 @@
+"""
+The authenticated user of a request.
+
+init_principal(app) registers a flask_jwt_extended user loader that turns the
+token's "id:username:is_admin" identity into a Principal, once per request,
+when @jwt_required() verifies the token. flask_jwt_extended keeps it on g for
+the rest of the request; current_principal() returns it.
+
+Principals are built from the User row and kept in a small in-process LRU
+for PRINCIPAL_CACHE_TTL seconds, so most authenticated requests do not query
+the user table. Admin rights and the active flag come from the row, not the
+token: a user that is demoted, disabled or deleted loses access as soon as
+the cached principal is dropped. That happens immediately in the worker that
+made the change (ORM update/delete events) and within the TTL elsewhere.
+"""
+import os
+import logging
+from flask import jsonify
+from flask_jwt_extended import get_current_user
+from sqlalchemy import event
+from extensions import db, jwt
+from utils.cache import MemoryCache
+
+logger = logging.getLogger(__name__)
+
+_principals = MemoryCache(max_entries=1024)
+
+class Principal:
+    """Read-only snapshot of a User row, safe to share between requests and threads"""
+
+    __slots__ = ('id', 'username', 'email', 'is_admin', 'active', 'created_at', 'last_login')
+
+    def __init__(self, user):
+        self.id = user.id
+        self.username = user.username
+        self.email = user.email
+        self.is_admin = bool(user.is_admin)
+        self.active = user.active is not False
+        self.created_at = user.created_at
+        self.last_login = user.last_login
+
+    def identity(self):
+        """The dict parse_jwt_identity() has always returned"""
+        return {'id': self.id, 'username': self.username, 'is_admin': self.is_admin}
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'username': self.username,
+            'email': self.email or f"{self.username}@dciukajuki.org",
+            'is_admin': self.is_admin,
+            'active': self.active,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'last_login': self.last_login.isoformat() if self.last_login else None
+        }
+
+def init_principal(app):
+    """Resolve the JWT identity of each request to a cached Principal"""
+    from models.user import User
+
+    app.config.setdefault('PRINCIPAL_CACHE_TTL', int(os.getenv('PRINCIPAL_CACHE_TTL', 30)))
+    jwt.user_lookup_loader(load_principal)
+    jwt.user_lookup_error_loader(_principal_error)
+    if not event.contains(User, 'after_update', _forget_user):
+        event.listen(User, 'after_update', _forget_user)
+        event.listen(User, 'after_delete', _forget_user)
+
+def _user_id(identity):
+    try:
+        return int(str(identity).split(':')[0])
+    except ValueError:
+        return None
+
+def load_principal(jwt_header, jwt_data):
+    """flask_jwt_extended user loader: the token's Principal, or None when the user is gone or disabled"""
+    from flask import current_app
+    from models.user import User
+
+    user_id = _user_id(jwt_data.get(current_app.config['JWT_IDENTITY_CLAIM']))
+    if user_id is None:
+        logger.warning('Malformed JWT identity: %r', jwt_data.get(current_app.config['JWT_IDENTITY_CLAIM']))
+        return None
+
+    principal = _principals.get(user_id)
+    if principal is None:
+        user = db.session.get(User, user_id)
+        if user is None:
+            return None
+        principal = Principal(user)
+        _principals.set(user_id, principal, ex=current_app.config['PRINCIPAL_CACHE_TTL'])
+    return principal if principal.active else None
+
+def _principal_error(jwt_header, jwt_data):
+    return jsonify({'msg': 'User not found or disabled'}), 401
+
+def _forget_user(mapper, connection, user):
+    _principals.delete(user.id)
+
+def forget_principal(user_id):
+    """Drop a cached principal, e.g. after changing the user outside the ORM"""
+    _principals.delete(user_id)
+
+def current_principal():
+    """The Principal of the current request; requires a verified JWT like get_jwt_identity()"""
+    return get_current_user()
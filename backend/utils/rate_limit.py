@@ -0,0 +1,165 @@
+"""
+Per-client rate limiting for login and the public form endpoints.
+
+@rate_limited(name) gives every client IP a token bucket per endpoint. The
+bucket holds up to N tokens and refills at N per period, as set by
+RATE_LIMIT_<NAME> (e.g. RATE_LIMIT_FORMS='5/minute'). A request without a
+token gets 429 with Retry-After before the view runs, so a spam burst never
+reaches the database.
+
+Buckets live in a store selected by RATE_LIMIT_STORAGE:
+
+- 'memory' (default): per process, a fixed number of lock-striped shards so
+  concurrent requests for different clients rarely contend on a lock
+- 'redis': shared by every worker and server, one atomic script per request
+  (RATE_LIMIT_REDIS_URL, defaults to CACHE_REDIS_URL)
+
+With the memory store each gunicorn worker counts separately, so a client
+can get up to workers x N requests through per period.
+"""
+import os
+import math
+import time
+import threading
+import zlib
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, jsonify, request
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+DEFAULT_RATE_LIMITS = {
+    'login': '10/minute',
+    'forms': '5/minute',
+    'giving': '10/minute',
+    'subscriptions': '5/minute'
+}
+
+def parse_rate(spec):
+    """'5/minute' -> (capacity 5, refill rate in tokens per second)"""
+    count, _, period = spec.partition('/')
+    if period not in PERIODS:
+        raise ValueError(f"Invalid rate limit '{spec}', expected <count>/<{'|'.join(PERIODS)}>")
+    return int(count), int(count) / PERIODS[period]
+
+def _refill(tokens, updated, capacity, rate, now):
+    return min(capacity, tokens + (now - updated) * rate)
+
+class StripedMemoryStore:
+    """Token buckets in lock-striped shards, each an LRU bounded to max_keys / stripes entries"""
+
+    def __init__(self, stripes=32, max_keys=100000):
+        self.shards = [(threading.Lock(), OrderedDict()) for _ in range(stripes)]
+        self.max_per_shard = max(1, max_keys // stripes)
+
+    def consume(self, key, capacity, rate):
+        """Take a token from key's bucket; returns (allowed, seconds until the next token)"""
+        lock, buckets = self.shards[zlib.crc32(key.encode()) % len(self.shards)]
+        now = time.monotonic()
+        with lock:
+            tokens, updated = buckets.get(key, (capacity, now))
+            tokens = _refill(tokens, updated, capacity, rate, now)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            buckets[key] = (tokens, now)
+            buckets.move_to_end(key)
+            if len(buckets) > self.max_per_shard:
+                # The least recently seen client; a forgotten bucket simply starts full again
+                buckets.popitem(last=False)
+        return allowed, 0 if allowed else (1 - tokens) / rate
+
+    def clear(self):
+        for lock, buckets in self.shards:
+            with lock:
+                buckets.clear()
+
+class RedisStore:
+    """Token buckets in Redis hashes, updated atomically by a Lua script"""
+
+    SCRIPT = """
+    local capacity, rate, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+    local tokens = tonumber(state[1]) or capacity
+    local updated = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+    local allowed = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+        allowed = 1
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+    return {allowed, tostring(tokens)}
+    """
+
+    def __init__(self, client, prefix):
+        self.script = client.register_script(self.SCRIPT)
+        self.prefix = prefix
+
+    def consume(self, key, capacity, rate):
+        allowed, tokens = self.script(keys=[f'{self.prefix}:ratelimit:{key}'], args=[capacity, rate, time.time()])
+        return bool(allowed), 0 if allowed else (1 - float(tokens)) / rate
+
+def _memory_store(app):
+    return StripedMemoryStore(stripes=app.config['RATE_LIMIT_STRIPES'], max_keys=app.config['RATE_LIMIT_MAX_KEYS'])
+
+def _redis_store(app):
+    try:
+        import redis
+    except ImportError:
+        raise RuntimeError("RATE_LIMIT_STORAGE 'redis' requires the redis package (pip install redis)")
+    return RedisStore(redis.Redis.from_url(app.config['RATE_LIMIT_REDIS_URL']), app.config.get('CACHE_KEY_PREFIX', 'dck'))
+
+RATE_LIMIT_STORES = {
+    'memory': _memory_store,
+    'redis': _redis_store
+}
+
+def init_rate_limit(app, store=None):
+    """Configure rate limiting for app; store overrides RATE_LIMIT_STORAGE"""
+    app.config.setdefault('RATE_LIMIT_ENABLED', os.getenv('RATE_LIMIT_ENABLED', 'true').lower() == 'true')
+    app.config.setdefault('RATE_LIMIT_STORAGE', os.getenv('RATE_LIMIT_STORAGE', 'memory'))
+    app.config.setdefault('RATE_LIMIT_STRIPES', int(os.getenv('RATE_LIMIT_STRIPES', 32)))
+    app.config.setdefault('RATE_LIMIT_MAX_KEYS', int(os.getenv('RATE_LIMIT_MAX_KEYS', 100000)))
+    app.config.setdefault('RATE_LIMIT_REDIS_URL', os.getenv('RATE_LIMIT_REDIS_URL', os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/0')))
+    # Proxies in front of the app that append to X-Forwarded-For; 0 trusts none and uses the socket address
+    app.config.setdefault('RATE_LIMIT_TRUSTED_PROXIES', int(os.getenv('RATE_LIMIT_TRUSTED_PROXIES', 0)))
+    for name, default in DEFAULT_RATE_LIMITS.items():
+        key = f'RATE_LIMIT_{name.upper()}'
+        app.config.setdefault(key, os.getenv(key, default))
+        parse_rate(app.config[key])
+
+    if store is None:
+        name = app.config['RATE_LIMIT_STORAGE']
+        if name not in RATE_LIMIT_STORES:
+            raise ValueError(f"Unknown RATE_LIMIT_STORAGE '{name}', expected one of {', '.join(RATE_LIMIT_STORES)}")
+        store = RATE_LIMIT_STORES[name](app)
+    app.extensions['rate_limit'] = store
+
+def client_ip():
+    """The client address, taken from X-Forwarded-For only as far as RATE_LIMIT_TRUSTED_PROXIES allows"""
+    trusted = current_app.config['RATE_LIMIT_TRUSTED_PROXIES']
+    if trusted:
+        forwarded = [part.strip() for part in request.headers.get('X-Forwarded-For', '').split(',') if part.strip()]
+        if len(forwarded) >= trusted:
+            return forwarded[-trusted]
+    return request.remote_addr or 'unknown'
+
+def rate_limited(name):
+    """Limit the wrapped view per client IP to RATE_LIMIT_<NAME>, answering 429 when exceeded"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            store = current_app.extensions.get('rate_limit')
+            if store is None or not current_app.config['RATE_LIMIT_ENABLED']:
+                return view(*args, **kwargs)
+            capacity, rate = parse_rate(current_app.config[f'RATE_LIMIT_{name.upper()}'])
+            allowed, retry_after = store.consume(f'{request.endpoint}:{client_ip()}', capacity, rate)
+            if not allowed:
+                response = jsonify({'msg': 'Too many requests, please try again later'})
+                response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+                return response, 429
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
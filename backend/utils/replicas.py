@@ -0,0 +1,142 @@
+"""
+Read-replica routing for public GET traffic.
+
+With DATABASE_REPLICA_URLS set (comma separated), RoutingSession sends the
+reads of anonymous GET/HEAD requests to the replicas, round-robin, one
+replica per request. Everything else uses the primary:
+
+- writes, and every read in the same request after a write
+- requests carrying an Authorization header (admin and member pages, which
+  expect to see their own changes)
+- every request for REPLICA_PIN_SECONDS after a cache invalidation, so that
+  responses rebuilt right after an admin write are not cached from a replica
+  that is still catching up
+- CLI commands and background jobs
+
+A replica whose connection fails is taken out of rotation for
+REPLICA_RETRY_SECONDS; the read that hit the failure is retried on the next
+healthy replica, or on the primary when there is none.
+"""
+import os
+import time
+import logging
+import threading
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.sql.dml import UpdateBase
+from utils.cache import get_cache, on_invalidate
+
+logger = logging.getLogger(__name__)
+
+class ReplicaSet:
+    """Replica engines with round-robin selection and failure tracking"""
+
+    def __init__(self, uris, retry_seconds):
+        from config import engine_options
+
+        self.retry_seconds = retry_seconds
+        self.engines = []
+        self._down_until = {}
+        self._next = 0
+        self._lock = threading.Lock()
+        for index, uri in enumerate(uris, start=1):
+            engine = create_engine(uri, **engine_options(uri, logging_name=f'replica-{index}'))
+            event.listen(engine, 'handle_error', self._on_error)
+            self.engines.append(engine)
+
+    def _on_error(self, context):
+        # Connection failures only; a bad query is not the replica's fault
+        if context.is_disconnect or context.connection is None:
+            self.mark_down(context.engine)
+
+    def mark_down(self, engine):
+        with self._lock:
+            self._down_until[engine] = time.monotonic() + self.retry_seconds
+        logger.warning(f"Replica {engine.url.render_as_string()} failed, out of rotation for {self.retry_seconds}s")
+
+    def is_down(self, engine):
+        return self._down_until.get(engine, 0) > time.monotonic()
+
+    def choose(self):
+        """Next healthy replica, or None when all of them are down"""
+        with self._lock:
+            for _ in range(len(self.engines)):
+                engine = self.engines[self._next]
+                self._next = (self._next + 1) % len(self.engines)
+                if not self.is_down(engine):
+                    return engine
+        return None
+
+    def status(self):
+        return [{
+            'url': engine.url.render_as_string(),
+            'healthy': not self.is_down(engine),
+            'retry_in': max(0, round(self._down_until.get(engine, 0) - time.monotonic(), 1))
+        } for engine in self.engines]
+
+    def dispose(self, close=True):
+        for engine in self.engines:
+            engine.dispose(close=close)
+
+def init_replicas(app):
+    """Configure read replicas for app from DATABASE_REPLICA_URLS"""
+    urls = os.getenv('DATABASE_REPLICA_URLS', '')
+    app.config.setdefault('SQLALCHEMY_REPLICA_URIS', [url.strip() for url in urls.split(',') if url.strip()])
+    app.config.setdefault('REPLICA_RETRY_SECONDS', int(os.getenv('REPLICA_RETRY_SECONDS', 30)))
+    app.config.setdefault('REPLICA_PIN_SECONDS', int(os.getenv('REPLICA_PIN_SECONDS', 5)))
+
+    if app.config['SQLALCHEMY_REPLICA_URIS']:
+        app.extensions['replicas'] = ReplicaSet(app.config['SQLALCHEMY_REPLICA_URIS'], app.config['REPLICA_RETRY_SECONDS'])
+
+def get_replicas():
+    """The app's ReplicaSet, or None when no replicas are configured"""
+    return current_app.extensions.get('replicas')
+
+def _pin_key():
+    return f"{current_app.config['CACHE_KEY_PREFIX']}:replica-pin"
+
+@on_invalidate()
+def pin_to_primary():
+    """Keep reads on the primary for a while after a write, across workers sharing the cache"""
+    if get_replicas() is None:
+        return
+    get_cache().set(_pin_key(), '1', ex=current_app.config['REPLICA_PIN_SECONDS'])
+
+def _request_replica():
+    """The replica this request reads from, chosen on its first query; None means the primary"""
+    if 'db_replica' not in g:
+        replicas = get_replicas()
+        g.db_replica = replicas.choose() if replicas is not None and _replica_eligible() else None
+    return g.db_replica
+
+def _replica_eligible():
+    if request.method not in ('GET', 'HEAD') or 'Authorization' in request.headers:
+        return False
+    cache = get_cache()
+    return cache is None or cache.get(_pin_key()) is None
+
+class RoutingSession(Session):
+    """Session that reads from a replica on anonymous GET requests"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_request_context():
+            if self._flushing or isinstance(clause, UpdateBase):
+                g.db_wrote = True
+            elif not g.get('db_wrote'):
+                replica = _request_replica()
+                if replica is not None:
+                    return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def execute(self, *args, **kwargs):
+        try:
+            return super().execute(*args, **kwargs)
+        except exc.DBAPIError:
+            replica = g.get('db_replica') if has_request_context() else None
+            if replica is None or not get_replicas().is_down(replica):
+                raise
+            # Fail over: the next healthy replica, or the primary
+            self.rollback()
+            g.db_replica = get_replicas().choose()
+            return super().execute(*args, **kwargs)
@@ -0,0 +1,171 @@
+"""
+Dashboard counters kept in the stat_rollup table.
+
+Every change is recorded in three buckets: the day, the month and the
+all-time total, so the dashboard reads a handful of rows instead of
+scanning the source tables. Writes are upserts that add a delta to the
+existing value and run on the connection of the flush that caused them.
+"""
+from datetime import date, datetime
+from decimal import Decimal
+from sqlalchemy import and_, or_, func
+
+ALL_TIME = date(1970, 1, 1)
+PERIODS = ('day', 'month', 'all')
+
+def month_start(day):
+    return day.replace(day=1)
+
+def previous_month_start(day):
+    first = month_start(day)
+    return first.replace(year=first.year - 1, month=12) if first.month == 1 else first.replace(month=first.month - 1)
+
+def bucket_start(period, day):
+    if period == 'day':
+        return day
+    if period == 'month':
+        return month_start(day)
+    return ALL_TIME
+
+def giving_dimensions(purpose, payment_method):
+    """Dimensions a giving transaction is counted under: the total, its purpose and its payment method"""
+    dimensions = ['']
+    if purpose:
+        dimensions.append(f'purpose:{purpose}'[:120])
+    if payment_method:
+        dimensions.append(f'method:{payment_method}'[:120])
+    return dimensions
+
+def _to_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return datetime.fromisoformat(value).date()
+    return value
+
+def upsert_add(connection, table, key_columns, rows, add_columns):
+    """Insert rows, or add their add_columns to the row with the same key; other columns are overwritten"""
+    dialect = connection.dialect.name
+    set_columns = [c for c in rows[0] if c not in key_columns and c not in add_columns]
+
+    if dialect == 'mysql':
+        from sqlalchemy.dialects.mysql import insert
+        statement = insert(table)
+        values = {c: table.c[c] + statement.inserted[c] for c in add_columns}
+        values.update({c: statement.inserted[c] for c in set_columns})
+        connection.execute(statement.on_duplicate_key_update(**values), rows)
+    elif dialect in ('sqlite', 'postgresql'):
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        statement = insert(table)
+        values = {c: table.c[c] + statement.excluded[c] for c in add_columns}
+        values.update({c: statement.excluded[c] for c in set_columns})
+        connection.execute(statement.on_conflict_do_update(index_elements=key_columns, set_=values), rows)
+    else:
+        for row in rows:
+            key = and_(*[table.c[c] == row[c] for c in key_columns])
+            values = {c: table.c[c] + row[c] for c in add_columns}
+            values.update({c: row[c] for c in set_columns})
+            updated = connection.execute(table.update().where(key).values(**values))
+            if not updated.rowcount:
+                connection.execute(table.insert(), [row])
+
+def _upsert(connection, rows):
+    from models.stat_rollup import StatRollup
+
+    now = datetime.utcnow()
+    for row in rows:
+        row['updated_at'] = now
+    upsert_add(connection, StatRollup.__table__, ['metric', 'period', 'period_start', 'dimension'], rows, ['value'])
+
+def record_rollup(connection, metric, day, delta, dimension=''):
+    """Add delta to the day, month and all-time buckets of metric"""
+    day = _to_date(day)
+    if day is None or not delta:
+        return
+    delta = Decimal(str(delta))
+    _upsert(connection, [
+        {'metric': metric, 'period': period, 'period_start': bucket_start(period, day),
+         'dimension': dimension, 'value': delta}
+        for period in PERIODS
+    ])
+
+def read_dashboard_rollups(today):
+    """Fetch every counter the dashboard needs in one query
+
+    Returns a dict with 'all', 'month' and 'previous_month' totals per metric,
+    the number of upcoming events, and this month's giving per dimension.
+    """
+    from extensions import db
+    from models.stat_rollup import StatRollup
+
+    this_month = month_start(today)
+    last_month = previous_month_start(today)
+    rows = db.session.query(
+        StatRollup.metric, StatRollup.period, StatRollup.period_start, StatRollup.dimension, StatRollup.value
+    ).filter(or_(
+        and_(StatRollup.period == 'all', StatRollup.dimension == ''),
+        and_(StatRollup.period == 'month', StatRollup.period_start.in_([this_month, last_month])),
+        and_(StatRollup.metric == 'events', StatRollup.period == 'day', StatRollup.period_start >= today)
+    )).all()
+
+    result = {'all': {}, 'month': {}, 'previous_month': {}, 'upcoming_events': 0, 'giving_breakdown': {}}
+    for row in rows:
+        value = float(row.value or 0)
+        if row.period == 'all':
+            result['all'][row.metric] = value
+        elif row.period == 'day':
+            result['upcoming_events'] += value
+        elif row.dimension:
+            if row.metric == 'giving_amount' and row.period_start == this_month and value:
+                result['giving_breakdown'][row.dimension] = value
+        elif row.period_start == this_month:
+            result['month'][row.metric] = value
+        else:
+            result['previous_month'][row.metric] = value
+    return result
+
+def rebuild_rollups():
+    """Recompute all counters from the source tables; returns the number of rows written"""
+    from extensions import db
+    from models.stat_rollup import StatRollup
+    from models.sermon import Sermon
+    from models.event import Event
+    from models.ministry import Ministry
+    from models.giving_transaction import GivingTransaction
+
+    StatRollup.query.delete()
+    connection = db.session.connection()
+
+    def add_grouped(metric, day_column, value, query_filter=None, dimension_column=None, prefix=''):
+        columns = [day_column.label('day'), value.label('value')]
+        if dimension_column is not None:
+            columns.append(dimension_column.label('dimension'))
+        query = db.session.query(*columns)
+        if query_filter is not None:
+            query = query.filter(query_filter)
+        query = query.group_by(*[c for c in (day_column, dimension_column) if c is not None])
+        for row in query.all():
+            if dimension_column is not None and not row.dimension:
+                continue
+            dimension = f'{prefix}{row.dimension}'[:120] if dimension_column is not None else ''
+            # Rows without a date are only counted in the all-time total
+            record_rollup(connection, metric, row.day or ALL_TIME, row.value, dimension)
+
+    add_grouped('sermons', Sermon.date, func.count(Sermon.id))
+    add_grouped('events', Event.start_date, func.count(Event.id))
+    # Ministry history is not kept, so active ministries are attributed to their creation day
+    add_grouped('ministries', func.date(Ministry.created_at), func.count(Ministry.id), Ministry.is_active == True)
+
+    giving_day = func.date(GivingTransaction.created_at)
+    for dimension_column, prefix in ((None, ''), (GivingTransaction.purpose, 'purpose:'),
+                                     (GivingTransaction.payment_method, 'method:')):
+        add_grouped('giving_amount', giving_day, func.sum(GivingTransaction.amount),
+                    dimension_column=dimension_column, prefix=prefix)
+        add_grouped('giving_count', giving_day, func.count(GivingTransaction.id),
+                    dimension_column=dimension_column, prefix=prefix)
+
+    db.session.commit()
+    return StatRollup.query.count()
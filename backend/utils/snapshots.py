@@ -0,0 +1,168 @@
+"""
+Pre-rendered JSON snapshots of the static public endpoints.
+
+After an admin write to one of SNAPSHOTS (hooked on cache invalidation) the
+endpoint's payload is rendered to disk, together with gzip and, when the
+brotli package is installed, brotli variants:
+
+    snapshots/<name>/<version>/index.json[.gz|.br]
+    snapshots/<name>/current -> <version>
+
+The version is a hash of the payload. A new version is written to its own
+directory and published by atomically replacing the 'current' symlink, so
+readers (this app or a front proxy with gzip_static / brotli_static) always
+see a complete set of files. The last SNAPSHOT_KEEP versions are kept for
+readers that are still in flight.
+
+@snapshot(name) on the view serves the current files for requests without a
+query string, with no database access at all.
+"""
+import os
+import gzip
+import shutil
+import hashlib
+import inspect
+import logging
+from importlib import import_module
+from functools import wraps
+from flask import current_app, request, send_file
+from utils.cache import on_invalidate
+
+logger = logging.getLogger(__name__)
+
+# name -> (cache namespace, view)
+SNAPSHOTS = {
+    'ministries': ('ministries', 'controllers.ministry_controller:get_ministries'),
+    'pastors': ('pastors', 'controllers.pastor_controller:get_pastors'),
+    'church-info': ('church_info', 'controllers.church_info_controller:get_church_info'),
+    'services': ('services', 'controllers.service_controller:get_services'),
+    'hero-slides': ('hero_slides', 'controllers.hero_slide_controller:get_hero_slides')
+}
+
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+def init_snapshots(app):
+    """Configure snapshot publishing for app"""
+    app.config.setdefault('SNAPSHOTS_ENABLED', os.getenv('SNAPSHOTS_ENABLED', 'true').lower() == 'true')
+    app.config.setdefault('SNAPSHOT_FOLDER', os.getenv('SNAPSHOT_FOLDER', os.path.join(app.root_path, '..', 'snapshots')))
+    app.config.setdefault('SNAPSHOT_KEEP', int(os.getenv('SNAPSHOT_KEEP', 3)))
+
+def _snapshot_dir(name):
+    return os.path.join(current_app.config['SNAPSHOT_FOLDER'], name)
+
+def _render(name):
+    module_name, view_name = SNAPSHOTS[name][1].split(':')
+    view = inspect.unwrap(getattr(import_module(module_name), view_name))
+    with current_app.test_request_context():
+        return view().get_data()
+
+def _compress_brotli(body):
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli.compress(body, quality=11)
+
+def _prune(folder, keep):
+    """Remove all but the newest keep versions, never the current one"""
+    current = os.path.realpath(os.path.join(folder, 'current'))
+    versions = sorted(
+        (entry for entry in os.scandir(folder) if entry.is_dir(follow_symlinks=False)),
+        key=lambda entry: entry.stat().st_mtime, reverse=True
+    )
+    for entry in versions[keep:]:
+        if os.path.realpath(entry.path) != current:
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+def publish_snapshot(name):
+    """Render one snapshot and swap it in; returns its version"""
+    body = _render(name)
+    version = hashlib.sha1(body).hexdigest()[:16]
+    folder = _snapshot_dir(name)
+    target = os.path.join(folder, version)
+    os.makedirs(folder, exist_ok=True)
+
+    if not os.path.isdir(target):
+        staging = f"{target}.tmp-{os.getpid()}"
+        os.makedirs(staging, exist_ok=True)
+        files = {'index.json': body, 'index.json.gz': gzip.compress(body, compresslevel=9, mtime=0)}
+        compressed = _compress_brotli(body)
+        if compressed is not None:
+            files['index.json.br'] = compressed
+        for filename, data in files.items():
+            with open(os.path.join(staging, filename), 'wb') as f:
+                f.write(data)
+        try:
+            os.rename(staging, target)
+        except OSError:
+            # Another worker published the same version first
+            shutil.rmtree(staging, ignore_errors=True)
+
+    # Atomic swap: point a fresh symlink at the version, then rename it over 'current'
+    link = os.path.join(folder, f"current.tmp-{os.getpid()}")
+    if os.path.lexists(link):
+        os.remove(link)
+    os.symlink(version, link)
+    os.replace(link, os.path.join(folder, 'current'))
+
+    _prune(folder, current_app.config['SNAPSHOT_KEEP'])
+    logger.info(f"Published {name} snapshot {version}")
+    return version
+
+def publish_all_snapshots():
+    """Render every snapshot; returns {name: version}"""
+    return {name: publish_snapshot(name) for name in SNAPSHOTS}
+
+def _publisher(name):
+    def publish():
+        if not current_app.config.get('SNAPSHOTS_ENABLED'):
+            return
+        try:
+            publish_snapshot(name)
+        except Exception:
+            # Unpublish rather than keep serving a snapshot that is now stale
+            current = os.path.join(_snapshot_dir(name), 'current')
+            if os.path.lexists(current):
+                os.remove(current)
+            raise
+    publish.__name__ = f"publish_{name.replace('-', '_')}_snapshot"
+    return publish
+
+for _name, (_namespace, _view) in SNAPSHOTS.items():
+    on_invalidate(_namespace)(_publisher(_name))
+
+def snapshot(name):
+    """Serve the published snapshot of name instead of running the view, when there is one"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not current_app.config.get('SNAPSHOTS_ENABLED') or request.args:
+                return view(*args, **kwargs)
+
+            folder = _snapshot_dir(name)
+            try:
+                version = os.readlink(os.path.join(folder, 'current'))
+            except OSError:
+                return view(*args, **kwargs)
+
+            # Resolve the version once so the body always matches the ETag
+            path, encoding = os.path.join(folder, version, 'index.json'), None
+            for candidate, suffix in ENCODINGS:
+                if candidate in request.accept_encodings and os.path.exists(path + suffix):
+                    path, encoding = path + suffix, candidate
+                    break
+            try:
+                response = send_file(path, mimetype='application/json', etag=False, conditional=False)
+            except OSError:
+                # Pruned between readlink and open
+                return view(*args, **kwargs)
+
+            if encoding:
+                response.headers['Content-Encoding'] = encoding
+            response.vary.add('Accept-Encoding')
+            response.set_etag(version, weak=True)
+            response.cache_control.public = True
+            response.cache_control.max_age = current_app.config.get('CACHE_HTTP_MAX_AGE', 60)
+            return response.make_conditional(request)
+        return wrapper
+    return decorator
@@ -0,0 +1,59 @@
+"""
+Cold start profiling for `flask import-profile`.
+
+The CLI process has already imported everything, so the profile is taken in
+a fresh interpreter started with -X importtime that builds the app the way a
+server worker does (no flask CLI, so no Flask-Migrate).
+"""
+import os
+import re
+import sys
+import subprocess
+
+BOOT_TARGET_MS = 1000
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BOOT_SCRIPT = (
+    "import time\n"
+    "started = time.perf_counter()\n"
+    "from app import create_app\n"
+    "create_app()\n"
+    "print(f'BOOT_MS {(time.perf_counter() - started) * 1000:.1f}')\n"
+)
+
+_importtime_line = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)')
+
+def profile_startup():
+    """Boot the app in a fresh interpreter and return its timings
+
+    Returns a dict with boot_ms, import_ms, top_level (imports made directly
+    by the boot script) and modules (every module), the lists holding
+    (module, self_us, cumulative_us) sorted slowest first.
+    """
+    env = dict(os.environ)
+    env.pop('FLASK_RUN_FROM_CLI', None)
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', BOOT_SCRIPT],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    )
+    boot = re.search(r'BOOT_MS ([\d.]+)', result.stdout)
+    if result.returncode != 0 or not boot:
+        raise RuntimeError(f"App failed to boot:\n{result.stderr[-2000:]}")
+
+    modules, top_level = [], []
+    for line in result.stderr.splitlines():
+        match = _importtime_line.match(line)
+        if not match:
+            continue
+        entry = (match.group(4), int(match.group(1)), int(match.group(2)))
+        modules.append(entry)
+        if not match.group(3):
+            top_level.append(entry)
+
+    return {
+        'boot_ms': float(boot.group(1)),
+        'import_ms': sum(cumulative for _, _, cumulative in top_level) / 1000,
+        'top_level': sorted(top_level, key=lambda entry: entry[2], reverse=True),
+        'modules': sorted(modules, key=lambda entry: entry[1], reverse=True)
+    }
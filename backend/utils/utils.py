@@ -1,27 +1,53 @@
-from flask_jwt_extended import get_jwt_identity
+from functools import wraps
+from flask import g, jsonify
+from flask_jwt_extended import jwt_required
+from utils.principal import current_principal
 
 def parse_jwt_identity():
-    """Parse the JWT identity string and return user info"""
-    current_user = get_jwt_identity()
-    print(f"🔍 DEBUG: Raw JWT identity: {current_user}")
-    try:
-        user_id, username, is_admin = current_user.split(':')
-        result = {
-            'id': int(user_id),
-            'username': username,
-            'is_admin': is_admin.lower() == 'true'
-        }
-        print(f"🔍 DEBUG: Parsed JWT identity: {result}")
-        return result
-    except (ValueError, AttributeError) as e:
-        print(f"❌ ERROR: Failed to parse JWT identity: {str(e)}")
-        return None
+    """Return the current user's id, username and admin flag"""
+    principal = current_principal()
+    return principal.identity() if principal else None
 
 def is_admin():
-    """Check if current user is admin"""
-    print(f"🔍 DEBUG: Checking if user is admin")
-    user_info = parse_jwt_identity()
-    print(f"🔍 DEBUG: Parsed JWT identity: {user_info}")
-    is_admin_user = user_info and user_info.get('is_admin', False)
-    print(f"🔍 DEBUG: Is admin: {is_admin_user}")
-    return is_admin_user 
\ No newline at end of file
+    """Check if current user is admin; the verdict is kept for the rest of the request"""
+    if 'is_admin' not in g:
+        principal = current_principal()
+        g.is_admin = principal is not None and principal.is_admin
+    return g.is_admin
+
+def admin_required(view):
+    """Verify the JWT and reject non-admins with 403 before the view runs"""
+    @wraps(view)
+    @jwt_required()
+    def wrapper(*args, **kwargs):
+        if not is_admin():
+            return jsonify({'msg': 'Admins only'}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+# Largest number of ids or new rows a bulk endpoint accepts in one request
+MAX_BULK_ITEMS = 5000
+
+def bulk_selection(data, filter_keys):
+    """Split a bulk request body, {"ids": [...]} or {"filter": {...}}, into (ids, filters)
+
+    Exactly one of the two is returned. Raises ValueError for anything else,
+    including an empty filter, so a malformed body never selects every row.
+    """
+    if not isinstance(data, dict):
+        raise ValueError('Expected a JSON object')
+    ids, filters = data.get('ids'), data.get('filter')
+    if (ids is None) == (filters is None):
+        raise ValueError("Provide either 'ids' or 'filter'")
+    if ids is not None:
+        if not isinstance(ids, list) or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+            raise ValueError("'ids' must be a list of integers")
+        if len(ids) > MAX_BULK_ITEMS:
+            raise ValueError(f"At most {MAX_BULK_ITEMS} ids per request")
+        return sorted(set(ids)), None
+    if not isinstance(filters, dict) or not filters:
+        raise ValueError("'filter' must be a non-empty object")
+    unknown = sorted(set(filters) - set(filter_keys))
+    if unknown:
+        raise ValueError(f"Unknown filters: {', '.join(unknown)}")
+    return None, filters
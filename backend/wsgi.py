@@ -0,0 +1,12 @@
+"""
+WSGI entry point for production servers.
+
+    cd backend && gunicorn -c gunicorn.conf.py wsgi:app
+
+See gunicorn.conf.py for the worker models and DEPLOYMENT.md for measured
+throughput. app.run() in app.py is only for local development.
+"""
+from app import create_app
+
+app = create_app()
+application = app
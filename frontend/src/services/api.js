@@ -32,6 +32,11 @@ class ApiService {
     return this.request('/health');
   }
 
+  // Homepage bundle (hero slides, services, events, sermons, announcements, devotionals, ministries)
+  async getHome() {
+    return this.request('/home/');
+  }
+
   // Announcements
   async getAnnouncements() {
     return this.request('/announcements/');